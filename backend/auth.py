@@ -1,10 +1,10 @@
 import os
 import httpx
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, jwk
 from jose.exceptions import JOSEError, JWTClaimsError, ExpiredSignatureError
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 # --- Configuration ---
 
@@ -16,6 +16,8 @@ JWKS_URL = f"{CLERK_ISSUER_URL}/.well-known/jwks.json"
 
 # This defines the "Bearer <token>" in the Authorization header
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+# Same, but lets anonymous requests through (for endpoints with optional personalization)
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
 
 # --- JWKS Caching ---
 
@@ -97,4 +99,22 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> str:
     except JOSEError as e:
         raise HTTPException(status_code=401, detail=f"Invalid token: {e}")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
+
+async def get_optional_user(token: Optional[str] = Depends(optional_oauth2_scheme)) -> Optional[str]:
+    """
+    Like get_current_user, but returns None when no token is sent. A token
+    that is sent but invalid is still rejected.
+    """
+    if not token:
+        return None
+    return await get_current_user(token)
+
+async def get_stream_user(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    access_token: Optional[str] = Query(None, description="Token for clients that can't set headers (EventSource)"),
+) -> str:
+    """get_current_user that also accepts the token as a query parameter."""
+    if not (token or access_token):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return await get_current_user(token or access_token)
@@ -1,64 +1,102 @@
+import csv
 import json
 import os
+from datetime import datetime
 from dotenv import load_dotenv
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from backend.database.database import SessionLocal, engine
-from backend.models import Base
-from backend.models import Tool, Category
+from backend.database.database import SessionLocal, dialect_insert
+from backend.migrate import run_migrations
+from backend.models import Tool, tool_category_association
+from backend.services import catalog_events, category_registry, near_duplicates, similar_index
+from backend.services.catalog_export import CSV_CATEGORY_SEPARATOR
+from backend.services.canonical_url import link_hash
 from backend.schemas import PricingType
 
 load_dotenv()
 
 ADMIN_USER_ID = os.getenv("ADMIN_USER_ID")
 
-def import_tools(json_filepath: str):
-    Base.metadata.create_all(bind=engine)
+def load_tools_file(json_filepath: str):
+    """A JSON array (scraper output), or an NDJSON/CSV file from catalog_export."""
+    with open(json_filepath, 'r', encoding='utf-8', newline='') as file:
+        if json_filepath.endswith(('.ndjson', '.jsonl')):
+            return [json.loads(line) for line in file if line.strip()]
+        if json_filepath.endswith('.csv'):
+            return [
+                {**row, 'categories': [c for c in row.get('categories', '').split(CSV_CATEGORY_SEPARATOR) if c]}
+                for row in csv.DictReader(file)
+            ]
+        return json.load(file)
+
+def import_tools(json_filepath: str, skip_near_duplicates: bool = False):
+    run_migrations()
     db: Session = SessionLocal()
 
     try:
-        with open(json_filepath, 'r') as file:
-            tools_data = json.load(file)
+        tools_data = load_tools_file(json_filepath)
+
+        # Drop mirrors/rebrands of tools we already have (or that appear earlier in the batch)
+        if skip_near_duplicates:
+            report = near_duplicates.dedup_report(tools_data, near_duplicates.existing_tools())
+            skipped = set(report["duplicate_indexes"])
+            for index in sorted(skipped):
+                print(f"Tool '{tools_data[index]['name']}' looks like a near-duplicate. Skipping.")
+            tools_data = [tool for i, tool in enumerate(tools_data) if i not in skipped]
+
+        # Resolve every category name in the file at once, creating the missing ones
+        category_ids = category_registry.resolve_names(
+            db, (name for tool in tools_data for name in tool.get('categories', [])), create=True
+        )
 
-        success_count = 0
+        imported_ids = []
         for tool in tools_data:
-            # Check if tool already exists
-            if db.query(Tool).filter(Tool.name == tool['name']).first():
-                print(f"Tool '{tool['name']}' already exists. Skipping.")
+            tool_category_ids = list(dict.fromkeys(category_ids[name] for name in tool.get('categories', [])))
+            try:
+                digest = link_hash(tool['link'])
+            except ValueError as e:
+                print(f"Tool '{tool['name']}' has a malformed link ({e}). Skipping.")
                 continue
 
-            # ---> THIS ENTIRE BLOCK MUST BE INDENTED INSIDE THE FOR LOOP <---
-            
-            # Handle categories
-            db_categories = []
-            for category_name in tool.get('categories', []):
-                category = db.query(Category).filter(Category.name == category_name).first()
-                if not category:
-                    category = Category(name=category_name)
-                    db.add(category)
-                    db.commit()
-                    db.refresh(category)
-                db_categories.append(category)
+            # Insert the tool; an existing name or canonical link makes this a no-op
+            # (one indexed lookup instead of a SELECT per tool)
+            tool_id = db.execute(
+                dialect_insert(db, Tool.__table__)
+                .values(
+                    name = tool['name'],
+                    description = tool['description'],
+                    link = tool['link'],
+                    link_hash = digest,
+                    logo_url = tool.get('logo_url', ''),
+                    # Default to free if parsing fails.
+                    pricing_type = tool.get('pricing_type', PricingType.free.value),
+                    is_approved = True, # Directly approve scraped tools
+                    user_id = ADMIN_USER_ID,
+                    date_added = datetime.utcnow(),
+                )
+                .on_conflict_do_nothing()
+                .returning(Tool.id)
+            ).scalar()
 
-            # Create new tool
-            new_tool = Tool(
-                name = tool['name'],
-                description = tool['description'],
-                link = tool['link'],
-                logo_url = tool.get('logo_url', ''),
-                # Default to free if parsing fails.
-                pricing_type = tool.get('pricing_type', PricingType.free.value),
-                is_approved = True, # Directly approve scraped tools
-                user_id = ADMIN_USER_ID,
-                categories = db_categories
-            ) 
+            if tool_id is None:
+                print(f"Tool '{tool['name']}' already exists (same name or link). Skipping.")
+                continue
 
-            db.add(new_tool)
-            success_count += 1
-            # ----------------------------------------------------------------
+            if tool_category_ids:
+                db.execute(
+                    insert(tool_category_association),
+                    [{"tool_id": tool_id, "category_id": category_id} for category_id in tool_category_ids]
+                )
+            imported_ids.append(tool_id)
             
         # Commit all the new tools at the very end
         db.commit()
-        print(f"✅ Successfully imported {success_count} tools into the database!")
+        if imported_ids:
+            # Imported tools are approved already, so they go straight into the similar-tools delta
+            similar_index.add_tools(db, imported_ids)
+            # Running API workers refresh their caches from the change feed
+            catalog_events.publish()
+        print(f"✅ Successfully imported {len(imported_ids)} tools into the database!")
 
     except Exception as e:
         db.rollback()
@@ -68,4 +106,9 @@ def import_tools(json_filepath: str):
         db.close()
 
 if __name__ == "__main__":
-    import_tools("scraper/data/scraped_tools.json")
\ No newline at end of file
+    import sys
+    paths = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    import_tools(
+        paths[0] if paths else "scraper/data/scraped_tools.json",
+        skip_near_duplicates="--skip-near-duplicates" in sys.argv
+    )
\ No newline at end of file
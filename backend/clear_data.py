@@ -1,4 +1,4 @@
-from database.database import SessionLocal, engine
+from database.database import SessionLocal
 from models import Base, Tool, Category, tool_category_association
 
 def clear_database():
@@ -1,8 +1,12 @@
 import os
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from backend.instrumentation import install_query_hooks
 
 load_dotenv()
 
@@ -11,18 +15,47 @@ load_dotenv()
 # DB_NAME = os.getenv("DATABASE_NAME")
 # DB_USER = os.getenv("DATABASE_USER")
 # DB_PASSWORD = os.getenv("DATABASE_PASSWORD")
-SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
 
-# SQLALCHEMY_DATABASE_URL = (
-#     f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-# )
+_engine = None
+
+
+def get_database_url() -> str:
+    url = os.getenv("DATABASE_URL")
+
+    # SQLALCHEMY_DATABASE_URL = (
+    #     f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    # )
+
+    if url and url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql://", 1)
+    return url
+
+
+def get_engine():
+    """
+    Build the engine on first use instead of at import, so importing the app
+    (workers, tests, CLI scripts) never touches the environment or the DB.
+    """
+    global _engine
+    if _engine is None:
+        _engine = create_engine(get_database_url())
+        install_query_hooks(_engine)
+    return _engine
+
+
+_session_factory = sessionmaker(autocommit=False, autoflush=False)
+
 
-if SQLALCHEMY_DATABASE_URL and SQLALCHEMY_DATABASE_URL.startswith("postgres://"):
-    SQLALCHEMY_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace("postgres://", "postgresql://", 1)
+def SessionLocal():
+    """Drop-in replacement for the old bound sessionmaker."""
+    return _session_factory(bind=get_engine())
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def dialect_insert(db: Session, table):
+    """INSERT construct supporting ON CONFLICT for the session's backend (Postgres or SQLite)."""
+    if db.get_bind().dialect.name == "postgresql":
+        return pg_insert(table)
+    return sqlite_insert(table)
 
 
 def get_db():
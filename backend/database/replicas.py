@@ -0,0 +1,175 @@
+"""
+Optional read replicas for read-only routes.
+
+Set DATABASE_REPLICA_URLS to a comma-separated list of replica URLs. Routes
+that only read depend on `get_read_db` instead of `get_db`. They get a
+session on the next healthy replica in round-robin order, or on the primary
+when no replica is configured or up.
+
+A replica is ejected for REPLICA_EJECT_SECONDS when one of its connections
+fails, and whenever the health refresher can't reach it. After a client
+writes (any non-GET request that succeeds), its reads stay on the primary
+for READ_YOUR_WRITES_SECONDS, so replica lag never hides the like it just
+toggled. That stickiness is tracked per worker.
+"""
+import itertools
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from fastapi import Request
+from jose import jwt
+from sqlalchemy import create_engine, event, text
+
+from backend.database.database import _session_factory, get_engine
+from backend.instrumentation import install_query_hooks
+
+# --- Configuration ---
+
+REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+REPLICA_EJECT_SECONDS = float(os.getenv("REPLICA_EJECT_SECONDS", "30"))
+# Upper bound on replication lag we are willing to hide from a writer
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
+_WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+class Replica:
+    def __init__(self, url: str):
+        if url.startswith("postgres://"):
+            url = url.replace("postgres://", "postgresql://", 1)
+        self.url = url
+        self.engine = create_engine(url, pool_pre_ping=True)
+        self.down_until = 0.0
+        install_query_hooks(self.engine)
+
+        @event.listens_for(self.engine, "handle_error")
+        def _eject_on_disconnect(context):
+            if context.is_disconnect or context.connection is None:
+                self.eject()
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    def eject(self):
+        was_healthy = self.healthy
+        self.down_until = time.monotonic() + REPLICA_EJECT_SECONDS
+        if was_healthy:
+            print(f"Replica ejected for {REPLICA_EJECT_SECONDS:.0f}s: {self.engine.url.render_as_string(hide_password=True)}")
+
+
+_replicas: Optional[List[Replica]] = None
+_round_robin = itertools.count()
+_init_lock = threading.Lock()
+
+
+def get_replicas() -> List[Replica]:
+    """Replica engines, built lazily like the primary engine."""
+    global _replicas
+    if _replicas is None:
+        with _init_lock:
+            if _replicas is None:
+                _replicas = [Replica(url) for url in REPLICA_URLS]
+    return _replicas
+
+
+def pick_replica() -> Optional[Replica]:
+    """Next healthy replica in round-robin order, or None to use the primary."""
+    replicas = get_replicas()
+    if not replicas:
+        return None
+    start = next(_round_robin)
+    for offset in range(len(replicas)):
+        replica = replicas[(start + offset) % len(replicas)]
+        if replica.healthy:
+            return replica
+    return None
+
+
+def check_replicas() -> List[Dict[str, object]]:
+    """Ping every replica (re-admitting or ejecting it). Runs in the health refresher's thread."""
+    results = []
+    for replica in get_replicas():
+        started = time.perf_counter()
+        try:
+            with replica.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            replica.down_until = 0.0
+            state = "ok"
+        except Exception as e:
+            replica.eject()
+            state = f"error: {e}"
+        results.append({
+            "url": replica.engine.url.render_as_string(hide_password=True),
+            "status": state,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+        })
+    return results
+
+
+# --- Read-your-writes ---
+
+_recent_writers: Dict[str, float] = {}
+
+
+def _client_key(headers: Dict[bytes, bytes], client) -> str:
+    """The token's subject if there is one (unverified: only used for routing), else the client address."""
+    authorization = headers.get(b"authorization", b"").decode("latin-1")
+    if authorization.lower().startswith("bearer "):
+        try:
+            subject = jwt.get_unverified_claims(authorization[7:]).get("sub")
+            if subject:
+                return f"user:{subject}"
+        except Exception:
+            pass
+    return f"addr:{client[0] if client else 'unknown'}"
+
+
+def _recently_wrote(key: str) -> bool:
+    until = _recent_writers.get(key)
+    if until is None:
+        return False
+    if until < time.monotonic():
+        _recent_writers.pop(key, None)
+        return False
+    return True
+
+
+class ReadYourWritesMiddleware:
+    """Remembers clients whose write requests succeeded, so get_read_db keeps them on the primary."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in _WRITE_METHODS or not get_replicas():
+            await self.app(scope, receive, send)
+            return
+
+        async def send_marking_writer(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                key = _client_key(dict(scope["headers"]), scope.get("client"))
+                _recent_writers[key] = time.monotonic() + READ_YOUR_WRITES_SECONDS
+                if len(_recent_writers) > 10000:
+                    now = time.monotonic()
+                    for stale in [k for k, until in _recent_writers.items() if until < now]:
+                        _recent_writers.pop(stale, None)
+            await send(message)
+
+        await self.app(scope, receive, send_marking_writer)
+
+
+# --- Dependency ---
+
+def get_read_db(request: Request):
+    """get_db for read-only routes: a replica session unless the client just wrote."""
+    replica = None
+    if get_replicas() and not _recently_wrote(_client_key(dict(request.scope["headers"]), request.client)):
+        replica = pick_replica()
+    db = _session_factory(bind=replica.engine if replica else get_engine())
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,105 @@
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import httpx
+from sqlalchemy import text
+
+from backend import auth
+from backend.database.database import get_engine
+from backend.database.replicas import check_replicas, get_replicas
+
+# --- Configuration ---
+
+# How often the background task re-checks dependencies
+HEALTH_REFRESH_SECONDS = float(os.getenv("HEALTH_REFRESH_SECONDS", "15"))
+# A status older than this is treated as unknown (the refresher itself is stuck)
+HEALTH_STALE_SECONDS = float(os.getenv("HEALTH_STALE_SECONDS", str(HEALTH_REFRESH_SECONDS * 4)))
+HEALTH_JWKS_TIMEOUT_SECONDS = float(os.getenv("HEALTH_JWKS_TIMEOUT_SECONDS", "5"))
+
+# --- Cached Status ---
+
+# Probes only ever read this; the background task is the only writer.
+_status: Dict[str, Any] = {
+    "db": {"status": "unknown", "latency_ms": None, "checked_at": None},
+    "jwks": {"status": "unknown", "latency_ms": None, "checked_at": None},
+}
+_last_refresh = 0.0
+
+
+def _check_db() -> Dict[str, Any]:
+    """Runs in a worker thread so the event loop never blocks on the driver."""
+    started = time.perf_counter()
+    try:
+        with get_engine().connect() as conn:
+            conn.execute(text("SELECT 1"))
+        state = "ok"
+    except Exception as e:
+        state = f"error: {e}"
+    return {
+        "status": state,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+        "checked_at": datetime.utcnow().isoformat(),
+    }
+
+
+async def _check_jwks(transport: Optional[httpx.AsyncBaseTransport] = None) -> Dict[str, Any]:
+    """
+    Fetches JWKS_URL itself: auth.get_jwks() serves its cache once filled, so
+    it would report "ok" forever after the first fetch.
+    """
+    started = time.perf_counter()
+    try:
+        async with httpx.AsyncClient(timeout=HEALTH_JWKS_TIMEOUT_SECONDS, transport=transport) as client:
+            response = await client.get(auth.JWKS_URL)
+            response.raise_for_status()
+            if not response.json().get("keys"):
+                raise ValueError("JWKS has no keys")
+        state = "ok"
+    except Exception as e:
+        state = f"error: {e}"
+    return {
+        "status": state,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+        "checked_at": datetime.utcnow().isoformat(),
+    }
+
+
+async def refresh_status():
+    """Re-check every dependency once and update the cached status."""
+    global _last_refresh
+    db_status, jwks_status = await asyncio.gather(asyncio.to_thread(_check_db), _check_jwks())
+    _status["db"] = db_status
+    _status["jwks"] = jwks_status
+    if get_replicas():
+        # Also re-admits or ejects replicas for read routing
+        _status["replicas"] = await asyncio.to_thread(check_replicas)
+    _last_refresh = time.monotonic()
+
+
+async def run_refresher():
+    """Background loop started from the app lifespan."""
+    while True:
+        await refresh_status()
+        await asyncio.sleep(HEALTH_REFRESH_SECONDS)
+
+
+def readiness() -> Dict[str, Any]:
+    """Snapshot of the cached dependency status. Performs no I/O."""
+    age = time.monotonic() - _last_refresh if _last_refresh else None
+    stale = age is None or age > HEALTH_STALE_SECONDS
+    # Public catalog routes only need the DB; a JWKS outage degrades auth but
+    # should not pull the instance out of rotation.
+    ready = not stale and _status["db"]["status"] == "ok"
+    return {
+        "ready": ready,
+        "degraded": _status["jwks"]["status"] != "ok",
+        "stale": stale,
+        "age_seconds": round(age, 2) if age is not None else None,
+        "dependencies": {
+            name: [dict(d) for d in dep] if isinstance(dep, list) else dict(dep)
+            for name, dep in _status.items()
+        },
+    }
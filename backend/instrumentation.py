@@ -0,0 +1,181 @@
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+
+# Histogram buckets (Prometheus convention: upper bounds, +Inf implied)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500, 1000)
+
+
+class RequestStats:
+    """Mutable per-request accumulator filled in by the SQLAlchemy hooks."""
+
+    __slots__ = ("db_time", "queries", "rows", "statements")
+
+    def __init__(self):
+        self.db_time = 0.0
+        self.queries = 0
+        self.rows = 0
+        self.statements = None  # Only a list while the request is being profiled
+
+
+# The middleware puts a RequestStats here; threadpool workers running sync
+# routes inherit a copy of the context, so they mutate the same object.
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def capture_statements() -> Optional[list]:
+    """Record every SQL statement of the current request from now on (used by the profiler)."""
+    stats = _current_stats.get()
+    if stats is None:
+        return None
+    stats.statements = []
+    return stats.statements
+
+
+# --- Histograms ---
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series: Dict[Tuple[Tuple[str, str], ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # bucket counts..., sum, count
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+        for key, series in sorted(snapshot.items()):
+            base = ",".join(f'{k}="{v}"' for k, v in key)
+            sep = "," if base else ""
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{bound}"}} {int(count)}')
+            lines.append(f'{self.name}_bucket{{{base}{sep}le="+Inf"}} {int(series[-1])}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-2]}")
+            lines.append(f"{self.name}_count{{{base}}} {int(series[-1])}")
+        return lines
+
+
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "Request latency by route", LATENCY_BUCKETS)
+REQUEST_DB_TIME = Histogram("http_request_db_duration_seconds", "Time spent in SQL per request", LATENCY_BUCKETS)
+REQUEST_QUERIES = Histogram("http_request_queries", "SQL statements executed per request", COUNT_BUCKETS)
+REQUEST_ROWS = Histogram("http_request_db_rows", "Rows returned or affected per request", COUNT_BUCKETS)
+QUERY_LATENCY = Histogram("db_query_duration_seconds", "Latency of individual SQL statements", LATENCY_BUCKETS)
+
+ALL_METRICS = (REQUEST_LATENCY, REQUEST_DB_TIME, REQUEST_QUERIES, REQUEST_ROWS, QUERY_LATENCY)
+
+
+def render_metrics() -> str:
+    """Return all histograms in the Prometheus text exposition format."""
+    lines: List[str] = []
+    for metric in ALL_METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- SQLAlchemy hooks ---
+
+def install_query_hooks(engine: Engine):
+    """Time every statement on the engine and attribute it to the current request."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        QUERY_LATENCY.observe(elapsed)
+
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.db_time += elapsed
+            stats.queries += 1
+            # SQLite reports -1 for SELECTs; psycopg2 reports the row count
+            if cursor.rowcount and cursor.rowcount > 0:
+                stats.rows += cursor.rowcount
+            if stats.statements is not None:
+                stats.statements.append((statement, elapsed, cursor.rowcount))
+
+        if elapsed * 1000 >= SLOW_QUERY_MS:
+            logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, " ".join(statement.split()))
+
+
+# --- ASGI middleware ---
+
+class TimingMiddleware:
+    """
+    Records per-route latency, DB time, query count and rows, and adds a
+    Server-Timing header to every HTTP response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                total_ms = (time.perf_counter() - started) * 1000
+                header = (
+                    f'app;dur={total_ms:.1f}, '
+                    f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries"'
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", header.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            elapsed = time.perf_counter() - started
+            route = scope.get("route")
+            # Use the route template so /tools/1 and /tools/2 share a series
+            path = getattr(route, "path", "unmatched")
+            labels = {"method": scope["method"], "route": path}
+            REQUEST_LATENCY.observe(elapsed, **labels)
+            REQUEST_DB_TIME.observe(stats.db_time, **labels)
+            REQUEST_QUERIES.observe(stats.queries, **labels)
+            REQUEST_ROWS.observe(stats.rows, **labels)
+
+            if elapsed * 1000 >= SLOW_REQUEST_MS:
+                logger.warning(
+                    "Slow request (%.1f ms, db %.1f ms, %d queries, %d rows): %s %s",
+                    elapsed * 1000, stats.db_time * 1000, stats.queries, stats.rows,
+                    scope["method"], scope["path"],
+                )
@@ -1,29 +1,50 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from datetime import datetime
 from contextlib import asynccontextmanager
 from typing import Dict, Any
-from sqlalchemy import text
 import os
 
 from backend.routes.tools import router as tool_router
 from backend.routes.categories import router as category_router
 from backend.routes.admin import router as admin_router
 from backend.routes.bookmarks_likes import router as bookmark_like_router
+from backend.routes.search import router as search_router
+from backend.routes.me import router as me_router
 
-from .database.database import engine
-from .models import Base  
-
-Base.metadata.create_all(bind=engine)
+from . import health, startup
+from .services import catalog_events, link_checker, tool_analytics, trending
+from .instrumentation import TimingMiddleware, render_metrics
+from .profiling import ProfilingMiddleware
+from .database.replicas import ReadYourWritesMiddleware
 
 # Application lifespan
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup: Add initialization code here
     print("Starting up...")
+    await startup.startup()
+    health_task = asyncio.create_task(health.run_refresher())
+    # Replays catalog changes made by other workers into this worker's caches
+    catalog_task = asyncio.create_task(catalog_events.run_listener())
+    # Batches view/click counts into tool_activity
+    analytics_task = asyncio.create_task(tool_analytics.run_flusher())
+    # Folds new likes/bookmarks/activity into the trending scores
+    trending_task = asyncio.create_task(trending.run_job())
+    # Opt-in (LINK_CHECK_IN_BACKGROUND); usually run from cron instead
+    link_check_task = asyncio.create_task(link_checker.run_checker())
     yield
     # Shutdown: Add cleanup code here
     print("Shutting down...")
+    health_task.cancel()
+    catalog_task.cancel()
+    trending_task.cancel()
+    link_check_task.cancel()
+    analytics_task.cancel()
+    # Wait for its final flush so buffered counts aren't lost
+    await asyncio.gather(analytics_task, return_exceptions=True)
 
 # Create FastAPI app
 app = FastAPI(
@@ -37,6 +58,8 @@ app.include_router(tool_router)
 app.include_router(category_router)
 app.include_router(admin_router)
 app.include_router(bookmark_like_router)
+app.include_router(search_router)
+app.include_router(me_router)
 
 origin = ["http://localhost:5173",
         "http://127.0.0.1:5173",
@@ -51,8 +74,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Keeps clients that just wrote on the primary (no-op without replicas)
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Admin-only opt-in profiling (X-Profile: 1); inside TimingMiddleware so SQL capture works
+app.add_middleware(ProfilingMiddleware)
+
+# Per-request latency / SQL accounting (outermost, so it sees CORS too)
+app.add_middleware(TimingMiddleware)
+
 @app.get("/")
 async def root() -> Dict[str, str]:
     """Root endpoint with basic API information"""
@@ -65,20 +98,31 @@ async def root() -> Dict[str, str]:
 
 @app.get("/health")
 async def health_check() -> Dict[str, Any]:
-    """Health check endpoint for monitoring"""
-    try:
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
-        db_status = "ok"
-    except Exception as e:
-        db_status = f"error: {e}"
+    """Health check endpoint for monitoring (served from the cached status)"""
+    status = health.readiness()
     return {
         "status": "healthy",
-        "db_status": db_status,
+        "db_status": status["dependencies"]["db"]["status"],
         "timestamp": datetime.utcnow().isoformat(),
         "environment": os.getenv("ENV", "development"),
         "version": app.version
     }
 
+@app.get("/health/live")
+async def liveness() -> Dict[str, str]:
+    """Liveness probe: the process is up and the event loop is responsive. No I/O."""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness():
+    """Readiness probe backed by the background-refreshed DB/JWKS status"""
+    status = health.readiness()
+    status["version"] = app.version
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """Request and query histograms in Prometheus text format"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
 
 # app.include_router(some_router, prefix="/api/v1")
\ No newline at end of file
@@ -0,0 +1,95 @@
+from sqlalchemy import inspect, select, update
+from sqlalchemy.schema import CreateColumn
+
+from backend.database.database import get_engine
+from backend.models import Base, Tool
+from backend.services.canonical_url import link_hash
+
+# Columns removed from the models that earlier deploys may have created
+REMOVED_COLUMNS = {
+    "trending_state": ["like_cursor", "bookmark_cursor"],
+}
+
+
+def _add_missing_columns(engine):
+    """
+    create_all only creates whole tables, so columns added to existing models
+    are applied here. Only additive, nullable (or defaulted) columns are
+    supported; anything else needs a hand-written migration.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_sql = CreateColumn(column).compile(dialect=engine.dialect)
+                conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column_sql}")
+                print(f"✓ Added column {table.name}.{column.name}")
+
+
+def _drop_removed_columns(engine):
+    """Drop REMOVED_COLUMNS where they still exist (NOT NULL ones would break inserts)."""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    with engine.begin() as conn:
+        for table_name, column_names in REMOVED_COLUMNS.items():
+            if table_name not in existing_tables:
+                continue
+            existing_columns = {col["name"] for col in inspector.get_columns(table_name)}
+            for column_name in column_names:
+                if column_name in existing_columns:
+                    conn.exec_driver_sql(f"ALTER TABLE {table_name} DROP COLUMN {column_name}")
+                    print(f"✓ Dropped column {table_name}.{column_name}")
+
+
+def _backfill_link_hashes(engine):
+    """
+    Fill tools.link_hash for rows created before the column existed. When two
+    existing tools share a canonical link only the oldest gets the hash (the
+    unique index would reject the rest); the others are reported for review.
+    """
+    with engine.begin() as conn:
+        taken = set(conn.execute(select(Tool.link_hash).where(Tool.link_hash.is_not(None))).scalars())
+        rows = conn.execute(select(Tool.id, Tool.name, Tool.link).where(Tool.link_hash.is_(None)).order_by(Tool.id)).all()
+        for tool_id, name, link in rows:
+            try:
+                digest = link_hash(link)
+            except ValueError as e:
+                print(f"⊘ Tool '{name}' (id {tool_id}) has a malformed link ({e}): {link}")
+                continue
+            if digest in taken:
+                print(f"⊘ Tool '{name}' (id {tool_id}) duplicates an existing link: {link}")
+                continue
+            taken.add(digest)
+            conn.execute(update(Tool).where(Tool.id == tool_id).values(link_hash=digest))
+
+
+def _create_missing_indexes(engine):
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+def run_migrations():
+    """
+    Create missing tables, columns and indexes. Run once per deploy (not per
+    worker):
+
+        python -m backend.migrate
+    """
+    engine = get_engine()
+    Base.metadata.create_all(bind=engine)
+    _add_missing_columns(engine)
+    _drop_removed_columns(engine)
+    _backfill_link_hashes(engine)
+    _create_missing_indexes(engine)
+
+
+if __name__ == "__main__":
+    run_migrations()
+    print("✅ Database schema is up to date.")
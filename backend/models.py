@@ -1,10 +1,12 @@
 from datetime import datetime
-from sqlalchemy import Column, DateTime, Enum, Integer, String, Table, Text, Boolean, TIMESTAMP, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, DateTime, Enum, Float, Index, Integer, String, Table, Text, Boolean, TIMESTAMP, ForeignKey, UniqueConstraint, event, insert, literal, select
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 
+from backend.services.canonical_url import link_hash
+
 Base = declarative_base()
 
 # Association Table for Many-to-Many
@@ -19,14 +21,36 @@ class Tool(Base):
     name = Column(String, unique=True, nullable=False)
     description = Column(Text, nullable=False)
     link = Column(String, nullable=False)
+    # sha256 of the canonicalized link; unique so the same product can't be listed twice
+    link_hash = Column(String(64), unique=True, index=True, nullable=True)
     logo_url = Column(String) # Essential for a visually appealing list
     pricing_type = Column(Enum('free', 'freemium', 'paid', 'contact_us', name='pricing_type_enum'), default='free')
     date_added = Column(DateTime, default=datetime.utcnow)
     is_approved = Column(Boolean, default=False, nullable=False)
+    approved_at = Column(DateTime, nullable=True)  # Set by the moderation routes
     user_id = Column(String, index=True, nullable=False)
+    # Moderation lease: which reviewer is looking at a pending tool, and since when
+    claimed_by = Column(String, nullable=True)
+    claimed_at = Column(DateTime, nullable=True)
+    # Set by the link checker: None (not checked yet), "ok" or "broken"
+    link_status = Column(String(16), nullable=True)
+    logo_status = Column(String(16), nullable=True)
     # Relationship to categories
     categories = relationship("Category", secondary=tool_category_association, back_populates="tools")
 
+    __table_args__ = (
+        # Approval queue: WHERE is_approved = false ORDER BY date_added
+        Index("ix_tools_approval_queue", "is_approved", "date_added"),
+        # GET /me/tools: WHERE user_id = ? AND is_approved = ? ORDER BY date_added DESC, id DESC
+        Index("ix_tools_user_status_date", "user_id", "is_approved", "date_added", "id"),
+    )
+
+    @validates("link")
+    def _set_link_hash(self, key, value):
+        # Keep link_hash in sync for every ORM write path (routes, seed_data)
+        self.link_hash = link_hash(value) if value else None
+        return value
+
 class Category(Base):
     __tablename__ = 'categories'
     id = Column(Integer, primary_key=True)
@@ -44,6 +68,8 @@ class Bookmark(Base):
 
     __table_args__ = (
         UniqueConstraint("user_id", "tool_id", name="uq_bookmark"),
+        # The trending job's first run scores the recent ones
+        Index("ix_bookmarks_created_at", "created_at"),
     )
 
 class Like(Base):
@@ -56,4 +82,129 @@ class Like(Base):
 
     __table_args__ = (
         UniqueConstraint("user_id", "tool_id", name="uq_like"),
-    )
\ No newline at end of file
+        # The trending job's first run scores the recent ones
+        Index("ix_likes_created_at", "created_at"),
+    )
+class CatalogChange(Base):
+    """Change feed workers tail to invalidate their caches (id doubles as the catalog version)."""
+    __tablename__ = "catalog_changes"
+
+    id = Column(Integer, primary_key=True)
+    origin = Column(String(64), nullable=False)  # Worker that made the change
+    tool_ids = Column(Text, nullable=False, default="[]")  # JSON lists, so SQLite works too
+    category_ids = Column(Text, nullable=False, default="[]")
+    # JSON payload of a broadcast message (e.g. an admin feed event) instead of a catalog change
+    message = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class ToolActivity(Base):
+    """Views and outbound clicks per tool per hour, written in batches by tool_analytics."""
+    __tablename__ = "tool_activity"
+
+    id = Column(Integer, primary_key=True)
+    # No foreign key: rows are aggregated off the request path and may outlive the tool
+    tool_id = Column(Integer, nullable=False)
+    hour = Column(DateTime, nullable=False)  # UTC, truncated to the hour
+    views = Column(Integer, nullable=False, default=0)
+    clicks = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("tool_id", "hour", name="uq_tool_activity_hour"),
+        # Trending / time-window scans: WHERE hour >= ? GROUP BY tool_id
+        Index("ix_tool_activity_hour", "hour"),
+    )
+
+class ToolTrending(Base):
+    """
+    Exponentially decayed activity per tool, maintained by services/trending.
+    Scores are stored relative to TrendingState.anchor, so comparing them
+    ranks tools without rewriting every row as time passes.
+    """
+    __tablename__ = "tool_trending"
+
+    tool_id = Column(Integer, primary_key=True)
+    score = Column(Float, nullable=False, default=0.0)  # activity + engagement
+    # Views and clicks, accumulated incrementally
+    activity = Column(Float, nullable=False, default=0.0, server_default="0")
+    # Likes and bookmarks, accumulated incrementally from engagement_events (removals subtract)
+    engagement = Column(Float, nullable=False, default=0.0, server_default="0")
+
+    __table_args__ = (
+        # Top-N load: ORDER BY score DESC LIMIT n
+        Index("ix_tool_trending_score", "score"),
+    )
+
+class TrendingState(Base):
+    """Single row: the score anchor and how far the trending job has read its inputs."""
+    __tablename__ = "trending_state"
+
+    id = Column(Integer, primary_key=True)
+    anchor = Column(DateTime, nullable=False)
+    activity_cursor = Column(DateTime, nullable=False)  # Last tool_activity hour applied
+    # Last engagement_events id applied; None until likes and bookmarks have been scored once
+    engagement_cursor = Column(Integer, nullable=True)
+    # Start of the last run, claimed so one worker runs per interval
+    run_at = Column(DateTime, nullable=True)
+
+class EngagementEvent(Base):
+    """
+    Likes and bookmarks added (sign 1) or removed (sign -1), written by the
+    ORM hooks below in the same transaction and read incrementally by
+    services/trending.
+    """
+    __tablename__ = "engagement_events"
+
+    id = Column(Integer, primary_key=True)
+    tool_id = Column(Integer, nullable=False)
+    kind = Column(String(16), nullable=False)  # "like" or "bookmark"
+    sign = Column(Integer, nullable=False)
+    # created_at of the like/bookmark, so a removal takes back exactly what was added
+    happened_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    recorded_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # Applied events are deleted; ids must still never be reused (the trending cursor is an id)
+    __table_args__ = {"sqlite_autoincrement": True}
+
+class LinkCheck(Base):
+    """Latest health check of one tool URL (its link or logo), maintained by services/link_checker."""
+    __tablename__ = "link_checks"
+
+    id = Column(Integer, primary_key=True)
+    tool_id = Column(Integer, nullable=False)  # No foreign key: orphans are swept by the checker
+    field = Column(String(16), nullable=False)  # "link" or "logo_url"
+    url = Column(String, nullable=False)
+    status_code = Column(Integer, nullable=True)
+    error = Column(String, nullable=True)
+    latency_ms = Column(Float, nullable=True)
+    final_url = Column(String, nullable=True)  # After redirects
+    failures = Column(Integer, nullable=False, default=0)  # Consecutive
+    checked_at = Column(DateTime, nullable=True)
+    next_check_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("tool_id", "field", name="uq_link_check"),
+        # Due checks: WHERE next_check_at <= now ORDER BY next_check_at
+        Index("ix_link_checks_due", "next_check_at"),
+    )
+
+
+def _log_engagement(model, kind: str, sign: int):
+    """Mapper hook that copies the row's tool and created_at into engagement_events."""
+    def hook(mapper, connection, target):
+        # created_at is a server default, so it's read back in SQL rather than from the object
+        connection.execute(
+            insert(EngagementEvent).from_select(
+                ["tool_id", "kind", "sign", "happened_at", "recorded_at"],
+                select(model.tool_id, literal(kind), literal(sign), model.created_at, literal(datetime.utcnow(), DateTime))
+                .where(model.id == target.id),
+            )
+        )
+    return hook
+
+
+# Every ORM write path (the like/bookmark routes) is covered; bulk Core
+# deletes (rejected tools) and inserts (benchmark seeding) are not logged
+for _model, _kind in ((Like, "like"), (Bookmark, "bookmark")):
+    event.listen(_model, "after_insert", _log_engagement(_model, _kind, 1))
+    # Before the DELETE, while the row can still be read
+    event.listen(_model, "before_delete", _log_engagement(_model, _kind, -1))
@@ -0,0 +1,218 @@
+"""
+Opt-in profiling of a single request, for diagnosing slow endpoints in
+production.
+
+Send the request with `X-Profile: 1` (or `?_profile=1`) and an admin bearer
+token. The token is the signature: it is verified like any other and must
+pass `require_admin`. While the request runs, a sampler thread records the
+Python stacks of the event loop thread and of every thread running app
+code, every PROFILE_INTERVAL_MS. Each SQL statement is captured with its
+duration and row count. The report is written to PROFILE_DIR and its id
+comes back in the `X-Profile-Id` response header. Fetch it from
+`GET /admin/profiles/{id}` as JSON, or with `?format=folded` as collapsed
+stacks for flamegraph.pl or speedscope.
+
+Requests without the flag pay for one header scan. Stacks from other
+requests running in the same worker at the same time are included too
+(each stack is rooted at its thread's name).
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from functools import lru_cache
+from typing import List, Optional
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+from backend import auth
+from backend.instrumentation import capture_statements
+
+# --- Configuration ---
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "data/profiles")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "2"))
+# The sampler stops after this, even if the request is still running
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "30"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9A-Za-z-]+$")
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+_SITE_ROOT = os.path.dirname(_APP_DIR)
+
+
+@lru_cache(maxsize=4096)
+def _file_info(filename: str):
+    """(is app code, display name); co_filename may be relative, depending on sys.path."""
+    path = os.path.abspath(filename)
+    if path.startswith(_APP_DIR + os.sep):
+        return True, os.path.relpath(path, _SITE_ROOT)
+    return False, os.path.basename(path)
+
+
+class Profile:
+    def __init__(self, method: str, path: str):
+        self.id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.method = method
+        self.path = path
+        self.started_at = time.time()
+        self.duration_ms = 0.0
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self.statements: Optional[list] = None
+        self._loop_thread = threading.get_ident()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, name="request-profiler", daemon=True)
+
+    def start(self):
+        self.statements = capture_statements()
+        self._started = time.perf_counter()
+        self._sampler.start()
+
+    def stop(self):
+        self.duration_ms = (time.perf_counter() - self._started) * 1000
+        self._stop.set()
+        self._sampler.join()
+
+    def _sample(self):
+        own = threading.get_ident()
+        deadline = time.monotonic() + PROFILE_MAX_SECONDS
+        interval = PROFILE_INTERVAL_MS / 1000
+        while not self._stop.wait(interval) and time.monotonic() < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack: List[str] = []
+                in_app = thread_id == self._loop_thread
+                while frame is not None:
+                    code = frame.f_code
+                    is_app, filename = _file_info(code.co_filename)
+                    in_app = in_app or is_app
+                    stack.append(f"{code.co_name} ({filename}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if in_app:
+                    stack.append(names.get(thread_id, str(thread_id)))
+                    self.stacks[";".join(reversed(stack))] += 1
+
+    def report(self) -> dict:
+        statements = [
+            {"sql": " ".join(sql.split()), "ms": round(elapsed * 1000, 3), "rows": rows}
+            for sql, elapsed, rows in (self.statements or [])
+        ]
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 2),
+            "interval_ms": PROFILE_INTERVAL_MS,
+            "samples": self.samples,
+            "sql": statements,
+            "sql_ms": round(sum(s["ms"] for s in statements), 2),
+            "folded": [f"{stack} {count}" for stack, count in self.stacks.most_common()],
+        }
+
+
+# --- Storage ---
+
+def save(profile: Profile):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"{profile.id}.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump(profile.report(), f)
+    os.replace(path + ".tmp", path)
+
+    reports = sorted(name for name in os.listdir(PROFILE_DIR) if name.endswith(".json"))
+    for old in reports[:-PROFILE_KEEP]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, old))
+        except OSError:
+            pass
+
+
+def load(profile_id: str) -> Optional[dict]:
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    try:
+        with open(os.path.join(PROFILE_DIR, f"{profile_id}.json")) as f:
+            return json.load(f)
+    except OSError:
+        return None
+
+
+def list_profiles() -> List[dict]:
+    """Summaries of the stored reports, newest first."""
+    try:
+        names = sorted((n for n in os.listdir(PROFILE_DIR) if n.endswith(".json")), reverse=True)
+    except OSError:
+        return []
+    summaries = []
+    for name in names:
+        report = load(name[:-len(".json")])
+        if report:
+            summaries.append({
+                key: report[key] for key in ("id", "method", "path", "started_at", "duration_ms", "sql_ms", "samples")
+            } | {"queries": len(report["sql"])})
+    return summaries
+
+
+# --- ASGI middleware ---
+
+def _requested(scope) -> Optional[str]:
+    """The bearer token if this request asks to be profiled, "" if it asks without one, else None."""
+    wants = b"_profile=" in scope["query_string"] and parse_qs(scope["query_string"].decode("latin-1")).get("_profile") == ["1"]
+    authorization = b""
+    for name, value in scope["headers"]:
+        if name == b"x-profile":
+            wants = wants or value == b"1"
+        elif name == b"authorization":
+            authorization = value
+    if not wants:
+        return None
+    return authorization[7:].decode("latin-1") if authorization[:7].lower() == b"bearer " else ""
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        token = _requested(scope) if scope["type"] == "http" else None
+        if token is None:
+            await self.app(scope, receive, send)
+            return
+
+        from backend.routes.admin import require_admin
+
+        try:
+            if not token:
+                raise HTTPException(status_code=401, detail="Profiling requires an admin token")
+            require_admin(await auth.get_current_user(token))
+        except HTTPException as e:
+            await JSONResponse({"detail": e.detail}, status_code=e.status_code)(scope, receive, send)
+            return
+
+        profile = Profile(scope["method"], scope["path"])
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile.id.encode())]
+            await send(message)
+
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profile.stop()
+            try:
+                save(profile)
+            except OSError as e:
+                print(f"Could not save profile {profile.id}: {e}")
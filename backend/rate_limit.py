@@ -0,0 +1,196 @@
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, status
+
+from backend.auth import get_current_user
+
+# --- Configuration ---
+
+# route name -> (burst capacity, seconds to refill the whole bucket)
+# Override per route with e.g. RATE_LIMIT_CREATE_TOOL="10/3600".
+DEFAULT_LIMITS: Dict[str, Tuple[int, float]] = {
+    "create_tool": (10, 3600),
+    "extract": (20, 60),
+    "toggle_like": (60, 60),
+    "toggle_bookmark": (60, 60),
+    "record_click": (30, 60),
+}
+
+# Only trust X-Forwarded-For when running behind a proxy that sets it
+TRUST_FORWARDED_FOR = os.getenv("TRUST_FORWARDED_FOR", "false").lower() == "true"
+
+
+# route name -> (override as last read, limit it parsed to)
+_overrides: Dict[str, Tuple[str, Tuple[int, float]]] = {}
+
+
+def _parse_override(route_name: str, override: str) -> Tuple[int, float]:
+    try:
+        capacity, period = override.split("/")
+        capacity, period = int(capacity), float(period)
+        if capacity < 1 or not (0 < period < math.inf):
+            raise ValueError
+        return capacity, period
+    except ValueError:
+        default = DEFAULT_LIMITS[route_name]
+        print(f"Ignoring invalid RATE_LIMIT_{route_name.upper()}={override!r} (expected e.g. \"10/3600\"); using {default[0]}/{default[1]:g}")
+        return default
+
+
+def get_limit(route_name: str) -> Tuple[int, float]:
+    override = os.getenv(f"RATE_LIMIT_{route_name.upper()}")
+    if not override:
+        return DEFAULT_LIMITS[route_name]
+    cached = _overrides.get(route_name)
+    if cached is None or cached[0] != override:
+        # Parsed (and warned about) once per value, not on every request
+        cached = _overrides[route_name] = (override, _parse_override(route_name, override))
+    return cached[1]
+
+
+# --- Stores ---
+
+class RateLimitStore(ABC):
+    """
+    Interface for token-bucket state. `consume` must be atomic per key and
+    return (allowed, seconds until one token is available).
+    """
+
+    @abstractmethod
+    def consume(self, key: str, capacity: int, refill_per_second: float) -> Tuple[bool, float]:
+        ...
+
+
+def _refill(tokens: float, updated: float, now: float, capacity: int, refill_per_second: float) -> float:
+    return min(capacity, tokens + (now - updated) * refill_per_second)
+
+
+class InMemoryStore(RateLimitStore):
+    """Per-process buckets. Limits are per worker when running several workers."""
+
+    SWEEP_EVERY = 1000
+
+    def __init__(self):
+        # key -> (tokens, last update, time the bucket will be full again)
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+        self._ops = 0
+
+    def consume(self, key, capacity, refill_per_second):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated, _ = self._buckets.get(key, (capacity, now, now))
+            tokens = _refill(tokens, updated, now, capacity, refill_per_second)
+            if tokens >= 1:
+                tokens -= 1
+                allowed, retry_after = True, 0.0
+            else:
+                allowed, retry_after = False, (1 - tokens) / refill_per_second
+            full_at = now + (capacity - tokens) / refill_per_second
+            self._buckets[key] = (tokens, now, full_at)
+
+            self._ops += 1
+            if self._ops % self.SWEEP_EVERY == 0:
+                self._sweep(now)
+        return allowed, retry_after
+
+    def _sweep(self, now: float):
+        # A bucket that has refilled completely is identical to a missing one
+        for key in [k for k, (_, _, full_at) in self._buckets.items() if full_at <= now]:
+            del self._buckets[key]
+
+
+class SharedStore(RateLimitStore):
+    """
+    Buckets kept in a shared key-value store so all workers enforce one limit.
+
+    `client` needs `get(key) -> Optional[tuple]` and
+    `compare_and_set(key, expected, new) -> bool`, which maps onto Redis
+    WATCH/MULTI or a Lua script. Updates are retried optimistically.
+    """
+
+    def __init__(self, client, max_retries: int = 5):
+        self.client = client
+        self.max_retries = max_retries
+
+    def consume(self, key, capacity, refill_per_second):
+        for _ in range(self.max_retries):
+            now = time.time()
+            current = self.client.get(key)
+            tokens, updated = current if current is not None else (capacity, now)
+            tokens = _refill(tokens, updated, now, capacity, refill_per_second)
+            if tokens >= 1:
+                new, allowed, retry_after = (tokens - 1, now), True, 0.0
+            else:
+                new, allowed, retry_after = (tokens, now), False, (1 - tokens) / refill_per_second
+            if self.client.compare_and_set(key, current, new):
+                return allowed, retry_after
+        # Heavy contention on one key: fail closed for this request
+        return False, 1.0 / refill_per_second
+
+
+class LocalFakeSharedClient:
+    """In-process stand-in for a shared store, for local runs and benchmarks."""
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[Tuple[float, float]]:
+        return self._data.get(key)
+
+    def compare_and_set(self, key, expected, new) -> bool:
+        with self._lock:
+            if self._data.get(key) != expected:
+                return False
+            self._data[key] = new
+            return True
+
+
+_store: RateLimitStore = InMemoryStore()
+
+
+def set_store(store: RateLimitStore):
+    """Swap the backend, e.g. `set_store(SharedStore(redis_adapter))` at startup."""
+    global _store
+    _store = store
+
+
+# --- Dependencies ---
+
+def client_ip(request: Request) -> str:
+    if TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def _check(route_name: str, identity: str):
+    capacity, period = get_limit(route_name)
+    allowed, retry_after = _store.consume(f"{route_name}:{identity}", capacity, capacity / period)
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, please slow down",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+def rate_limit(route_name: str):
+    """Token bucket keyed by the Clerk user id (reuses the route's auth dependency)."""
+    def dependency(user_id: str = Depends(get_current_user)):
+        _check(route_name, f"user:{user_id}")
+    return dependency
+
+
+def rate_limit_by_ip(route_name: str):
+    """Token bucket keyed by client IP, for routes that don't require a login."""
+    def dependency(request: Request):
+        _check(route_name, f"ip:{client_ip(request)}")
+    return dependency
@@ -1,15 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+import os
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
-from backend.auth import get_current_user
+from backend import profiling
+from backend.auth import get_current_user, get_stream_user
 from backend.database.database import get_db
-from backend.models import Tool as ToolModel
-from backend.schemas import Tool, ToolBase
+from backend.database.replicas import get_read_db
+from backend.models import Bookmark, Like, Tool as ToolModel, tool_category_association
+from backend.schemas import AdminStats, BulkModerationRequest, BulkModerationResult, Tool, ToolBase
+from backend.services import admin_feed, admin_stats, catalog_events, catalog_export, similar_index
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 # --- CONFIGURATION ---
 ADMIN_USER_ID = "user_358uhfB0Qi2yobJpykzod0H7SaK" 
+# How long a moderator's claim on pending tools lasts before others can take them
+CLAIM_LEASE_SECONDS = int(os.getenv("CLAIM_LEASE_SECONDS", "900"))
 
 # --- ADMIN CHECK DEPENDENCY ---
 def require_admin(user_id: str = Depends(get_current_user)):
@@ -23,6 +32,48 @@ def require_admin(user_id: str = Depends(get_current_user)):
         )
     return user_id
 
+def require_admin_stream(user_id: str = Depends(get_stream_user)):
+    """require_admin for the SSE feed, which browsers can't send headers to."""
+    return require_admin(user_id)
+
+def get_reviewer(
+    admin_id: str = Depends(require_admin),
+    x_reviewer: Optional[str] = Header(None, description="Distinguishes moderators/dashboards sharing the admin account"),
+) -> str:
+    return f"{admin_id}:{x_reviewer}" if x_reviewer else admin_id
+
+# --- QUEUE HELPERS ---
+def _claimable_by(reviewer: str):
+    """Pending tools that are unclaimed, already ours, or whose lease has expired."""
+    lease_cutoff = datetime.utcnow() - timedelta(seconds=CLAIM_LEASE_SECONDS)
+    return or_(
+        ToolModel.claimed_by.is_(None),
+        ToolModel.claimed_by == reviewer,
+        ToolModel.claimed_at < lease_cutoff,
+    )
+
+def _locked_pending_ids(req: BulkModerationRequest, reviewer: str, claimed_only: bool = False):
+    """
+    SELECT of the pending tool IDs a bulk request targets, locked with
+    FOR UPDATE SKIP LOCKED so concurrent moderators never touch the same rows.
+    claimed_only narrows it to the reviewer's own claims.
+    """
+    if not req.ids and not req.filter:
+        raise HTTPException(status_code=400, detail="Provide either ids or filter")
+
+    ownership = ToolModel.claimed_by == reviewer if claimed_only else _claimable_by(reviewer)
+    query = select(ToolModel.id).where(ToolModel.is_approved == False, ownership)
+    if req.ids:
+        query = query.where(ToolModel.id.in_(req.ids))
+    if req.filter:
+        if req.filter.user_id:
+            query = query.where(ToolModel.user_id == req.filter.user_id)
+        if req.filter.added_after:
+            query = query.where(ToolModel.date_added >= req.filter.added_after)
+        if req.filter.added_before:
+            query = query.where(ToolModel.date_added < req.filter.added_before)
+    return query.order_by(ToolModel.date_added).limit(req.limit).with_for_update(skip_locked=True)
+
 # --- ROUTES ---
 
 @router.get("/pending-tools", response_model=List[Tool])
@@ -48,9 +99,17 @@ def approve_tool(tool_id: int, db: Session = Depends(get_db), admin_id: str = De
     if not tool:
         raise HTTPException(status_code=404, detail="Tool not found")
     
+    was_approved = tool.is_approved
     tool.is_approved = True
+    if not was_approved:
+        tool.approved_at = datetime.utcnow()
     db.commit()
     db.refresh(tool)
+    if not was_approved:
+        admin_stats.record_approved()
+    similar_index.add_tools(db, [tool.id])
+    catalog_events.publish(tool_ids=[tool.id])
+    admin_feed.publish("approved", [tool.id])
     return tool
 
 @router.delete("/tools/{tool_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -62,6 +121,178 @@ def reject_tool(tool_id: int, db: Session = Depends(get_db), admin_id: str = Dep
     if not tool:
         raise HTTPException(status_code=404, detail="Tool not found")
     
+    was_approved = tool.is_approved
     db.delete(tool)
     db.commit()
-    return None
\ No newline at end of file
+    admin_stats.record_deleted(approved=was_approved)
+    catalog_events.publish(tool_ids=[tool_id])
+    admin_feed.publish("rejected", [tool_id])
+    return None
+
+@router.post("/pending-tools/claim", response_model=List[Tool])
+def claim_pending_tools(
+    limit: int = Query(10, le=100),
+    db: Session = Depends(get_db),
+    reviewer: str = Depends(get_reviewer),
+):
+    """
+    Claim the oldest unclaimed pending tools for review. Claimed tools are
+    skipped by other moderators' claims until the lease expires.
+    """
+    claimable = (
+        select(ToolModel.id)
+        .where(ToolModel.is_approved == False, _claimable_by(reviewer))
+        .order_by(ToolModel.date_added)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    claimed_ids = db.execute(
+        update(ToolModel)
+        .where(ToolModel.id.in_(claimable))
+        .values(claimed_by=reviewer, claimed_at=datetime.utcnow())
+        .returning(ToolModel.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    db.commit()
+
+    if not claimed_ids:
+        return []
+    return (
+        db.query(ToolModel)
+        .options(selectinload(ToolModel.categories))
+        .filter(ToolModel.id.in_(claimed_ids))
+        .order_by(ToolModel.date_added)
+        .all()
+    )
+
+@router.post("/pending-tools/release", response_model=BulkModerationResult)
+def release_pending_tools(
+    req: BulkModerationRequest,
+    db: Session = Depends(get_db),
+    reviewer: str = Depends(get_reviewer),
+):
+    """Give claimed tools back to the queue without acting on them, by ID list or filter."""
+    released = db.execute(
+        update(ToolModel)
+        .where(ToolModel.id.in_(_locked_pending_ids(req, reviewer, claimed_only=True)))
+        .values(claimed_by=None, claimed_at=None)
+        .returning(ToolModel.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    db.commit()
+    return BulkModerationResult(count=len(released), ids=released)
+
+@router.post("/tools/bulk-approve", response_model=BulkModerationResult)
+def bulk_approve_tools(
+    req: BulkModerationRequest,
+    db: Session = Depends(get_db),
+    reviewer: str = Depends(get_reviewer),
+):
+    """
+    Approve many pending tools in one UPDATE, by ID list or filter.
+    Tools claimed by another moderator are skipped.
+    """
+    approved = db.execute(
+        update(ToolModel)
+        .where(ToolModel.id.in_(_locked_pending_ids(req, reviewer)))
+        .values(is_approved=True, approved_at=datetime.utcnow(), claimed_by=None, claimed_at=None)
+        .returning(ToolModel.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    db.commit()
+    admin_stats.record_approved(len(approved))
+    similar_index.add_tools(db, approved)
+    catalog_events.publish(tool_ids=approved)
+    admin_feed.publish("approved", approved)
+    return BulkModerationResult(count=len(approved), ids=approved)
+
+@router.post("/tools/bulk-reject", response_model=BulkModerationResult)
+def bulk_reject_tools(
+    req: BulkModerationRequest,
+    db: Session = Depends(get_db),
+    reviewer: str = Depends(get_reviewer),
+):
+    """
+    Reject (delete) many pending tools, by ID list or filter, with a fixed
+    number of set-based DELETEs. Tools claimed by another moderator are skipped.
+    """
+    ids = db.execute(_locked_pending_ids(req, reviewer)).scalars().all()
+    if ids:
+        # Rows referencing the tools go first to satisfy the foreign keys
+        db.execute(delete(tool_category_association).where(tool_category_association.c.tool_id.in_(ids)))
+        db.execute(delete(Like).where(Like.tool_id.in_(ids)))
+        db.execute(delete(Bookmark).where(Bookmark.tool_id.in_(ids)))
+        db.execute(
+            delete(ToolModel).where(ToolModel.id.in_(ids)).execution_options(synchronize_session=False)
+        )
+    db.commit()
+    admin_stats.record_rejected(len(ids))
+    catalog_events.publish(tool_ids=ids)
+    admin_feed.publish("rejected", ids)
+    return BulkModerationResult(count=len(ids), ids=ids)
+
+@router.get("/stats", response_model=AdminStats)
+def get_stats(db: Session = Depends(get_read_db), admin_id: str = Depends(require_admin)):
+    """
+    Pending/approved totals (kept up to date in memory) plus approvals per
+    day, top submitters and likes per category (cached for a minute).
+    """
+    return admin_stats.get_stats(db)
+
+@router.get("/profiles")
+def list_profiles(admin_id: str = Depends(require_admin)):
+    """Stored request profiles (send a request with X-Profile: 1 to create one), newest first"""
+    return profiling.list_profiles()
+
+@router.get("/profiles/{profile_id}")
+def get_profile(
+    profile_id: str,
+    format: str = Query("json", pattern="^(json|folded)$"),
+    admin_id: str = Depends(require_admin),
+):
+    """
+    A stored profile: SQL statements with timings plus sampled stacks.
+    format=folded returns the stacks in collapsed form for flamegraph.pl or speedscope.
+    """
+    report = profiling.load(profile_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "folded":
+        return PlainTextResponse("\n".join(report["folded"]) + "\n")
+    return report
+
+@router.get("/export")
+def export_catalog(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|json)$"),
+    include_pending: bool = False,
+    admin_id: str = Depends(require_admin),
+):
+    """
+    Stream the whole catalog as NDJSON, CSV or a JSON array. Rows come from a
+    server-side cursor, so memory use doesn't grow with the catalog. The output
+    can be fed back to bulk_imports.py.
+    """
+    filename = f"tools-{datetime.utcnow():%Y%m%d%H%M%S}.{format}"
+    return StreamingResponse(
+        catalog_export.stream_export(format, include_pending),
+        media_type=catalog_export.FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@router.get("/events")
+async def moderation_events(
+    request: Request,
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID"),
+    admin_id: str = Depends(require_admin_stream),
+):
+    """
+    Server-Sent Events feed of submitted, approved and rejected tools, so the
+    dashboard doesn't have to poll /admin/pending-tools. Reconnects resume
+    from Last-Event-ID; a `reset` event means "refetch the queue".
+    Browsers' EventSource can pass the token as ?access_token=.
+    """
+    return StreamingResponse(
+        admin_feed.stream(last_event_id, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -6,14 +6,16 @@ from sqlalchemy import and_
 from fastapi import FastAPI
 
 from backend.database.database import get_db
+from backend.database.replicas import get_read_db
 from backend.models import Bookmark, Like, Tool
 from backend.auth import get_current_user
+from backend.rate_limit import rate_limit
 from backend.schemas import BookmarkCreate, BookmarkOut, LikeCreate, LikeOut
 
 router = APIRouter(prefix="", tags=["Bookmarks and Likes"])
 
 
-@router.post("/bookmarks/", response_model=BookmarkOut, status_code=status.HTTP_201_CREATED)
+@router.post("/bookmarks/", response_model=BookmarkOut, status_code=status.HTTP_201_CREATED, dependencies=[Depends(rate_limit("toggle_bookmark"))])
 def create_bookmark(
     payload: BookmarkCreate,
     db: Session = Depends(get_db),                 
@@ -52,7 +54,7 @@ def create_bookmark(
 @router.get("/bookmarks/", response_model=List[BookmarkOut])
 def list_bookmarks(
     tool_id: Optional[int] = None,
-    db: Session = Depends(get_db),                 
+    db: Session = Depends(get_read_db),                 
     user_id: str = Depends(get_current_user),
 ):
     q = db.query(Bookmark).filter(Bookmark.user_id == user_id)
@@ -65,7 +67,7 @@ def list_bookmarks(
 @router.get("/bookmarks/check", response_model=dict)
 def check_bookmark_exists(
     tool_id: Optional[int] = None,
-    db: Session = Depends(get_db),                 
+    db: Session = Depends(get_read_db),                 
     user_id: str = Depends(get_current_user),
 ):
     if tool_id is None:
@@ -96,7 +98,7 @@ def delete_bookmark(
 
 
 # Optional convenience toggle endpoint
-@router.post("/tools/{tool_id}/bookmark", response_model=BookmarkOut)
+@router.post("/tools/{tool_id}/bookmark", response_model=BookmarkOut, dependencies=[Depends(rate_limit("toggle_bookmark"))])
 def toggle_tool_bookmark(
     tool_id: int,
     db: Session = Depends(get_db),                
@@ -121,7 +123,7 @@ def toggle_tool_bookmark(
 
 
 # ---------- Likes: mirrored endpoints ----------
-@router.post("/likes/", response_model=LikeOut, status_code=status.HTTP_201_CREATED)
+@router.post("/likes/", response_model=LikeOut, status_code=status.HTTP_201_CREATED, dependencies=[Depends(rate_limit("toggle_like"))])
 def create_like(
     payload: LikeCreate,
     db: Session = Depends(get_db),                 
@@ -153,7 +155,7 @@ def create_like(
 @router.get("/likes/", response_model=List[LikeOut])
 def list_likes(
     tool_id: Optional[int] = None,
-    db: Session = Depends(get_db),                 
+    db: Session = Depends(get_read_db),                 
     user_id: str = Depends(get_current_user),
 ):
     q = db.query(Like).filter(Like.user_id == user_id)
@@ -166,7 +168,7 @@ def list_likes(
 @router.get("/likes/check", response_model=dict)
 def check_like_exists(
     tool_id: Optional[int] = None,
-    db: Session = Depends(get_db),                 
+    db: Session = Depends(get_read_db),                 
     user_id: str = Depends(get_current_user),
 ):
     if tool_id is None:
@@ -192,7 +194,7 @@ def delete_like(
 
 
 # Optional convenience toggle endpoint for tool likes
-@router.post("/tools/{tool_id}/like", response_model=LikeOut)
+@router.post("/tools/{tool_id}/like", response_model=LikeOut, dependencies=[Depends(rate_limit("toggle_like"))])
 def toggle_tool_like(
     tool_id: int,
     db: Session = Depends(get_db),                 
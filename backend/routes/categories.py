@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional
 from backend.database.database import get_db
+from backend.database.replicas import get_read_db
 from backend.models import Category as CategoryModel, Tool as ToolModel
-from backend.schemas import Category, CategoryCreate, CategoryUpdate, CategoryWithToolCount
+from backend.schemas import Category, CategoryCreate, CategoryUpdate, CategoryWithToolCount, Tool
 from sqlalchemy import func
+from backend.services import catalog_events, catalog_snapshot, category_registry, tool_fields
 
 router = APIRouter(prefix="/categories", tags=["categories"])
 
@@ -12,9 +14,13 @@ router = APIRouter(prefix="/categories", tags=["categories"])
 def get_all_categories(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all categories with tool count"""
+    snapshot = catalog_snapshot.get_snapshot()
+    if snapshot:
+        return snapshot.categories(skip, limit)
+
     categories = db.query(
         CategoryModel,
         func.count(ToolModel.id).label('tool_count')
@@ -34,7 +40,7 @@ def get_all_categories(
     ]
 
 @router.get("/{category_id}", response_model=Category)
-def get_category(category_id: int, db: Session = Depends(get_db)):
+def get_category(category_id: int, db: Session = Depends(get_read_db)):
     """Get a specific category by ID"""
     category = db.query(CategoryModel).filter(CategoryModel.id == category_id).first()
     if not category:
@@ -59,6 +65,8 @@ def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
     db.add(db_category)
     db.commit()
     db.refresh(db_category)
+    category_registry.register(db_category.id, db_category.name)
+    catalog_events.publish(category_ids=[db_category.id])
     return db_category
 
 @router.put("/{category_id}", response_model=Category)
@@ -90,6 +98,8 @@ def update_category(
     
     db.commit()
     db.refresh(db_category)
+    category_registry.register(category_id, db_category.name)
+    catalog_events.publish(category_ids=[category_id])
     return db_category
 
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -104,16 +114,19 @@ def delete_category(category_id: int, db: Session = Depends(get_db)):
     
     db.delete(db_category)
     db.commit()
+    category_registry.forget(category_id)
+    catalog_events.publish(category_ids=[category_id])
     return None
 
-@router.get("/{category_id}/tools", response_model=List[dict])
+@router.get("/{category_id}/tools", response_model=List[Tool])
 def get_tools_by_category(
     category_id: int,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    fields: Optional[List[str]] = Depends(tool_fields.parse_fields),
+    db: Session = Depends(get_read_db)
 ):
-    """Get all tools in a specific category"""
+    """Get all tools in a specific category (fields=card for a compact projection)"""
     category = db.query(CategoryModel).filter(CategoryModel.id == category_id).first()
     if not category:
         raise HTTPException(
@@ -121,10 +134,12 @@ def get_tools_by_category(
             detail=f"Category with id {category_id} not found"
         )
     
-    tools = db.query(ToolModel).join(
+    query = db.query(ToolModel).join(
         CategoryModel.tools
     ).filter(
         CategoryModel.id == category_id
-    ).offset(skip).limit(limit).all()
-    
-    return tools
\ No newline at end of file
+    ).offset(skip).limit(limit)
+
+    if fields:
+        return tool_fields.response(tool_fields.fetch(db, query, fields))
+    return query.options(selectinload(ToolModel.categories)).all()
\ No newline at end of file
@@ -0,0 +1,68 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session, selectinload
+
+from backend.auth import get_current_user
+from backend.database.replicas import get_read_db
+from backend.models import Tool as ToolModel
+from backend.schemas import MyToolsPage, SubmissionStatus
+
+router = APIRouter(prefix="/me", tags=["me"])
+
+
+def _encode_cursor(tool: ToolModel) -> str:
+    raw = json.dumps([tool.date_added.isoformat(), tool.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date_added, tool_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(date_added), int(tool_id)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def _page(db: Session, user_id: str, approved: bool, after: Optional[Tuple[datetime, int]], limit: int) -> List[ToolModel]:
+    """One range scan of ix_tools_user_status_date, newest first."""
+    query = db.query(ToolModel).filter(ToolModel.user_id == user_id, ToolModel.is_approved == approved)
+    if after:
+        query = query.filter(tuple_(ToolModel.date_added, ToolModel.id) < after)
+    return (
+        query.options(selectinload(ToolModel.categories))
+        .order_by(ToolModel.date_added.desc(), ToolModel.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+@router.get("/tools", response_model=MyToolsPage)
+def list_my_tools(
+    status_filter: Optional[SubmissionStatus] = Query(None, alias="status", description="pending or approved; both when omitted"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+    user_id: str = Depends(get_current_user),
+):
+    """
+    The caller's submitted tools with their approval status, newest first.
+    Keyset-paginated, so every page costs the same however deep it is.
+    """
+    after = _decode_cursor(cursor) if cursor else None
+    statuses = [status_filter == SubmissionStatus.approved] if status_filter else [False, True]
+
+    # Without a filter, each status is its own index range; merge the two
+    tools = []
+    for approved in statuses:
+        tools.extend(_page(db, user_id, approved, after, limit + 1))
+    tools.sort(key=lambda t: (t.date_added, t.id), reverse=True)
+
+    items = tools[:limit]
+    next_cursor = _encode_cursor(items[-1]) if len(tools) > limit else None
+    return MyToolsPage(items=items, next_cursor=next_cursor)
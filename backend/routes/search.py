@@ -0,0 +1,24 @@
+from fastapi import APIRouter, HTTPException, Query, status
+from typing import List
+from backend.schemas import Suggestion
+from backend.services.suggest_index import get_suggest_index
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+@router.get("/suggest", response_model=List[Suggestion])
+def suggest(
+    q: str = Query(..., min_length=1, max_length=100, description="Prefix typed so far"),
+    limit: int = Query(8, ge=1, le=20),
+):
+    """
+    Typeahead over approved tool names and category names, most popular first.
+    Served from an in-memory index; never queries the database per keystroke.
+    """
+    index = get_suggest_index()
+    if index is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Suggestions are not available yet",
+            headers={"Retry-After": "5"},
+        )
+    return [entry._asdict() for entry in index.suggest(q, limit)]
@@ -1,16 +1,61 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 import requests
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, insert, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
-from backend.database.database import get_db
-from backend.models import Tool as ToolModel, Category as CategoryModel
-from backend.schemas import CompareRequest, Tool, ToolCreate, ToolUpdate, PricingType, ExtractRequest
-from backend.auth import get_current_user
-from backend.services import scrape_details
+from backend.database.database import dialect_insert, get_db
+from backend.database.replicas import get_read_db
+from backend.models import Tool as ToolModel, tool_category_association
+from backend.schemas import CategoryMode, CompareRequest, FacetCounts, FacetedToolList, Tool, ToolCreate, ToolDetail, ToolSort, ToolUpdate, PricingType, ExtractRequest
+from backend.auth import get_current_user, get_optional_user
+from backend.rate_limit import client_ip, rate_limit, rate_limit_by_ip
+from backend.services import admin_feed, admin_stats, catalog_events, category_registry, catalog_snapshot, facet_index, scrape_details, similar_index, tool_analytics, tool_detail, tool_fields, trending
+from backend.services.canonical_url import link_hash
 
 
 router = APIRouter(prefix="/tools", tags=["tools"])
 
+def _search_ids(db: Session, search: str) -> List[int]:
+    search_filter = f"%{search}%"
+    return [
+        row.id for row in db.query(ToolModel.id).filter(
+            ToolModel.is_approved == True,
+            (ToolModel.name.ilike(search_filter)) |
+            (ToolModel.description.ilike(search_filter))
+        )
+    ]
+
+def _facet_selection(
+    db: Session,
+    category_ids: List[int],
+    category_mode: CategoryMode,
+    pricing_types: List[PricingType],
+    search: Optional[str],
+):
+    """
+    Resolve the filters to bitsets on the facet index. Returns the index, the
+    result bits, and the bits without the category / pricing filter (used for
+    "what would this facet add" counts).
+    """
+    index = facet_index.get_facet_index()
+    base = index.bits_for_ids(_search_ids(db, search)) if search else index.all_bits
+    category_bits = index.category_filter(category_ids, category_mode.value) if category_ids else index.all_bits
+    pricing_bits = index.pricing_filter([p.value for p in pricing_types]) if pricing_types else index.all_bits
+    return index, base & category_bits & pricing_bits, base & pricing_bits, base & category_bits
+
+def _load_ordered(db: Session, tool_ids: List[int]) -> List[ToolModel]:
+    if not tool_ids:
+        return []
+    tools = (
+        db.query(ToolModel)
+        .options(selectinload(ToolModel.categories))
+        .filter(ToolModel.id.in_(tool_ids))
+        .all()
+    )
+    tools_by_id = {t.id: t for t in tools}
+    return [tools_by_id[i] for i in tool_ids if i in tools_by_id]
+
 @router.get("/", response_model=List[Tool])
 def get_all_tools(
     skip: int = 0,
@@ -18,24 +63,50 @@ def get_all_tools(
     category_id: Optional[int] = Query(None, description="Filter by category ID"),
     pricing_type: Optional[PricingType] = Query(None, description="Filter by pricing type"),
     search: Optional[str] = Query(None, description="Search in name or description"),
-    db: Session = Depends(get_db)
+    category_ids: List[int] = Query([], description="Filter by several categories (repeat the parameter)"),
+    category_mode: CategoryMode = Query(CategoryMode.any, description="Match any ('or') or all ('and') of category_ids"),
+    pricing_types: List[PricingType] = Query([], description="Filter by several pricing types (repeat the parameter)"),
+    sort: ToolSort = Query(ToolSort.id, description="Order by id (default) or trending score"),
+    hide_broken_links: bool = Query(False, description="Leave out tools whose link the link checker found dead"),
+    fields: Optional[List[str]] = Depends(tool_fields.parse_fields),
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all tools with optional filters:
-    - category_id: Filter by specific category
-    - pricing_type: Filter by pricing type (free, freemium, paid, contact_us)
+    - category_id / category_ids: Filter by one or several categories (category_mode=or|and)
+    - pricing_type / pricing_types: Filter by pricing type (free, freemium, paid, contact_us)
     - search: Search in tool name or description
+    - sort: trending ranks by recently decayed likes, bookmarks, views and clicks
+    - hide_broken_links: Skip tools with link_status "broken" (every tool carries link_status / logo_status)
+    - fields: Only return these fields (e.g. fields=card)
     """
+    category_ids = category_ids + ([category_id] if category_id else [])
+    pricing_types = pricing_types + ([pricing_type] if pricing_type else [])
+    # Shared memory-mapped copy of the catalog, when it is current for this worker
+    snapshot = catalog_snapshot.get_snapshot()
+
+    # Category/pricing/link filters and trending order are answered from the in-memory bitmap index
+    if category_ids or pricing_types or sort == ToolSort.trending or hide_broken_links:
+        index, bits, _, _ = _facet_selection(db, category_ids, category_mode, pricing_types, search)
+        if hide_broken_links:
+            bits &= ~index.broken_bits
+        if sort == ToolSort.trending:
+            tool_ids = trending.ranked_ids(index, bits, skip, limit)
+        else:
+            tool_ids = index.ids(bits, skip, limit)
+        records = snapshot.tools_by_ids(tool_ids, fields) if snapshot else None
+        if records is not None:
+            return tool_fields.response(records) if fields else records
+        if fields:
+            return tool_fields.response(tool_fields.fetch_ordered(db, tool_ids, fields))
+        return _load_ordered(db, tool_ids)
+
+    if snapshot and not search:
+        records = snapshot.tools(skip, limit, fields)
+        return tool_fields.response(records) if fields else records
+
     query = db.query(ToolModel).filter(ToolModel.is_approved == True)
     
-    # Filter by category
-    if category_id:
-        query = query.join(ToolModel.categories).filter(CategoryModel.id == category_id)
-    
-    # Filter by pricing type
-    if pricing_type:
-        query = query.filter(ToolModel.pricing_type == pricing_type)
-    
     # Search filter
     if search:
         search_filter = f"%{search}%"
@@ -44,46 +115,141 @@ def get_all_tools(
             (ToolModel.description.ilike(search_filter))
         )
     
-    tools = query.offset(skip).limit(limit).all()
-    return tools
+    query = query.offset(skip).limit(limit)
+    if fields:
+        return tool_fields.response(tool_fields.fetch(db, query, fields))
+    return query.all()
+
+@router.get("/faceted", response_model=FacetedToolList)
+def get_faceted_tools(
+    skip: int = 0,
+    limit: int = 100,
+    category_ids: List[int] = Query([], description="Filter by several categories (repeat the parameter)"),
+    category_mode: CategoryMode = Query(CategoryMode.any, description="Match any ('or') or all ('and') of category_ids"),
+    pricing_types: List[PricingType] = Query([], description="Filter by several pricing types (repeat the parameter)"),
+    search: Optional[str] = Query(None, description="Search in name or description"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Filtered tools plus facet counts in one response. Category counts are what
+    each category would yield next to the current selection (added to it with
+    mode=or, narrowing it with mode=and); pricing counts ignore the pricing
+    filter itself.
+    """
+    index, bits, without_category, without_pricing = _facet_selection(
+        db, category_ids, category_mode, pricing_types, search
+    )
+    category_base = bits if category_mode == CategoryMode.all else without_category
+    return FacetedToolList(
+        total=bits.bit_count(),
+        items=_load_ordered(db, index.ids(bits, skip, limit)),
+        facets=FacetCounts(
+            categories=index.category_counts(category_base),
+            pricing_types=index.pricing_counts(without_pricing),
+        ),
+    )
 
 @router.get("/{tool_id}", response_model=Tool)
-def get_tool(tool_id: int, db: Session = Depends(get_db)):
+def get_tool(tool_id: int, db: Session = Depends(get_read_db)):
     """Get a specific tool by ID"""
+    snapshot = catalog_snapshot.get_snapshot()
+    record = snapshot.tool(tool_id) if snapshot else None
+    if record is not None:
+        tool_analytics.record_view(tool_id)
+        return record
+
+    # Not in the snapshot (or no snapshot): the database has the final say
     tool = db.query(ToolModel).filter(ToolModel.id == tool_id, ToolModel.is_approved == True).first()
     if not tool:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Tool with id {tool_id} not found"
         )
+    tool_analytics.record_view(tool_id)
     return tool
 
-@router.post("/", response_model=Tool, status_code=status.HTTP_201_CREATED)
-def create_tool(tool: ToolCreate, db: Session = Depends(get_db), current_user: str = Depends(get_current_user)):
-    """Create a new tool with categories"""
-    # Check if tool already exists
-    existing = db.query(ToolModel).filter(ToolModel.name == tool.name).first()
-    if existing:
+def _duplicate_error(db: Session, name: Optional[str], digest: Optional[str], exclude_id: Optional[int] = None):
+    """Build the 400 for a unique-constraint conflict on name or canonical link."""
+    conditions = []
+    if name:
+        conditions.append(ToolModel.name == name)
+    if digest:
+        conditions.append(ToolModel.link_hash == digest)
+    query = db.query(ToolModel).filter(or_(*conditions))
+    if exclude_id is not None:
+        query = query.filter(ToolModel.id != exclude_id)
+    existing = query.first()
+    if existing and existing.name != name:
+        detail = f"A tool with this link already exists: '{existing.name}'"
+    else:
+        detail = f"Tool '{name}' already exists"
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+@router.get("/{tool_id}/detail", response_model=ToolDetail)
+def get_tool_detail(
+    tool_id: int,
+    db: Session = Depends(get_read_db),
+    user_id: Optional[str] = Depends(get_optional_user)
+):
+    """
+    Tool, categories, like/bookmark counts and related tools in one response,
+    plus the caller's liked/bookmarked state when a token is sent.
+    """
+    detail = tool_detail.get_detail(db, tool_id, user_id)
+    if detail is None:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Tool '{tool.name}' already exists"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Tool with id {tool_id} not found"
         )
-    
+    tool_analytics.record_view(tool_id)
+    return detail
+
+@router.post("/{tool_id}/click", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(rate_limit_by_ip("record_click"))])
+def record_click(tool_id: int, request: Request):
+    """
+    Count an outbound click on the tool's link, once per client IP and hour.
+    Buffered in memory and written in batches, so this never touches the
+    database; unknown ids are dropped at flush time.
+    """
+    tool_analytics.record_click(tool_id, client_ip(request))
+
+@router.get("/{tool_id}/similar", response_model=List[Tool])
+def get_similar_tools(
+    tool_id: int,
+    limit: int = Query(5, ge=1, le=20),
+    db: Session = Depends(get_read_db)
+):
+    """Tools with similar descriptions and categories, from the precomputed index"""
+    exists = db.query(ToolModel.id).filter(ToolModel.id == tool_id, ToolModel.is_approved == True).first()
+    if not exists:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Tool with id {tool_id} not found"
+        )
+
+    similar_ids = similar_index.similar_tool_ids(db, tool_id, limit)
+    if not similar_ids:
+        return []
+    # Filter again: the index may still list tools deleted since the build
+    tools = db.query(ToolModel).filter(ToolModel.id.in_(similar_ids), ToolModel.is_approved == True).all()
+    tools_by_id = {t.id: t for t in tools}
+    return [tools_by_id[i] for i in similar_ids if i in tools_by_id]
+
+def _checked_category_ids(db: Session, category_ids: List[int]) -> List[int]:
+    """The ids without repeats, or a 404 naming the ones that don't exist (checked against the category registry)."""
+    missing_ids = category_registry.missing_ids(db, category_ids)
+    if missing_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Categories with IDs {missing_ids} not found"
+        )
+    return list(dict.fromkeys(category_ids))
+
+@router.post("/", response_model=Tool, status_code=status.HTTP_201_CREATED, dependencies=[Depends(rate_limit("create_tool"))])
+def create_tool(tool: ToolCreate, db: Session = Depends(get_db), current_user: str = Depends(get_current_user)):
+    """Create a new tool with categories"""
     # Verify all category IDs exist
-    if tool.category_ids:
-        categories = db.query(CategoryModel).filter(
-            CategoryModel.id.in_(tool.category_ids)
-        ).all()
-        
-        if len(categories) != len(tool.category_ids):
-            found_ids = {cat.id for cat in categories}
-            missing_ids = set(tool.category_ids) - found_ids
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Categories with IDs {missing_ids} not found"
-            )
-    else:
-        categories = []
+    category_ids = _checked_category_ids(db, tool.category_ids)
     
     # Create tool without category_ids field
     tool_data = tool.model_dump(exclude={'category_ids', 'user_id'})
@@ -91,16 +257,41 @@ def create_tool(tool: ToolCreate, db: Session = Depends(get_db), current_user: s
     tool_data["user_id"] = current_user
 
     tool_data["link"] = str(tool_data["link"])
+    tool_data["link_hash"] = link_hash(tool_data["link"])
     
-    db_tool = ToolModel(**tool_data)
+    # Duplicate name or canonical link is caught by the unique indexes in the
+    # same statement, so concurrent submissions can't race past a pre-check
+    tool_id = db.execute(
+        dialect_insert(db, ToolModel.__table__)
+        .values(**tool_data)
+        .on_conflict_do_nothing()
+        .returning(ToolModel.id)
+    ).scalar()
+    if tool_id is None:
+        db.rollback()
+        raise _duplicate_error(db, tool.name, tool_data["link_hash"])
     
     # Associate categories
-    db_tool.categories = categories
+    if category_ids:
+        db.execute(
+            insert(tool_category_association),
+            [{"tool_id": tool_id, "category_id": category_id} for category_id in category_ids]
+        )
     
-    db.add(db_tool)
     db.commit()
-    db.refresh(db_tool)
-    return db_tool
+    created = db.get(ToolModel, tool_id)
+    admin_stats.record_submitted(approved=created.is_approved)
+    # Category tool counts include pending tools, so even a pending submission changes them
+    catalog_events.publish(tool_ids=[tool_id], category_ids=category_ids)
+    if not created.is_approved:
+        admin_feed.publish("submitted", [tool_id], [{
+            "id": tool_id,
+            "name": created.name,
+            "link": created.link,
+            "user_id": created.user_id,
+            "date_added": created.date_added,
+        }])
+    return created
 
 @router.put("/{tool_id}", response_model=Tool)
 def update_tool(
@@ -116,41 +307,38 @@ def update_tool(
             detail=f"Tool with id {tool_id} not found"
         )
     
-    # Check for duplicate name if updating
-    if tool.name:
-        existing = db.query(ToolModel).filter(
-            ToolModel.name == tool.name,
-            ToolModel.id != tool_id
-        ).first()
-        if existing:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Tool '{tool.name}' already exists"
-            )
-    
-    # Update categories if provided
+    # Update categories if provided (association rows only; no Category rows are loaded)
     if tool.category_ids is not None:
-        categories = db.query(CategoryModel).filter(
-            CategoryModel.id.in_(tool.category_ids)
-        ).all()
-        
-        if len(categories) != len(tool.category_ids):
-            found_ids = {cat.id for cat in categories}
-            missing_ids = set(tool.category_ids) - found_ids
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Categories with IDs {missing_ids} not found"
+        category_ids = _checked_category_ids(db, tool.category_ids)
+        db.execute(delete(tool_category_association).where(tool_category_association.c.tool_id == tool_id))
+        if category_ids:
+            db.execute(
+                insert(tool_category_association),
+                [{"tool_id": tool_id, "category_id": category_id} for category_id in category_ids]
             )
-        
-        db_tool.categories = categories
+        db.expire(db_tool, ["categories"])
     
-    # Update other fields
+    # Update other fields (setting link also refreshes link_hash)
     update_data = tool.dict(exclude_unset=True, exclude={'category_ids'})
     for field, value in update_data.items():
         setattr(db_tool, field, value)
     
-    db.commit()
+    # Duplicate name or canonical link is rejected by the unique indexes
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise _duplicate_error(
+            db,
+            tool.name,
+            link_hash(tool.link) if tool.link else None,
+            exclude_id=tool_id
+        )
     db.refresh(db_tool)
+    # The similar-tools vector is built from the name, description and categories
+    if tool.category_ids is not None or {"name", "description"} & update_data.keys():
+        similar_index.add_tools(db, [tool_id])
+    catalog_events.publish(tool_ids=[tool_id])
     return db_tool
 
 @router.delete("/{tool_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -163,8 +351,11 @@ def delete_tool(tool_id: int, db: Session = Depends(get_db)):
             detail=f"Tool with id {tool_id} not found"
         )
     
+    was_approved = db_tool.is_approved
     db.delete(db_tool)
     db.commit()
+    admin_stats.record_deleted(approved=was_approved)
+    catalog_events.publish(tool_ids=[tool_id])
     return None
 
 @router.post("/{tool_id}/categories/{category_id}", response_model=Tool)
@@ -181,22 +372,24 @@ def add_category_to_tool(
             detail=f"Tool with id {tool_id} not found"
         )
     
-    category = db.query(CategoryModel).filter(CategoryModel.id == category_id).first()
-    if not category:
+    category_name = category_registry.name(db, category_id)
+    if category_name is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Category with id {category_id} not found"
         )
     
-    if category in tool.categories:
+    if any(category.id == category_id for category in tool.categories):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Category '{category.name}' already assigned to tool '{tool.name}'"
+            detail=f"Category '{category_name}' already assigned to tool '{tool.name}'"
         )
     
-    tool.categories.append(category)
+    db.execute(insert(tool_category_association).values(tool_id=tool_id, category_id=category_id))
     db.commit()
     db.refresh(tool)
+    similar_index.add_tools(db, [tool_id])
+    catalog_events.publish(tool_ids=[tool_id], category_ids=[category_id])
     return tool
 
 @router.delete("/{tool_id}/categories/{category_id}", response_model=Tool)
@@ -213,29 +406,41 @@ def remove_category_from_tool(
             detail=f"Tool with id {tool_id} not found"
         )
     
-    category = db.query(CategoryModel).filter(CategoryModel.id == category_id).first()
-    if not category:
+    category_name = category_registry.name(db, category_id)
+    if category_name is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Category with id {category_id} not found"
         )
     
-    if category not in tool.categories:
+    if not any(category.id == category_id for category in tool.categories):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Category '{category.name}' not assigned to tool '{tool.name}'"
+            detail=f"Category '{category_name}' not assigned to tool '{tool.name}'"
         )
     
-    tool.categories.remove(category)
+    db.execute(delete(tool_category_association).where(
+        tool_category_association.c.tool_id == tool_id,
+        tool_category_association.c.category_id == category_id
+    ))
     db.commit()
     db.refresh(tool)
+    similar_index.add_tools(db, [tool_id])
+    catalog_events.publish(tool_ids=[tool_id], category_ids=[category_id])
     return tool
 
 @router.post("/compare", response_model=List[Tool])
-def compare_tools(req: CompareRequest, db: Session = Depends(get_db)):
+def compare_tools(
+    req: CompareRequest,
+    fields: Optional[List[str]] = Depends(tool_fields.parse_fields),
+    db: Session = Depends(get_read_db)
+):
     if not req.ids:
         raise HTTPException(status_code=400, detail="ids list cannot be empty")
 
+    if fields:
+        return tool_fields.response(tool_fields.fetch_ordered(db, req.ids, fields))
+
     # fetch tools matching the provided IDs
     tools = (
         db.query(ToolModel)
@@ -254,7 +459,7 @@ def compare_tools(req: CompareRequest, db: Session = Depends(get_db)):
 
     return ordered_tools
 
-@router.post("/extract")
+@router.post("/extract", dependencies=[Depends(rate_limit_by_ip("extract"))])
 def extract_tool_info(req: ExtractRequest):
     """Attempt to scrape meta tags from a URL to autofill the frontend form."""
     try:
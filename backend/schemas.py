@@ -1,7 +1,8 @@
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl, field_validator
 from typing import Optional, List, Any, Dict
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
+from backend.services.canonical_url import canonicalize_url
 
 class PricingType(str, Enum):
     free = "free"
@@ -60,9 +61,19 @@ class ToolUpdate(BaseModel):
     pricing_type: Optional[PricingType] = None
     category_ids: Optional[List[int]] = None  # Add category IDs
 
+    @field_validator("link")
+    @classmethod
+    def _link_parses(cls, link):
+        # Malformed links would otherwise fail when link_hash is computed (a 500)
+        if link is not None:
+            canonicalize_url(link)
+        return link
+
 class Tool(ToolBase):
     id: int
     date_added: datetime
+    link_status: Optional[str] = None  # "ok" / "broken" once the link checker has run
+    logo_status: Optional[str] = None
     categories: List[Category] = []  # Include categories in response
     
     class Config:
@@ -71,9 +82,92 @@ class Tool(ToolBase):
 class ToolWithCategories(Tool):
     pass  # Alias for clarity
 
+class SubmissionStatus(str, Enum):
+    pending = "pending"
+    approved = "approved"
+
+class MyToolsPage(BaseModel):
+    items: List[Tool]
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= for the next page; None on the last page
+
+class ViewerState(BaseModel):
+    liked: bool = False
+    bookmarked: bool = False
+
+class ToolDetail(Tool):
+    like_count: int = 0
+    bookmark_count: int = 0
+    related: List[Tool] = []
+    viewer: Optional[ViewerState] = None  # Only set for signed-in requests
+
+class CategoryMode(str, Enum):
+    any = "or"
+    all = "and"
+
+class ToolSort(str, Enum):
+    id = "id"
+    trending = "trending"
+
+class FacetCounts(BaseModel):
+    categories: Dict[int, int] = {}
+    pricing_types: Dict[str, int] = {}
+
+class FacetedToolList(BaseModel):
+    total: int
+    items: List[Tool]
+    facets: FacetCounts
+
+class SuggestionType(str, Enum):
+    tool = "tool"
+    category = "category"
+
+class Suggestion(BaseModel):
+    type: SuggestionType
+    id: int
+    name: str
+    score: int
+
 class CompareRequest(BaseModel):
     ids: List[int] = Field(..., description="List of tool IDs to compare")
 
+# Moderation Schemas
+class PendingToolFilter(BaseModel):
+    user_id: Optional[str] = None
+    added_after: Optional[datetime] = None
+    added_before: Optional[datetime] = None
+
+class BulkModerationRequest(BaseModel):
+    ids: Optional[List[int]] = Field(None, description="Explicit tool IDs to act on")
+    filter: Optional[PendingToolFilter] = Field(None, description="Act on pending tools matching this filter instead")
+    limit: int = Field(500, ge=1, le=5000, description="Maximum tools affected by one call")
+
+class BulkModerationResult(BaseModel):
+    count: int
+    ids: List[int]
+
+class DailyCount(BaseModel):
+    day: date
+    count: int
+
+class UserSubmissions(BaseModel):
+    user_id: str
+    submitted: int
+    approved: int
+    pending: int
+
+class CategoryLikes(BaseModel):
+    category_id: int
+    name: str
+    likes: int
+
+class AdminStats(BaseModel):
+    pending: int
+    approved: int
+    approvals_per_day: List[DailyCount]
+    submissions_per_user: List[UserSubmissions]
+    likes_per_category: List[CategoryLikes]
+    aggregates_computed_at: datetime  # The lists above may be up to STATS_CACHE_SECONDS old
+
 # Bookmark Schemas
 class BookmarkCreate(BaseModel):
     tool_id: int
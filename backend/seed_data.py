@@ -1,7 +1,10 @@
 import sys
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from backend.database.database import SessionLocal, engine
-from backend.models import Base, Tool, Category
+from backend.database.database import SessionLocal
+from backend.migrate import run_migrations
+from backend.models import Tool, Category, tool_category_association
+from backend.services import category_registry
 
 def create_categories(db: Session):
     """Create initial categories"""
@@ -20,26 +23,20 @@ def create_categories(db: Session):
         "Business & Analytics"
     ]
     
-    categories = []
+    # Check which categories already exist, then create the rest in one statement
+    existing = category_registry.resolve_names(db, categories_data)
     for cat_name in categories_data:
-        # Check if category already exists
-        existing = db.query(Category).filter(Category.name == cat_name).first()
-        if not existing:
-            category = Category(name=cat_name)
-            db.add(category)
-            categories.append(category)
-            print(f"✓ Created category: {cat_name}")
-        else:
-            categories.append(existing)
+        if cat_name in existing:
             print(f"⊘ Category already exists: {cat_name}")
+        else:
+            print(f"✓ Created category: {cat_name}")
+    categories = category_registry.resolve_names(db, categories_data, create=True)
     
     db.commit()
     return categories
 
-def create_tools(db: Session, categories):
-    """Create initial AI tools"""
-    # Get categories by name for easier assignment
-    cat_dict = {cat.name: cat for cat in categories}
+def create_tools(db: Session, category_ids):
+    """Create initial AI tools (category_ids maps category names to ids)"""
     
     tools_data = [
         {
@@ -352,8 +349,8 @@ def create_tools(db: Session, categories):
             print(f"⊘ Tool already exists: {tool_data['name']}")
             continue
         
-        # Get category objects
-        tool_categories = [cat_dict[cat_name] for cat_name in tool_data["categories"] if cat_name in cat_dict]
+        # Get category ids
+        tool_categories = [category_ids[cat_name] for cat_name in tool_data["categories"] if cat_name in category_ids]
         
         # Create tool
         tool = Tool(
@@ -362,12 +359,17 @@ def create_tools(db: Session, categories):
             link=tool_data["link"],
             logo_url=tool_data["logo_url"],
             pricing_type=tool_data["pricing_type"],
-            categories=tool_categories,
             is_approved=tool_data["is_approved"],
             user_id=tool_data["user_id"]
         )
         
         db.add(tool)
+        db.flush()
+        if tool_categories:
+            db.execute(
+                insert(tool_category_association),
+                [{"tool_id": tool.id, "category_id": category_id} for category_id in tool_categories]
+            )
         tools_created += 1
         print(f"✓ Created tool: {tool_data['name']} ({len(tool_categories)} categories)")
     
@@ -381,7 +383,7 @@ def seed_database():
     print("=" * 50 + "\n")
     
     # Create tables
-    Base.metadata.create_all(bind=engine)
+    run_migrations()
     
     # Create session
     db = SessionLocal()
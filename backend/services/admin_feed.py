@@ -0,0 +1,180 @@
+"""
+Feed of moderation events for the admin dashboard (SSE).
+
+Routes call `publish` when a tool is submitted, approved or rejected. Each
+connected dashboard holds a subscriber queue. The last ADMIN_FEED_BUFFER
+events are kept, so a reconnecting client can send Last-Event-ID and replay
+what it missed. A client that fell too far behind gets a `reset` event and
+should refetch the queue.
+
+Events travel through the catalog_events change feed (`broadcast`), so every
+worker sees every worker's events, its own included, in the same order. The
+change id is the event id, so a dashboard can reconnect to any worker and
+resume with Last-Event-ID. Delivery waits for the feed listener: NOTIFY on
+Postgres, up to CATALOG_EVENTS_POLL_SECONDS on SQLite.
+
+With CATALOG_EVENTS_SHARED=false the feed is per worker. Events are then
+delivered directly, with ids starting from the boot time in milliseconds so
+they still increase across restarts.
+"""
+import asyncio
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, List, Optional
+
+from backend.services import catalog_events
+
+ADMIN_FEED_BUFFER = int(os.getenv("ADMIN_FEED_BUFFER", "500"))
+ADMIN_FEED_HEARTBEAT_SECONDS = float(os.getenv("ADMIN_FEED_HEARTBEAT_SECONDS", "15"))
+# Events a slow client may have queued before it is told to reset
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+_ids = itertools.count(int(time.time() * 1000))  # Only without the shared feed
+_buffer: deque = deque(maxlen=ADMIN_FEED_BUFFER)
+# Events up to this id may be unknown here (evicted, before this worker started, or lost in a feed gap)
+_known_after = 0
+_subscribers: List["Subscriber"] = []
+_lock = threading.Lock()
+
+
+class Event:
+    __slots__ = ("id", "type", "data")
+
+    def __init__(self, id: int, type: str, data: dict):
+        self.id, self.type, self.data = id, type, data
+
+    def encode(self) -> str:
+        return f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data, default=str)}\n\n"
+
+
+class Subscriber:
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def deliver(self, event: Event):
+        """Called from any thread (sync routes run in the threadpool)."""
+        def put():
+            try:
+                self.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.overflowed = True
+        self.loop.call_soon_threadsafe(put)
+
+
+def publish(event_type: str, tool_ids: List[int], tools: Optional[List[dict]] = None):
+    """Send an event to the dashboards connected to any worker."""
+    if not tool_ids:
+        return
+    data = {"tool_ids": list(tool_ids)}
+    if tools is not None:
+        data["tools"] = tools
+    if catalog_events.CATALOG_EVENTS_SHARED:
+        # Delivered by _on_message once the feed listener reads it back (here too)
+        catalog_events.broadcast({"admin_event": event_type, "data": data})
+    else:
+        _deliver(Event(next(_ids), event_type, data))
+
+
+def _deliver(event: Event):
+    """Buffer the event and push it to every connected dashboard of this worker."""
+    global _known_after
+    with _lock:
+        if len(_buffer) == _buffer.maxlen:
+            _known_after = _buffer[0].id
+        _buffer.append(event)
+        subscribers = list(_subscribers)
+    for subscriber in subscribers:
+        try:
+            subscriber.deliver(event)
+        except RuntimeError:
+            pass  # its event loop is gone; it unsubscribes on its way out
+
+
+@catalog_events.subscribe_messages
+def _on_message(change_id: int, message: Optional[dict]):
+    global _known_after
+    if message is None:
+        # Events up to change_id may be lost: dashboards that might miss one must refetch
+        with _lock:
+            _known_after = max(_known_after, change_id)
+            subscribers = list(_subscribers)
+        for subscriber in subscribers:
+            subscriber.overflowed = True
+            try:
+                subscriber.deliver(_reset_event())
+            except RuntimeError:
+                pass
+        return
+    if "admin_event" in message:
+        _deliver(Event(change_id, message["admin_event"], message.get("data", {})))
+
+
+def _backlog(last_event_id: Optional[int]) -> Optional[List[Event]]:
+    """Buffered events after last_event_id, or None if some were already dropped."""
+    with _lock:
+        events = list(_buffer)
+        known_after = _known_after
+    if last_event_id is None:
+        return []
+    if last_event_id < known_after:
+        return None
+    if catalog_events.CATALOG_EVENTS_SHARED:
+        # Another worker may have delivered newer events than this one has read yet
+        return [e for e in events if e.id > last_event_id]
+    if events and last_event_id < events[0].id - 1:
+        return None
+    if events and last_event_id > events[-1].id:
+        return None  # id from before a restart with a clock step back, or bogus
+    return [e for e in events if e.id > last_event_id]
+
+
+def _reset_event() -> Event:
+    """Tells the client to refetch. Carries the newest id so its next reconnect resumes from here."""
+    with _lock:
+        newest = max(_buffer[-1].id if _buffer else 0, _known_after)
+    return Event(newest, "reset", {})
+
+
+async def stream(last_event_id: Optional[int], is_disconnected) -> AsyncIterator[str]:
+    """SSE body: replay, then live events with heartbeats until the client leaves."""
+    subscriber = Subscriber()
+    with _lock:
+        # Subscribe before reading the backlog so nothing falls in between
+        _subscribers.append(subscriber)
+    try:
+        yield "retry: 3000\n\n"
+        last_sent = last_event_id or 0
+        backlog = _backlog(last_event_id)
+        if backlog is None:
+            reset = _reset_event()
+            last_sent = reset.id
+            yield reset.encode()
+            backlog = []
+        for event in backlog:
+            last_sent = event.id
+            yield event.encode()
+
+        while True:
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), ADMIN_FEED_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await is_disconnected():
+                    return
+                yield ": heartbeat\n\n"
+                continue
+            if subscriber.overflowed:
+                yield _reset_event().encode()
+                return
+            if event.id <= last_sent:
+                continue  # already sent as part of the backlog
+            last_sent = event.id
+            yield event.encode()
+    finally:
+        with _lock:
+            _subscribers.remove(subscriber)
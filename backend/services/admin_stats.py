@@ -0,0 +1,150 @@
+"""
+Numbers for the admin dashboard.
+
+The pending / approved totals are kept in memory. They are counted once
+with a single grouped query, and the moderation and submission routes then
+adjust them on every write, so reading them costs nothing. Other workers'
+writes are picked up by a recount on the next read after a catalog change
+or admin feed event from any worker. Scripts like
+bulk_imports publish neither, so there is also a recount every
+STATS_RECOUNT_SECONDS.
+
+The heavier aggregates (approvals per day, top submitters, likes per
+category) take one grouped query each and are cached for
+STATS_CACHE_SECONDS.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from backend.models import Category, Like, Tool, tool_category_association
+from backend.schemas import AdminStats, CategoryLikes, DailyCount, UserSubmissions
+from backend.services import catalog_events
+
+# --- Configuration ---
+
+STATS_CACHE_SECONDS = float(os.getenv("STATS_CACHE_SECONDS", "60"))
+# Safety net for counter drift (other workers, imports, direct SQL)
+STATS_RECOUNT_SECONDS = float(os.getenv("STATS_RECOUNT_SECONDS", "300"))
+STATS_DAYS = 30
+STATS_TOP_USERS = 20
+
+_counts: Optional[Dict[str, int]] = None
+_counted_at = 0.0
+_aggregates: Optional[tuple] = None  # (expires at, computed at, dict of lists)
+_lock = threading.Lock()
+
+
+# --- Counters ---
+
+def _adjust(pending: int = 0, approved: int = 0):
+    with _lock:
+        if _counts is not None:
+            _counts["pending"] = max(0, _counts["pending"] + pending)
+            _counts["approved"] = max(0, _counts["approved"] + approved)
+
+
+def record_submitted(approved: bool = False):
+    if approved:
+        _adjust(approved=1)
+    else:
+        _adjust(pending=1)
+
+
+def record_approved(count: int = 1):
+    _adjust(pending=-count, approved=count)
+
+
+def record_rejected(count: int = 1):
+    _adjust(pending=-count)
+
+
+def record_deleted(approved: bool):
+    if approved:
+        _adjust(approved=-1)
+    else:
+        _adjust(pending=-1)
+
+
+@catalog_events.subscribe(remote_only=True)
+def _recount_later(tool_ids=(), category_ids=()):
+    global _counted_at
+    _counted_at = 0.0
+
+
+@catalog_events.subscribe_messages
+def _recount_after_admin_event(change_id: int, message: Optional[dict]):
+    # Our own events come back too; the recount is one grouped query, so no need to tell them apart
+    if message is None or "admin_event" in message:
+        _recount_later()
+
+
+def _counters(db: Session) -> Dict[str, int]:
+    global _counts, _counted_at
+    with _lock:
+        if _counts is not None and time.monotonic() - _counted_at < STATS_RECOUNT_SECONDS:
+            return dict(_counts)
+    rows = db.execute(select(Tool.is_approved, func.count(Tool.id)).group_by(Tool.is_approved)).all()
+    counts = {"pending": 0, "approved": 0}
+    for is_approved, count in rows:
+        counts["approved" if is_approved else "pending"] = count
+    with _lock:
+        _counts, _counted_at = counts, time.monotonic()
+    return dict(counts)
+
+
+# --- Aggregates ---
+
+def _compute_aggregates(db: Session) -> dict:
+    since = datetime.utcnow() - timedelta(days=STATS_DAYS)
+    approval_day = func.date(Tool.approved_at)
+    approvals = db.execute(
+        select(approval_day, func.count(Tool.id))
+        .where(Tool.approved_at >= since)
+        .group_by(approval_day)
+        .order_by(approval_day)
+    ).all()
+
+    submitted = func.count(Tool.id)
+    approved = func.sum(case((Tool.is_approved == True, 1), else_=0))
+    submitters = db.execute(
+        select(Tool.user_id, submitted, approved)
+        .group_by(Tool.user_id)
+        .order_by(submitted.desc())
+        .limit(STATS_TOP_USERS)
+    ).all()
+
+    likes = func.count(Like.id)
+    category_likes = db.execute(
+        select(Category.id, Category.name, likes)
+        .join(tool_category_association, tool_category_association.c.category_id == Category.id)
+        .join(Like, Like.tool_id == tool_category_association.c.tool_id)
+        .group_by(Category.id, Category.name)
+        .order_by(likes.desc())
+    ).all()
+
+    return {
+        "approvals_per_day": [DailyCount(day=day, count=count) for day, count in approvals],
+        "submissions_per_user": [
+            UserSubmissions(user_id=user_id, submitted=total, approved=approved or 0, pending=total - (approved or 0))
+            for user_id, total, approved in submitters
+        ],
+        "likes_per_category": [
+            CategoryLikes(category_id=category_id, name=name, likes=count)
+            for category_id, name, count in category_likes
+        ],
+    }
+
+
+def get_stats(db: Session) -> AdminStats:
+    global _aggregates
+    cached = _aggregates
+    if cached is None or cached[0] <= time.monotonic():
+        computed_at = datetime.utcnow()
+        cached = _aggregates = (time.monotonic() + STATS_CACHE_SECONDS, computed_at, _compute_aggregates(db))
+    return AdminStats(**_counters(db), aggregates_computed_at=cached[1], **cached[2])
@@ -0,0 +1,59 @@
+import hashlib
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "referrer", "source", "via", "_ga", "igshid",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "hsa_")
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Reduce a tool link to the form we compare on:
+    - http/https and a leading "www." are ignored
+    - host is lower-cased and default ports are dropped
+    - trailing slashes and fragments are dropped
+    - tracking parameters are removed and the rest are sorted
+
+    "https://www.Notion.so/product/ai/?utm_source=x" -> "notion.so/product/ai"
+
+    Raises ValueError for links that can't be parsed (bad port, broken IPv6 host).
+    """
+    url = url.strip()
+    if "://" not in url:
+        url = f"https://{url}"
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError as e:
+        raise ValueError(f"Invalid link: {e}") from None
+
+    host = (parts.hostname or "").lower().rstrip(".")
+    if host.startswith("www."):
+        host = host[4:]
+    if port and port != DEFAULT_PORTS.get(parts.scheme.lower()):
+        host = f"{host}:{port}"
+
+    path = parts.path.rstrip("/")
+    if path.lower() in ("/index.html", "/index.htm", "/index.php"):
+        path = ""
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+
+    canonical = host + path
+    if query:
+        canonical += "?" + urlencode(query)
+    return canonical
+
+
+def link_hash(url: str) -> str:
+    """Stable hash of the canonical URL, stored in the unique tools.link_hash column."""
+    return hashlib.sha256(canonicalize_url(url).encode("utf-8")).hexdigest()
@@ -0,0 +1,255 @@
+"""
+Notifications for catalog changes, within a worker and across workers.
+
+Routes call `publish` after committing a change that affects what the public
+catalog shows (approved tools, their fields or categories, category names).
+In-process caches register a listener with `subscribe` and invalidate or
+patch themselves there, so writers don't need to know about every cache.
+A publish without ids means "anything may have changed".
+
+With several workers, `publish` also appends the change to the
+catalog_changes table. On Postgres it sends a NOTIFY too. Every worker runs
+`run_listener` from the lifespan hook and replays other workers' changes to
+its own listeners: it wakes on NOTIFY, or polls every
+CATALOG_EVENTS_POLL_SECONDS (always on SQLite). Change ids are a version
+counter. A gap in the sequence means changes may have been missed (pruned,
+or committed out of order), so the listener then broadcasts a full
+invalidation.
+
+The same feed carries `broadcast` messages (JSON payloads that are not
+catalog changes, like admin feed events). They are handed to
+`subscribe_messages` listeners in every worker, the sender included, in
+change id order.
+"""
+import asyncio
+import json
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, List, Optional
+
+CatalogListener = Callable[[List[int], List[int]], None]
+# (change id, payload); a None payload means messages up to that id may have been missed
+MessageListener = Callable[[int, Optional[dict]], None]
+
+# --- Configuration ---
+
+CATALOG_EVENTS_SHARED = os.getenv("CATALOG_EVENTS_SHARED", "true").lower() == "true"
+# Catch-up interval; the only delivery path on SQLite, a safety net on Postgres
+CATALOG_EVENTS_POLL_SECONDS = float(os.getenv("CATALOG_EVENTS_POLL_SECONDS", "2"))
+CATALOG_CHANGES_RETENTION_HOURS = float(os.getenv("CATALOG_CHANGES_RETENTION_HOURS", "24"))
+NOTIFY_CHANNEL = "catalog_changes"
+
+# Identifies this process's rows so it doesn't replay its own changes
+WORKER_ID = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+_listeners: List[tuple] = []  # (listener, local_only, remote_only)
+_message_listeners: List[MessageListener] = []
+_cursor: Optional[int] = None  # Last change id this worker has processed
+_latest_version = 0  # Highest change id seen, including our own
+
+
+def subscribe(listener: Optional[CatalogListener] = None, *, local_only: bool = False, remote_only: bool = False):
+    """
+    Register a listener (usable as @subscribe or @subscribe(local_only=True)).
+    local_only listeners skip changes made by other workers, remote_only ones
+    skip changes made in this worker.
+    """
+    def register(fn: CatalogListener) -> CatalogListener:
+        _listeners.append((fn, local_only, remote_only))
+        return fn
+    return register(listener) if listener is not None else register
+
+
+def subscribe_messages(listener: MessageListener) -> MessageListener:
+    """Register a listener for `broadcast` messages (usable as a decorator)."""
+    _message_listeners.append(listener)
+    return listener
+
+
+def _dispatch_message(change_id: int, message: Optional[dict]):
+    for listener in _message_listeners:
+        try:
+            listener(change_id, message)
+        except Exception as e:
+            print(f"Message listener {listener.__name__} failed: {e}")
+
+
+def _dispatch(tool_ids: List[int], category_ids: List[int], remote: bool):
+    for listener, local_only, remote_only in _listeners:
+        if (remote and local_only) or (not remote and remote_only):
+            continue
+        try:
+            listener(tool_ids, category_ids)
+        except Exception as e:
+            print(f"Catalog listener {listener.__name__} failed: {e}")
+
+
+def latest_version() -> int:
+    return _latest_version
+
+
+def _record(tool_ids: List[int], category_ids: List[int], message: Optional[dict] = None):
+    """Append the change to the shared feed (and wake Postgres listeners)."""
+    global _latest_version
+    from sqlalchemy import insert, text
+
+    from backend.database.database import get_engine
+    from backend.models import CatalogChange
+
+    engine = get_engine()
+    with engine.begin() as conn:
+        change_id = conn.execute(
+            insert(CatalogChange)
+            .values(
+                origin=WORKER_ID,
+                tool_ids=json.dumps(tool_ids),
+                category_ids=json.dumps(category_ids),
+                message=json.dumps(message, default=str) if message is not None else None,
+            )
+            .returning(CatalogChange.id)
+        ).scalar()
+        if engine.dialect.name == "postgresql":
+            # Delivered on commit, so listeners never see a change before its row
+            conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": NOTIFY_CHANNEL, "payload": str(change_id)})
+    _latest_version = max(_latest_version, change_id)
+
+
+def publish(tool_ids: Iterable[int] = (), category_ids: Iterable[int] = ()):
+    """Notify every listener; neither a failing listener nor the feed ever fails the write."""
+    tool_ids, category_ids = list(tool_ids), list(category_ids)
+    if CATALOG_EVENTS_SHARED:
+        try:
+            # Recorded first so caches rebuilt by the listeners include this version
+            _record(tool_ids, category_ids)
+        except Exception as e:
+            print(f"Could not record catalog change for other workers: {e}")
+    _dispatch(tool_ids, category_ids, remote=False)
+
+
+def broadcast(message: dict) -> bool:
+    """
+    Send a message to every worker through the feed. Returns False when the
+    feed is off or the write failed; the caller then handles it locally.
+    """
+    if not CATALOG_EVENTS_SHARED:
+        return False
+    try:
+        _record([], [], message)
+        return True
+    except Exception as e:
+        print(f"Could not broadcast message to other workers: {e}")
+        return False
+
+
+# --- Cross-worker listener ---
+
+def _catch_up():
+    """Replay changes other workers recorded since the cursor. Runs in a thread."""
+    global _cursor, _latest_version
+    from sqlalchemy import func, select
+
+    from backend.database.database import get_engine
+    from backend.models import CatalogChange
+
+    with get_engine().connect() as conn:
+        if _cursor is None:
+            # Start from now; caches built after startup already reflect history
+            _cursor = conn.execute(select(func.coalesce(func.max(CatalogChange.id), 0))).scalar()
+            _latest_version = max(_latest_version, _cursor)
+            _dispatch_message(_cursor, None)
+            return
+        rows = conn.execute(
+            select(
+                CatalogChange.id, CatalogChange.origin, CatalogChange.tool_ids,
+                CatalogChange.category_ids, CatalogChange.message,
+            )
+            .where(CatalogChange.id > _cursor)
+            .order_by(CatalogChange.id)
+        ).all()
+
+    if not rows:
+        return
+    expected = _cursor + 1
+    missed = any(row.id != expected + i for i, row in enumerate(rows))
+    _cursor = rows[-1].id
+    _latest_version = max(_latest_version, _cursor)
+
+    if missed:
+        _dispatch([], [], remote=True)
+        present = {row.id for row in rows}
+        last_missing = _cursor
+        while last_missing in present:
+            last_missing -= 1
+        _dispatch_message(last_missing, None)
+    for row in rows:
+        if row.message is not None:
+            _dispatch_message(row.id, json.loads(row.message))
+        elif not missed and row.origin != WORKER_ID:
+            _dispatch(json.loads(row.tool_ids), json.loads(row.category_ids), remote=True)
+
+
+def _prune():
+    from sqlalchemy import delete
+
+    from backend.database.database import get_engine
+    from backend.models import CatalogChange
+
+    cutoff = datetime.utcnow() - timedelta(hours=CATALOG_CHANGES_RETENTION_HOURS)
+    with get_engine().begin() as conn:
+        conn.execute(delete(CatalogChange).where(CatalogChange.created_at < cutoff))
+
+
+def _open_pg_listener(engine):
+    """Dedicated autocommit connection LISTENing on the channel (outside the pool)."""
+    raw = engine.raw_connection()
+    raw.detach()
+    conn = raw.driver_connection
+    conn.autocommit = True
+    conn.cursor().execute(f"LISTEN {NOTIFY_CHANNEL}")
+    return raw, conn
+
+
+async def run_listener():
+    """Background task started from the lifespan hook; cancelled on shutdown."""
+    if not CATALOG_EVENTS_SHARED:
+        return
+    from backend.database.database import get_engine
+
+    engine = get_engine()
+    loop = asyncio.get_running_loop()
+    wake = asyncio.Event()
+    raw = conn = None
+    last_prune = loop.time()
+    try:
+        while True:
+            try:
+                if conn is not None:
+                    # Drain the socket; payloads aren't needed, the table is the source of truth
+                    conn.poll()
+                    conn.notifies.clear()
+                if engine.dialect.name == "postgresql" and conn is None:
+                    raw, conn = await asyncio.to_thread(_open_pg_listener, engine)
+                    loop.add_reader(conn.fileno(), wake.set)
+                await asyncio.to_thread(_catch_up)
+                if loop.time() - last_prune > 3600:
+                    last_prune = loop.time()
+                    await asyncio.to_thread(_prune)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Catalog change listener error (retrying): {e}")
+                if conn is not None:
+                    loop.remove_reader(conn.fileno())
+                    raw.close()
+                    raw = conn = None
+
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=CATALOG_EVENTS_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            wake.clear()
+    finally:
+        if conn is not None:
+            loop.remove_reader(conn.fileno())
+            raw.close()
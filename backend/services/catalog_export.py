@@ -0,0 +1,138 @@
+"""
+Streaming catalog export.
+
+Rows are read through a server-side cursor (yield_per / stream_results) and
+serialized batch by batch. Memory stays flat however big the catalog gets.
+Category names are fetched with one query per batch, not per tool.
+
+Each record has the shape bulk_imports.py reads (name, description, link,
+logo_url, pricing_type, categories), so an export can be imported again:
+
+    python -m backend.services.catalog_export --format ndjson --output tools.ndjson
+    python -m backend.bulk_imports tools.ndjson
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+from typing import Dict, Iterator, List
+
+from sqlalchemy import select
+
+from backend.models import Category, Tool, tool_category_association
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "json": "application/json",
+}
+CSV_FIELDS = ["name", "description", "link", "logo_url", "pricing_type", "categories"]
+# Categories are joined into one CSV cell with this separator
+CSV_CATEGORY_SEPARATOR = "|"
+BATCH_SIZE = 1000
+
+
+def _category_names(db, tool_ids: List[int]) -> Dict[int, List[str]]:
+    rows = db.execute(
+        select(tool_category_association.c.tool_id, Category.name)
+        .join(Category, Category.id == tool_category_association.c.category_id)
+        .where(tool_category_association.c.tool_id.in_(tool_ids))
+    )
+    names: Dict[int, List[str]] = {}
+    for tool_id, name in rows:
+        names.setdefault(tool_id, []).append(name)
+    return names
+
+
+def iter_batches(db, include_pending: bool = False, batch_size: int = BATCH_SIZE) -> Iterator[List[dict]]:
+    """Export records in id order, `batch_size` at a time."""
+    query = select(
+        Tool.id, Tool.name, Tool.description, Tool.link, Tool.logo_url, Tool.pricing_type
+    ).order_by(Tool.id)
+    if not include_pending:
+        query = query.where(Tool.is_approved == True)
+
+    result = db.execute(query.execution_options(stream_results=True, yield_per=batch_size))
+    for rows in result.partitions():
+        categories = _category_names(db, [row.id for row in rows])
+        yield [
+            {
+                "name": row.name,
+                "description": row.description,
+                "link": row.link,
+                "logo_url": row.logo_url or "",
+                "pricing_type": row.pricing_type,
+                "categories": categories.get(row.id, []),
+            }
+            for row in rows
+        ]
+
+
+def serialize(batches: Iterator[List[dict]], fmt: str) -> Iterator[str]:
+    """Text chunks in the requested format, one chunk per batch."""
+    if fmt == "ndjson":
+        for batch in batches:
+            yield "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in batch)
+
+    elif fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for batch in batches:
+            for record in batch:
+                writer.writerow({**record, "categories": CSV_CATEGORY_SEPARATOR.join(record["categories"])})
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    elif fmt == "json":
+        # A JSON array written incrementally; same layout as scraped_tools.json
+        yield "["
+        first = True
+        for batch in batches:
+            chunk = ",\n".join(json.dumps(record, ensure_ascii=False) for record in batch)
+            if chunk:
+                yield ("\n" if first else ",\n") + chunk
+                first = False
+        yield "\n]\n"
+
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+
+def stream_export(fmt: str, include_pending: bool = False) -> Iterator[str]:
+    """
+    Generator for StreamingResponse. It opens its own session because the
+    request-scoped one from get_db may be closed before the body is sent.
+    """
+    from backend.database.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        yield from serialize(iter_batches(db, include_pending), fmt)
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the tool catalog in a format bulk_imports.py can re-import.")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="ndjson")
+    parser.add_argument("--output", help="File to write (default: stdout)")
+    parser.add_argument("--include-pending", action="store_true", help="Also export tools awaiting approval")
+    args = parser.parse_args()
+
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        for chunk in stream_export(args.format, args.include_pending):
+            out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+            print(f"✅ Exported catalog to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+"""
+Read-only snapshot of the public catalog, shared by all workers.
+
+Approved tools, categories and their associations are written as flat numpy
+arrays (.npy) into a versioned directory under CATALOG_SNAPSHOT_DIR. Every
+worker memory-maps the same files, so N uvicorn workers share one copy
+through the page cache instead of each holding its own.
+
+Layout: each string column is one UTF-8 blob plus an int64 offsets array
+(and a null mask for nullable columns). Tool -> category links are a CSR
+pair (indptr/indices into the category arrays). Tools and categories are
+sorted by id, so lookups are a binary search.
+
+Each version records the catalog change-feed version (see catalog_events)
+it was built at. A change made in this worker marks the snapshot dirty. The
+worker then serves from the database until it has written a new version and
+atomically swapped the CURRENT pointer, so it reads its own writes. A change
+reported by another worker raises the version this worker requires. The
+first worker to take the build lock writes a new version; the others find
+it already current and just map it. Workers also look at the pointer every
+CATALOG_SNAPSHOT_CHECK_SECONDS.
+
+Usage (from the repo root):
+    python -m backend.services.catalog_snapshot
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from backend.services import catalog_events
+from backend.startup import register_warmup
+
+try:
+    import fcntl
+except ImportError:  # Windows: builds just aren't serialized across processes
+    fcntl = None
+
+# --- Configuration ---
+
+CATALOG_SNAPSHOT_ENABLED = os.getenv("CATALOG_SNAPSHOT_ENABLED", "true").lower() == "true"
+SNAPSHOT_DIR = os.getenv("CATALOG_SNAPSHOT_DIR", "data/catalog_snapshot")
+# How often a worker looks for a version written by another worker
+CATALOG_SNAPSHOT_CHECK_SECONDS = float(os.getenv("CATALOG_SNAPSHOT_CHECK_SECONDS", "1"))
+KEEP_VERSIONS = 2
+BUILD_RETRY_SECONDS = 30
+
+TOOL_STRING_COLUMNS = ("name", "description", "link", "logo_url", "pricing_type", "user_id", "link_status", "logo_status")
+# Bumped when the file layout changes; versions in another format are ignored
+SNAPSHOT_FORMAT = 2
+_EPOCH = datetime(1970, 1, 1)
+
+
+# --- Building ---
+
+def _feed_version(db) -> int:
+    """Latest catalog change id in the database (0 before the first change)."""
+    from sqlalchemy import func
+
+    from backend.models import CatalogChange
+
+    try:
+        return db.query(func.coalesce(func.max(CatalogChange.id), 0)).scalar()
+    except Exception:
+        db.rollback()  # catalog_changes not migrated yet
+        return 0
+
+
+def _database_fingerprint() -> str:
+    """Ties a snapshot to the database it came from (switching DATABASE_URL must not serve it)."""
+    from backend.database.database import get_database_url
+
+    return hashlib.sha256(get_database_url().encode("utf-8")).hexdigest()[:16]
+
+
+def _save_strings(version_dir: str, prefix: str, values: Sequence[Optional[str]]):
+    encoded = [(v or "").encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    np.save(os.path.join(version_dir, f"{prefix}.offsets.npy"), offsets)
+    np.save(os.path.join(version_dir, f"{prefix}.blob.npy"), np.frombuffer(b"".join(encoded), dtype=np.uint8))
+    np.save(os.path.join(version_dir, f"{prefix}.null.npy"), np.array([v is None for v in values], dtype=bool))
+
+
+def _version_number(version: str) -> int:
+    """Build counter of a version name ("000000000042-<pid>"); 0 for names in another format."""
+    counter = version.split("-", 1)[0]
+    return int(counter) if counter.isdigit() and len(counter) == 12 else 0
+
+
+def _versions(snapshot_dir: str) -> List[str]:
+    """Version directories, oldest build first."""
+    names = [d for d in os.listdir(snapshot_dir) if os.path.isdir(os.path.join(snapshot_dir, d))]
+    return sorted(names, key=lambda name: (_version_number(name), name))
+
+
+def _prune(snapshot_dir: str, just_built: str):
+    """Remove all but the KEEP_VERSIONS newest versions, never the one CURRENT names."""
+    keep = {just_built, os.path.basename(_current_version_dir(snapshot_dir) or "")}
+    for old in _versions(snapshot_dir)[:-KEEP_VERSIONS]:
+        if old not in keep:
+            shutil.rmtree(os.path.join(snapshot_dir, old), ignore_errors=True)
+
+
+def build_snapshot(db, snapshot_dir: str = SNAPSHOT_DIR) -> str:
+    """Write a new snapshot version from the database and point CURRENT at it."""
+    from sqlalchemy import func
+
+    from backend.models import Category, Tool, tool_category_association
+
+    # Read before the data, so the snapshot is at least as new as this version
+    feed_version = _feed_version(db)
+    tools = db.query(
+        Tool.id, Tool.name, Tool.description, Tool.link, Tool.logo_url,
+        Tool.pricing_type, Tool.user_id, Tool.date_added, Tool.link_status, Tool.logo_status,
+    ).filter(Tool.is_approved == True).order_by(Tool.id).all()
+    # tool_count matches GET /categories/, which counts every linked tool
+    categories = (
+        db.query(Category.id, Category.name, func.count(tool_category_association.c.tool_id))
+        .outerjoin(tool_category_association, tool_category_association.c.category_id == Category.id)
+        .group_by(Category.id, Category.name)
+        .order_by(Category.id)
+        .all()
+    )
+    links = db.query(tool_category_association.c.tool_id, tool_category_association.c.category_id).all()
+
+    tool_position = {row.id: i for i, row in enumerate(tools)}
+    category_position = {row[0]: i for i, row in enumerate(categories)}
+    per_tool: Dict[int, List[int]] = {}
+    for tool_id, category_id in links:
+        if tool_id in tool_position and category_id in category_position:
+            per_tool.setdefault(tool_position[tool_id], []).append(category_position[category_id])
+    indptr, indices = [0], []
+    for i in range(len(tools)):
+        indices.extend(sorted(per_tool.get(i, [])))
+        indptr.append(len(indices))
+
+    # Builds are serialized by the lock in `rebuild`, so the counter only goes up
+    os.makedirs(snapshot_dir, exist_ok=True)
+    counter = max((_version_number(v) for v in _versions(snapshot_dir)), default=0) + 1
+    version = f"{counter:012d}-{os.getpid()}"
+    version_dir = os.path.join(snapshot_dir, version)
+    os.makedirs(version_dir, exist_ok=True)
+    save = lambda name, array: np.save(os.path.join(version_dir, name), array)
+
+    save("tool_ids.npy", np.array([row.id for row in tools], dtype=np.int64))
+    save("tool_date_added.npy", np.array(
+        [(row.date_added - _EPOCH) // timedelta(microseconds=1) if row.date_added else -1 for row in tools],
+        dtype=np.int64,
+    ))
+    for column in TOOL_STRING_COLUMNS:
+        _save_strings(version_dir, f"tool_{column}", [getattr(row, column) for row in tools])
+    save("tool_category_indptr.npy", np.array(indptr, dtype=np.int32))
+    save("tool_category_indices.npy", np.array(indices, dtype=np.int32))
+    save("category_ids.npy", np.array([row[0] for row in categories], dtype=np.int64))
+    save("category_tool_counts.npy", np.array([row[2] for row in categories], dtype=np.int64))
+    _save_strings(version_dir, "category_name", [row[1] for row in categories])
+    with open(os.path.join(version_dir, "meta.json"), "w") as f:
+        json.dump({
+            "format": SNAPSHOT_FORMAT,
+            "tools": len(tools),
+            "categories": len(categories),
+            "database": _database_fingerprint(),
+            "version": feed_version,
+            "built_at": time.time(),
+        }, f)
+
+    pointer = os.path.join(snapshot_dir, "CURRENT")
+    with open(pointer + ".tmp", "w") as f:
+        f.write(version)
+    os.replace(pointer + ".tmp", pointer)
+
+    _prune(snapshot_dir, version)
+    return version_dir
+
+
+# --- Serving ---
+
+class _Strings:
+    """A memory-mapped string column; values are decoded on access."""
+
+    def __init__(self, version_dir: str, prefix: str):
+        load = lambda name: np.load(os.path.join(version_dir, f"{prefix}.{name}.npy"), mmap_mode="r")
+        self.offsets, self.blob, self.null = load("offsets"), load("blob"), load("null")
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        if self.null[i]:
+            return None
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+
+class CatalogSnapshot:
+    def __init__(self, version_dir: str, version: int = 0):
+        self.version_dir = version_dir
+        self.version = version
+        load = lambda name: np.load(os.path.join(version_dir, name), mmap_mode="r")
+        self.tool_ids = load("tool_ids.npy")
+        self.tool_date_added = load("tool_date_added.npy")
+        self.tool_columns = {c: _Strings(version_dir, f"tool_{c}") for c in TOOL_STRING_COLUMNS}
+        self.category_indptr = load("tool_category_indptr.npy")
+        self.category_indices = load("tool_category_indices.npy")
+        self.category_ids = load("category_ids.npy")
+        self.category_tool_counts = load("category_tool_counts.npy")
+        self.category_names = _Strings(version_dir, "category_name")
+
+    @property
+    def tool_count(self) -> int:
+        return len(self.tool_ids)
+
+    def position(self, tool_id: int) -> Optional[int]:
+        i = int(np.searchsorted(self.tool_ids, tool_id))
+        return i if i < len(self.tool_ids) and self.tool_ids[i] == tool_id else None
+
+    def _categories_of(self, i: int) -> List[dict]:
+        return [
+            {"id": int(self.category_ids[c]), "name": self.category_names[c]}
+            for c in self.category_indices[self.category_indptr[i]:self.category_indptr[i + 1]]
+        ]
+
+    def record(self, i: int, fields: Optional[Sequence[str]] = None) -> dict:
+        """Tool at position i as a Tool-shaped dict (only `fields` if given)."""
+        wanted = fields or ("id", *TOOL_STRING_COLUMNS, "is_approved", "date_added", "categories")
+        record = {}
+        for field in wanted:
+            if field == "id":
+                record["id"] = int(self.tool_ids[i])
+            elif field == "is_approved":
+                record["is_approved"] = True
+            elif field == "date_added":
+                micros = int(self.tool_date_added[i])
+                record["date_added"] = _EPOCH + timedelta(microseconds=micros) if micros >= 0 else None
+            elif field == "categories":
+                record["categories"] = self._categories_of(i)
+            else:
+                record[field] = self.tool_columns[field][i]
+        return record
+
+    def tools(self, skip: int, limit: int, fields: Optional[Sequence[str]] = None) -> List[dict]:
+        """Approved tools in id order (the order GET /tools/ pages through)."""
+        return [self.record(i, fields) for i in range(skip, min(skip + limit, self.tool_count))]
+
+    def tools_by_ids(self, tool_ids: Sequence[int], fields: Optional[Sequence[str]] = None) -> Optional[List[dict]]:
+        """Tools in the given order, or None if any is missing from this snapshot."""
+        positions = [self.position(t) for t in tool_ids]
+        if any(p is None for p in positions):
+            return None
+        return [self.record(p, fields) for p in positions]
+
+    def tool(self, tool_id: int) -> Optional[dict]:
+        i = self.position(tool_id)
+        return self.record(i) if i is not None else None
+
+    def categories(self, skip: int, limit: int) -> List[dict]:
+        return [
+            {"id": int(self.category_ids[i]), "name": self.category_names[i], "tool_count": int(self.category_tool_counts[i])}
+            for i in range(skip, min(skip + limit, len(self.category_ids)))
+        ]
+
+
+_snapshot: Optional[CatalogSnapshot] = None
+_dirty = False
+# Feed version other workers have reported; older snapshots aren't served
+_required_version = 0
+_checked_at = 0.0
+_failed_at = float("-inf")
+_load_lock = threading.Lock()
+_build_lock = threading.Lock()
+
+
+def _current_version_dir(snapshot_dir: str = SNAPSHOT_DIR) -> Optional[str]:
+    try:
+        with open(os.path.join(snapshot_dir, "CURRENT")) as f:
+            return os.path.join(snapshot_dir, f.read().strip())
+    except OSError:
+        return None
+
+
+def _load_current() -> bool:
+    """
+    Map the version CURRENT names. Returns False if it couldn't be read (e.g.
+    removed by another worker's cleanup); the previous snapshot is kept then.
+    """
+    global _snapshot
+    version_dir = _current_version_dir()
+    if version_dir and (_snapshot is None or _snapshot.version_dir != version_dir):
+        with _load_lock:
+            if _snapshot is None or _snapshot.version_dir != version_dir:
+                try:
+                    with open(os.path.join(version_dir, "meta.json")) as f:
+                        meta = json.load(f)
+                    if meta.get("database") == _database_fingerprint() and meta.get("format", 1) == SNAPSHOT_FORMAT:
+                        _snapshot = CatalogSnapshot(version_dir, meta.get("version", 0))
+                except (OSError, ValueError) as e:
+                    print(f"Could not load catalog snapshot {version_dir}: {e}")
+                    return False
+    return True
+
+
+def _is_current() -> bool:
+    return _snapshot is not None and not _dirty and _snapshot.version >= _required_version
+
+
+def rebuild(only_if_stale: bool = False):
+    """
+    Write a fresh version and map it. Changes arriving mid-build trigger
+    another pass. With only_if_stale, a current version another worker wrote
+    while we waited for the lock is used as is.
+    """
+    global _dirty, _failed_at
+    if not _build_lock.acquire(blocking=False):
+        return  # this worker is already building
+    from backend.database.database import SessionLocal
+
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        with open(os.path.join(SNAPSHOT_DIR, ".lock"), "w") as lock_file:
+            if fcntl:
+                # One writer across workers; the others wait and then map its result
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            _load_current()
+            if only_if_stale and _is_current():
+                return
+            first = True
+            while first or _dirty:
+                first = False
+                _dirty = False
+                db = SessionLocal()
+                try:
+                    build_snapshot(db)
+                finally:
+                    db.close()
+                if not _load_current():
+                    # Keep serving from the database until a build maps cleanly
+                    _dirty = True
+                    raise RuntimeError("the version just built could not be mapped")
+    except Exception as e:
+        _failed_at = time.monotonic()
+        print(f"❌ Catalog snapshot build failed: {e}")
+    finally:
+        _build_lock.release()
+
+
+def _rebuild_in_background(only_if_stale: bool = False):
+    # Back off after a failure (e.g. read-only disk) instead of retrying per request
+    if not _build_lock.locked() and time.monotonic() - _failed_at > BUILD_RETRY_SECONDS:
+        threading.Thread(target=rebuild, args=(only_if_stale,), daemon=True).start()
+
+
+@catalog_events.subscribe(local_only=True)
+def invalidate(tool_ids=(), category_ids=()):
+    global _dirty
+    _dirty = True
+    _rebuild_in_background()
+
+
+@catalog_events.subscribe(remote_only=True)
+def require_version(tool_ids=(), category_ids=()):
+    """Another worker changed the catalog; only one of us needs to rebuild."""
+    global _required_version
+    _required_version = max(_required_version, catalog_events.latest_version())
+    _rebuild_in_background(only_if_stale=True)
+
+
+@register_warmup
+def warm_up():
+    global _required_version
+    if not CATALOG_SNAPSHOT_ENABLED:
+        return
+    from backend.database.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        # Changes made while this worker was down (e.g. by bulk_imports) count too
+        _required_version = max(_required_version, _feed_version(db))
+    finally:
+        db.close()
+    rebuild(only_if_stale=True)
+
+
+def get_snapshot() -> Optional[CatalogSnapshot]:
+    """
+    Snapshot to serve from, or None when callers should query the database
+    (disabled, not built yet, or older than the latest known change).
+    """
+    global _checked_at, _dirty
+    if not CATALOG_SNAPSHOT_ENABLED:
+        return None
+    now = time.monotonic()
+    if now - _checked_at > CATALOG_SNAPSHOT_CHECK_SECONDS:
+        _checked_at = now
+        if not _load_current():
+            _dirty = True
+        if _snapshot is None:
+            _rebuild_in_background(only_if_stale=True)
+    if _build_lock.locked():
+        return None  # a build for a change we know about is still running
+    if not _is_current():
+        _rebuild_in_background(only_if_stale=not _dirty)
+        return None
+    return _snapshot
+
+
+if __name__ == "__main__":
+    from backend.database.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        path = build_snapshot(db)
+        print(f"✅ Built catalog snapshot at {path} in {time.perf_counter() - started:.2f}s")
+    finally:
+        db.close()
@@ -0,0 +1,133 @@
+"""
+In-memory id <-> name map of the categories, for validating and resolving
+category ids and names without a query per request (or per imported name).
+
+The whole table is loaded with one SELECT on first use. The category routes
+update it in place after every create / rename / delete, and other workers'
+category changes (or a publish without ids, e.g. from bulk_imports) drop it
+so the next lookup reloads. An id that isn't in the map triggers one reload
+before it is reported missing, so a category created elsewhere a moment ago
+is never rejected. CATEGORY_REGISTRY_TTL_SECONDS bounds how long a missed
+deletion can go unnoticed.
+"""
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.database.database import dialect_insert
+from backend.models import Category
+from backend.services import catalog_events
+
+# --- Configuration ---
+
+CATEGORY_REGISTRY_TTL_SECONDS = float(os.getenv("CATEGORY_REGISTRY_TTL_SECONDS", "300"))
+
+_names: Optional[Dict[int, str]] = None  # id -> name
+_ids: Dict[str, int] = {}  # name -> id
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+def invalidate():
+    global _names
+    _names = None
+
+
+@catalog_events.subscribe(remote_only=True)
+def _on_catalog_change(tool_ids=(), category_ids=()):
+    # Tool-only changes don't touch category names
+    if category_ids or not tool_ids:
+        invalidate()
+
+
+def _load(db: Session, force: bool = False) -> Dict[int, str]:
+    global _names, _ids, _loaded_at
+    names = _names
+    if names is not None and not force and time.monotonic() - _loaded_at < CATEGORY_REGISTRY_TTL_SECONDS:
+        return names
+    with _lock:
+        rows = db.execute(select(Category.id, Category.name)).all()
+        _ids = {name: category_id for category_id, name in rows}
+        _names = {category_id: name for category_id, name in rows}
+        _loaded_at = time.monotonic()
+        return _names
+
+
+def register(category_id: int, name: str):
+    """Record a committed create or rename."""
+    global _names, _ids
+    with _lock:
+        if _names is None:
+            return
+        # Copy on write: lookups read the maps without the lock
+        names, ids = dict(_names), dict(_ids)
+        old = names.get(category_id)
+        if old is not None and ids.get(old) == category_id:
+            del ids[old]
+        names[category_id] = name
+        ids[name] = category_id
+        _names, _ids = names, ids
+
+
+def forget(category_id: int):
+    """Record a committed delete."""
+    global _names, _ids
+    with _lock:
+        if _names is None or category_id not in _names:
+            return
+        names, ids = dict(_names), dict(_ids)
+        name = names.pop(category_id)
+        if ids.get(name) == category_id:
+            del ids[name]
+        _names, _ids = names, ids
+
+
+# --- Lookups ---
+
+def missing_ids(db: Session, category_ids: Iterable[int]) -> Set[int]:
+    """The ids that don't name an existing category (empty when all do)."""
+    wanted = set(category_ids)
+    missing = wanted - _load(db).keys()
+    if missing:
+        missing = wanted - _load(db, force=True).keys()
+    return missing
+
+
+def name(db: Session, category_id: int) -> Optional[str]:
+    """The category's name, or None if it doesn't exist."""
+    names = _load(db)
+    if category_id not in names:
+        names = _load(db, force=True)
+    return names.get(category_id)
+
+
+def resolve_names(db: Session, names: Iterable[str], create: bool = False) -> Dict[str, int]:
+    """
+    Map category names to ids. With create=True the unknown names are
+    inserted in one statement as part of the caller's transaction (they
+    reach the map once the next lookup reloads it); otherwise they are left
+    out of the result.
+    """
+    wanted = list(dict.fromkeys(names))
+    _load(db)
+    ids = _ids
+    resolved = {n: ids[n] for n in wanted if n in ids}
+    unknown = [n for n in wanted if n not in resolved]
+    if not unknown:
+        return resolved
+
+    if create:
+        db.execute(
+            dialect_insert(db, Category.__table__)
+            .values([{"name": n} for n in unknown])
+            .on_conflict_do_nothing()
+        )
+        # Not committed yet; keep uncommitted ids out of the shared map
+        invalidate()
+    rows = db.execute(select(Category.id, Category.name).where(Category.name.in_(unknown))).all()
+    resolved.update({category_name: category_id for category_id, category_name in rows})
+    return resolved
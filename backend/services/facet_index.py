@@ -0,0 +1,150 @@
+"""
+In-memory bitmap index over the approved catalog for faceted filtering.
+
+Every approved tool gets a bit position (tools sorted by id). Each category
+and each pricing type keeps a Python int used as a bitset of its tools, so
+combining filters is `&` / `|` and counting a facet is `int.bit_count()`.
+No joins are needed. The index is rebuilt from the DB after a catalog change
+invalidates it, or after FACET_INDEX_TTL_SECONDS as a safety net.
+"""
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from backend.database.database import SessionLocal
+from backend.models import Tool, tool_category_association
+from backend.services import catalog_events
+
+FACET_INDEX_TTL_SECONDS = float(os.getenv("FACET_INDEX_TTL_SECONDS", "300"))
+
+
+def _bits_from_positions(positions: List[int], size: int) -> int:
+    """Python int with the given bit positions set, built in one pass via numpy."""
+    if not positions:
+        return 0
+    flags = np.zeros(size, dtype=np.uint8)
+    flags[positions] = 1
+    return int.from_bytes(np.packbits(flags, bitorder="little").tobytes(), "little")
+
+
+class FacetIndex:
+    def __init__(self, tool_ids: List[int], pricing: Dict[str, int], categories: Dict[int, int], broken: int = 0):
+        self.tool_ids = np.asarray(tool_ids, dtype=np.int64)
+        self.position = {tool_id: i for i, tool_id in enumerate(tool_ids)}
+        self.all_bits = (1 << len(tool_ids)) - 1
+        self.pricing_bits = pricing
+        self.category_bits = categories
+        # Tools whose link the link checker found dead
+        self.broken_bits = broken
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def build(cls, db) -> "FacetIndex":
+        rows = (
+            db.query(Tool.id, Tool.pricing_type, Tool.link_status)
+            .filter(Tool.is_approved == True)
+            .order_by(Tool.id)
+            .all()
+        )
+        tool_ids = [row.id for row in rows]
+        position = {tool_id: i for i, tool_id in enumerate(tool_ids)}
+
+        pricing_positions: Dict[str, List[int]] = {}
+        for row in rows:
+            if row.pricing_type:
+                pricing_positions.setdefault(row.pricing_type, []).append(position[row.id])
+
+        category_positions: Dict[int, List[int]] = {}
+        assoc = db.query(tool_category_association.c.tool_id, tool_category_association.c.category_id).all()
+        for tool_id, category_id in assoc:
+            if tool_id in position:
+                category_positions.setdefault(category_id, []).append(position[tool_id])
+
+        n = len(tool_ids)
+        return cls(
+            tool_ids,
+            {p: _bits_from_positions(pos, n) for p, pos in pricing_positions.items()},
+            {c: _bits_from_positions(pos, n) for c, pos in category_positions.items()},
+            _bits_from_positions([i for i, row in enumerate(rows) if row.link_status == "broken"], n),
+        )
+
+    # --- Bitset helpers ---
+
+    def bits_for_ids(self, tool_ids: Iterable[int]) -> int:
+        positions = [self.position[t] for t in tool_ids if t in self.position]
+        return _bits_from_positions(positions, len(self.tool_ids))
+
+    def category_filter(self, category_ids: List[int], mode: str) -> int:
+        sets = [self.category_bits.get(c, 0) for c in category_ids]
+        if mode == "and":
+            bits = self.all_bits
+            for s in sets:
+                bits &= s
+            return bits
+        bits = 0
+        for s in sets:
+            bits |= s
+        return bits
+
+    def pricing_filter(self, pricing_types: List[str]) -> int:
+        bits = 0
+        for p in pricing_types:
+            bits |= self.pricing_bits.get(p, 0)
+        return bits
+
+    def mask(self, bits: int) -> np.ndarray:
+        """Boolean array over positions, True where the bit is set."""
+        raw = np.frombuffer(bits.to_bytes((bits.bit_length() + 7) // 8, "little"), dtype=np.uint8)
+        return np.unpackbits(raw, bitorder="little", count=len(self.tool_ids)).astype(bool)
+
+    def ids(self, bits: int, skip: int = 0, limit: Optional[int] = None) -> List[int]:
+        """Tool ids for the set bits, in id order, with offset/limit applied."""
+        if not bits:
+            return []
+        positions = np.flatnonzero(self.mask(bits))
+        end = None if limit is None else skip + limit
+        return self.tool_ids[positions[skip:end]].tolist()
+
+    # --- Facet counts ---
+
+    def category_counts(self, bits: int) -> Dict[int, int]:
+        return {c: (s & bits).bit_count() for c, s in self.category_bits.items() if s & bits}
+
+    def pricing_counts(self, bits: int) -> Dict[str, int]:
+        return {p: (s & bits).bit_count() for p, s in self.pricing_bits.items() if s & bits}
+
+
+_index: Optional[FacetIndex] = None
+_dirty = True
+_lock = threading.Lock()
+
+
+@catalog_events.subscribe
+def invalidate(tool_ids=(), category_ids=()):
+    """Mark the index stale; the next read rebuilds it."""
+    global _dirty
+    _dirty = True
+
+
+def get_facet_index() -> FacetIndex:
+    """
+    The shared index. It is rebuilt from the primary, never from the request's
+    replica session: a lagging replica read right after an invalidation would
+    otherwise be cached as current for the whole TTL.
+    """
+    global _index, _dirty
+    expired = _index is not None and time.monotonic() - _index.built_at > FACET_INDEX_TTL_SECONDS
+    if _index is None or _dirty or expired:
+        with _lock:
+            if _index is None or _dirty or time.monotonic() - _index.built_at > FACET_INDEX_TTL_SECONDS:
+                # Clear the flag first so an invalidation during the build isn't lost
+                _dirty = False
+                db = SessionLocal()
+                try:
+                    _index = FacetIndex.build(db)
+                finally:
+                    db.close()
+    return _index
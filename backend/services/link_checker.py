@@ -0,0 +1,312 @@
+"""
+Link health for the catalog: each approved tool's link and logo_url.
+
+One link_checks row per URL records the last status code, latency, final
+URL after redirects and the number of consecutive failures. A run:
+
+1. syncs the rows with the catalog (new tools, edited URLs, deleted tools),
+2. claims the rows that are due (pushing next_check_at out by a lease, so
+   concurrent runs don't check the same URLs),
+3. checks them concurrently with HEAD (falling back to GET, reading only
+   the headers), at most LINK_CHECK_CONCURRENCY requests in total and
+   LINK_CHECK_PER_HOST per host,
+4. stores the results and schedules each URL again. A healthy URL is
+   rechecked after LINK_CHECK_INTERVAL_HOURS; a failing one is retried with
+   exponential backoff.
+
+After BROKEN_AFTER_FAILURES consecutive failures the tool's link_status (or
+logo_status) becomes "broken", and the next success sets it back to "ok".
+GET /tools/ returns both fields and can hide broken links.
+
+    python -m backend.services.link_checker [--all] [--max-batches N]
+
+Set LINK_CHECK_IN_BACKGROUND=true to run it from the app's lifespan hook
+instead of cron.
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+from sqlalchemy import delete, insert, select, update
+
+from backend.database.database import SessionLocal
+from backend.models import LinkCheck, Tool
+from backend.services import catalog_events
+
+# --- Configuration ---
+
+LINK_CHECK_IN_BACKGROUND = os.getenv("LINK_CHECK_IN_BACKGROUND", "false").lower() == "true"
+LINK_CHECK_CONCURRENCY = int(os.getenv("LINK_CHECK_CONCURRENCY", "200"))
+LINK_CHECK_PER_HOST = int(os.getenv("LINK_CHECK_PER_HOST", "4"))
+LINK_CHECK_TIMEOUT_SECONDS = float(os.getenv("LINK_CHECK_TIMEOUT_SECONDS", "10"))
+LINK_CHECK_INTERVAL_HOURS = float(os.getenv("LINK_CHECK_INTERVAL_HOURS", "24"))
+# URLs claimed per batch
+LINK_CHECK_BATCH = int(os.getenv("LINK_CHECK_BATCH", "5000"))
+# How often the background task looks for due checks
+LINK_CHECK_POLL_SECONDS = float(os.getenv("LINK_CHECK_POLL_SECONDS", "60"))
+
+# One failure can be a blip; a link is only reported broken after this many in a row
+BROKEN_AFTER_FAILURES = 2
+RETRY_BASE = timedelta(minutes=15)
+# A crashed run's claimed URLs become due again after this
+CLAIM_LEASE = timedelta(minutes=10)
+CHUNK = 1000
+USER_AGENT = "AIListing-LinkChecker/1.0"
+
+STATUS_COLUMNS = {"link": "link_status", "logo_url": "logo_status"}
+# The server answered, it just doesn't serve bots: the URL isn't dead
+REACHABLE_CODES = {401, 403}
+# Rate limited: says nothing about the URL, try again soon without counting a failure
+INCONCLUSIVE_CODES = {429}
+# Servers that mishandle HEAD; confirm with GET before counting a failure
+RETRY_WITH_GET_CODES = {403, 404, 405, 501}
+
+
+def _chunks(items: list, size: int = CHUNK):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+# --- Scheduling (sync, database) ---
+
+def sync_targets(db) -> List[int]:
+    """
+    Match link_checks to the approved catalog. Returns tools whose status was
+    reset because their URL changed.
+    """
+    wanted: Dict[Tuple[int, str], str] = {}
+    for tool_id, link, logo_url in db.execute(select(Tool.id, Tool.link, Tool.logo_url).where(Tool.is_approved == True)):
+        if link:
+            wanted[(tool_id, "link")] = link
+        if logo_url:
+            wanted[(tool_id, "logo_url")] = logo_url
+    existing = {
+        (tool_id, field): (check_id, url)
+        for check_id, tool_id, field, url in db.execute(select(LinkCheck.id, LinkCheck.tool_id, LinkCheck.field, LinkCheck.url))
+    }
+
+    now = datetime.utcnow()
+    new_rows = [
+        {"tool_id": tool_id, "field": field, "url": url, "failures": 0, "next_check_at": now}
+        for (tool_id, field), url in wanted.items() if (tool_id, field) not in existing
+    ]
+    changed = [
+        {
+            "id": existing[key][0], "url": url, "failures": 0, "next_check_at": now,
+            "status_code": None, "error": None, "latency_ms": None, "final_url": None, "checked_at": None,
+        }
+        for key, url in wanted.items() if key in existing and existing[key][1] != url
+    ]
+    gone = [check_id for key, (check_id, _) in existing.items() if key not in wanted]
+
+    for chunk in _chunks(new_rows):
+        db.execute(insert(LinkCheck), chunk)
+    if changed:
+        db.execute(update(LinkCheck), changed)
+    for chunk in _chunks(gone):
+        db.execute(delete(LinkCheck).where(LinkCheck.id.in_(chunk)))
+
+    # A status computed for the old URL says nothing about the new one
+    reset: Dict[int, dict] = {}
+    for (tool_id, field), url in wanted.items():
+        if (tool_id, field) in existing and existing[(tool_id, field)][1] != url:
+            reset.setdefault(tool_id, {"id": tool_id})[STATUS_COLUMNS[field]] = None
+    if reset:
+        db.execute(update(Tool), list(reset.values()))
+    db.commit()
+    return list(reset)
+
+
+def schedule_all(db):
+    """Make every URL due now (for `--all`)."""
+    db.execute(update(LinkCheck).values(next_check_at=datetime.utcnow()))
+    db.commit()
+
+
+def claim_due(db, limit: int = LINK_CHECK_BATCH) -> list:
+    """Rows due for a check, leased to this run."""
+    now = datetime.utcnow()
+    due_ids = db.execute(
+        select(LinkCheck.id).where(LinkCheck.next_check_at <= now).order_by(LinkCheck.next_check_at).limit(limit)
+    ).scalars().all()
+    claimed = []
+    for chunk in _chunks(due_ids):
+        # Re-checking next_check_at skips rows another run claimed in the meantime
+        claimed.extend(db.execute(
+            update(LinkCheck)
+            .where(LinkCheck.id.in_(chunk), LinkCheck.next_check_at <= now)
+            .values(next_check_at=now + CLAIM_LEASE)
+            .returning(LinkCheck.id, LinkCheck.tool_id, LinkCheck.field, LinkCheck.url, LinkCheck.failures)
+            .execution_options(synchronize_session=False)
+        ).all())
+    db.commit()
+    return claimed
+
+
+def record_results(db, results: List[tuple]) -> List[int]:
+    """Store check outcomes and reschedule. Returns tools whose link/logo status changed."""
+    now = datetime.utcnow()
+    interval = timedelta(hours=LINK_CHECK_INTERVAL_HOURS)
+    updates = []
+    statuses: Dict[int, dict] = {}
+    for row, outcome in results:
+        code = outcome["status_code"]
+        status_value = None
+        if code in INCONCLUSIVE_CODES:
+            failures = row.failures
+            next_check = now + RETRY_BASE
+        elif code is not None and (code < 400 or code in REACHABLE_CODES):
+            failures = 0
+            # Jitter spreads the next full pass instead of repeating this run's burst
+            next_check = now + interval * random.uniform(0.9, 1.1)
+            status_value = "ok"
+        else:
+            failures = row.failures + 1
+            next_check = now + min(RETRY_BASE * 2 ** (failures - 1), interval)
+            if failures >= BROKEN_AFTER_FAILURES:
+                status_value = "broken"
+        updates.append({
+            "id": row.id,
+            "status_code": code,
+            "error": outcome["error"],
+            "latency_ms": outcome["latency_ms"],
+            "final_url": outcome["final_url"],
+            "failures": failures,
+            "checked_at": now,
+            "next_check_at": next_check,
+        })
+        if status_value:
+            statuses.setdefault(row.tool_id, {})[STATUS_COLUMNS[row.field]] = status_value
+
+    for chunk in _chunks(updates):
+        db.execute(update(LinkCheck), chunk)
+
+    changed = []
+    tool_ids = list(statuses)
+    for chunk in _chunks(tool_ids):
+        for tool_id, link_status, logo_status in db.execute(
+            select(Tool.id, Tool.link_status, Tool.logo_status).where(Tool.id.in_(chunk))
+        ):
+            current = {"link_status": link_status, "logo_status": logo_status}
+            new = statuses[tool_id]
+            if any(current[column] != value for column, value in new.items()):
+                changed.append({"id": tool_id, **new})
+    if changed:
+        db.execute(update(Tool), changed)
+    db.commit()
+    return [c["id"] for c in changed]
+
+
+# --- Checking (async, network) ---
+
+async def check_url(client: httpx.AsyncClient, url: str) -> dict:
+    started = time.perf_counter()
+    try:
+        response = await client.head(url)
+        if response.status_code in RETRY_WITH_GET_CODES or response.status_code >= 500:
+            # Headers are enough; leaving the block closes the connection without reading the body
+            async with client.stream("GET", url) as response:
+                pass
+        outcome = {"status_code": response.status_code, "final_url": str(response.url), "error": None}
+    except Exception as e:
+        outcome = {"status_code": None, "final_url": None, "error": f"{type(e).__name__}: {e}"[:300]}
+    outcome["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return outcome
+
+
+async def check_all(rows: list, transport: Optional[httpx.AsyncBaseTransport] = None) -> List[tuple]:
+    """(row, outcome) for every row, bounded globally and per host. `transport` replaces the network (for tests)."""
+    overall = asyncio.Semaphore(LINK_CHECK_CONCURRENCY)
+    per_host: Dict[str, asyncio.Semaphore] = {}
+    limits = httpx.Limits(max_connections=LINK_CHECK_CONCURRENCY, max_keepalive_connections=LINK_CHECK_CONCURRENCY)
+
+    async with httpx.AsyncClient(
+        follow_redirects=True,
+        timeout=LINK_CHECK_TIMEOUT_SECONDS,
+        limits=limits,
+        headers={"User-Agent": USER_AGENT},
+        transport=transport,
+    ) as client:
+        async def check(row):
+            host = (urlsplit(row.url).hostname or "").lower()
+            host_limit = per_host.setdefault(host, asyncio.Semaphore(LINK_CHECK_PER_HOST))
+            # Host slot first, so requests queued behind a slow host don't hold global slots
+            async with host_limit:
+                async with overall:
+                    return row, await check_url(client, row.url)
+
+        return await asyncio.gather(*(check(row) for row in rows))
+
+
+# --- Runs ---
+
+def _in_session(fn, *args):
+    db = SessionLocal()
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
+
+
+async def run_pass(check_everything: bool = False, max_batches: Optional[int] = None) -> Dict[str, int]:
+    """Sync, then check due URLs batch by batch until none are left."""
+    summary = {"checked": 0, "failed": 0, "status_changes": 0}
+    reset = await asyncio.to_thread(_in_session, sync_targets)
+    if reset:
+        catalog_events.publish(tool_ids=reset)
+    if check_everything:
+        await asyncio.to_thread(_in_session, schedule_all)
+
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        rows = await asyncio.to_thread(_in_session, claim_due)
+        if not rows:
+            break
+        batches += 1
+        results = await check_all(rows)
+        changed = await asyncio.to_thread(_in_session, record_results, results)
+        if changed:
+            catalog_events.publish(tool_ids=changed)
+        summary["checked"] += len(results)
+        summary["failed"] += sum(
+            1 for _, o in results
+            if o["status_code"] is None or (o["status_code"] >= 400 and o["status_code"] not in REACHABLE_CODES | INCONCLUSIVE_CODES)
+        )
+        summary["status_changes"] += len(changed)
+    return summary
+
+
+async def run_checker():
+    """Background task started from the lifespan hook (when LINK_CHECK_IN_BACKGROUND is set)."""
+    if not LINK_CHECK_IN_BACKGROUND:
+        return
+    while True:
+        try:
+            await run_pass()
+        except Exception as e:
+            print(f"Link check run failed, retrying later: {e}")
+        await asyncio.sleep(LINK_CHECK_POLL_SECONDS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the links and logos of all approved tools.")
+    parser.add_argument("--all", action="store_true", help="Check every URL now, not just the ones that are due")
+    parser.add_argument("--max-batches", type=int, help=f"Stop after this many batches of {LINK_CHECK_BATCH}")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    summary = asyncio.run(run_pass(args.all, args.max_batches))
+    print(
+        f"✅ Checked {summary['checked']} URLs in {time.perf_counter() - started:.1f}s: "
+        f"{summary['failed']} failing, {summary['status_changes']} tools changed status"
+    )
+
+
+if __name__ == "__main__":
+    main()
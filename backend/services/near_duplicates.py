@@ -0,0 +1,201 @@
+"""
+Near-duplicate detection for scraped tool batches.
+
+Exact link dedup (tools.link_hash) misses mirror domains, localized pages and
+rebrands, which share most of their name/description text but not their URL.
+This module computes MinHash signatures over name + description shingles and
+buckets them with LSH banding, so only records that collide in some band are
+ever compared. Cost is linear in the batch size.
+
+Usage (from the repo root):
+    python -m backend.services.near_duplicates scraper/data/scraped_tools.json --against-db
+"""
+import argparse
+import json
+import re
+import zlib
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+DEFAULT_THRESHOLD = 0.5
+# Records hashed per vectorized step; bounds peak memory to a few tens of MB
+CHUNK_SIZE = 2000
+
+# Multiply-shift hash family: h(x) = ((a * x + b) mod 2**64) >> 32 with odd a
+_rng = np.random.default_rng(1)
+_PERM_A = _rng.integers(0, 1 << 63, size=NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_PERM_B = _rng.integers(0, 1 << 63, size=NUM_PERM, dtype=np.uint64)
+_SHIFT = np.uint64(32)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Filler the scraper writes when a site has no meta description; it would
+# otherwise make every such record look like a duplicate of the others
+PLACEHOLDER_DESCRIPTIONS = {"no description available. please update manually."}
+
+
+def shingles(name: str, description: str) -> List[int]:
+    """Name tokens plus description word bigrams, hashed to 32-bit ints."""
+    name_tokens = _TOKEN_RE.findall((name or "").lower())
+    description = (description or "").strip().lower()
+    if description in PLACEHOLDER_DESCRIPTIONS:
+        description = ""
+    desc_tokens = _TOKEN_RE.findall(description)
+    features = {f"n:{token}" for token in name_tokens}
+    if len(desc_tokens) > 1:
+        features.update(f"{a} {b}" for a, b in zip(desc_tokens, desc_tokens[1:]))
+    else:
+        features.update(desc_tokens)
+    if not features:
+        features.add("")
+    return [zlib.crc32(feature.encode("utf-8")) for feature in features]
+
+
+def minhash_signatures(records: Sequence[dict]) -> np.ndarray:
+    """(len(records), NUM_PERM) uint64 MinHash matrix."""
+    signatures = np.empty((len(records), NUM_PERM), dtype=np.uint64)
+    for start in range(0, len(records), CHUNK_SIZE):
+        chunk = records[start:start + CHUNK_SIZE]
+        per_record = [shingles(r.get("name", ""), r.get("description", "")) for r in chunk]
+        lengths = np.fromiter((len(s) for s in per_record), dtype=np.int64, count=len(per_record))
+        values = np.fromiter((h for s in per_record for h in s), dtype=np.uint64, count=int(lengths.sum()))
+        # (shingles, NUM_PERM) universal hashes, then the min within each record's slice
+        hashed = (values[:, None] * _PERM_A + _PERM_B) >> _SHIFT
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        signatures[start:start + len(chunk)] = np.minimum.reduceat(hashed, offsets, axis=0)
+    return signatures
+
+
+def _band_keys(signatures: np.ndarray, band: int) -> np.ndarray:
+    rows = signatures[:, band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+    # Cheap polynomial mix of the band's rows into one uint64 bucket key
+    keys = np.zeros(len(signatures), dtype=np.uint64)
+    for column in range(ROWS_PER_BAND):
+        keys = keys * np.uint64(1000003) ^ rows[:, column]
+    return keys
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int):
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+
+def find_clusters(records: Sequence[dict], threshold: float = DEFAULT_THRESHOLD) -> List[List[int]]:
+    """
+    Group records whose estimated Jaccard similarity is >= threshold.
+    Returns lists of record indexes (only groups with 2+ members), each
+    sorted so the earliest record comes first.
+    """
+    if len(records) < 2:
+        return []
+    signatures = minhash_signatures(records)
+    uf = _UnionFind(len(records))
+
+    for band in range(BANDS):
+        keys = _band_keys(signatures, band)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        # Runs of equal keys are LSH buckets; compare each member with the run head
+        boundaries = np.flatnonzero(np.diff(sorted_keys)) + 1
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries, [len(keys)]))
+        for k in np.flatnonzero(ends - starts > 1):
+            run = order[starts[k]:ends[k]]
+            head = int(run[0])
+            similarity = (signatures[run[1:]] == signatures[head]).mean(axis=1)
+            for member, score in zip(run[1:], similarity):
+                if score >= threshold:
+                    uf.union(head, int(member))
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(records)):
+        groups.setdefault(uf.find(i), []).append(i)
+    return [sorted(members) for members in groups.values() if len(members) > 1]
+
+
+def existing_tools() -> List[dict]:
+    """All tools already in the database, in the same shape as scraped records."""
+    from backend.database.database import SessionLocal
+    from backend.models import Tool
+
+    db = SessionLocal()
+    try:
+        rows = db.query(Tool.id, Tool.name, Tool.description, Tool.link).all()
+        return [
+            {"id": row.id, "name": row.name, "description": row.description, "link": row.link}
+            for row in rows
+        ]
+    finally:
+        db.close()
+
+
+def dedup_report(batch: Sequence[dict], existing: Optional[Sequence[dict]] = None,
+                 threshold: float = DEFAULT_THRESHOLD) -> dict:
+    """
+    Cluster a scraped batch (optionally together with existing tools).
+    `duplicate_indexes` lists batch records that should not be imported: they
+    match an existing tool or an earlier record in the same batch.
+    """
+    existing = list(existing or [])
+    combined = existing + list(batch)
+    clusters = find_clusters(combined, threshold)
+
+    report_clusters = []
+    duplicate_indexes = []
+    for members in clusters:
+        existing_members = [combined[i] for i in members if i < len(existing)]
+        batch_members = [i - len(existing) for i in members if i >= len(existing)]
+        # Keep the existing tool if there is one, else the first batch record
+        duplicate_indexes.extend(batch_members if existing_members else batch_members[1:])
+        report_clusters.append({
+            "existing": [{"id": t["id"], "name": t["name"], "link": t["link"]} for t in existing_members],
+            "batch": [{"index": i, "name": batch[i].get("name"), "link": batch[i].get("link")} for i in batch_members],
+        })
+
+    return {
+        "threshold": threshold,
+        "batch_size": len(batch),
+        "existing_size": len(existing),
+        "clusters": report_clusters,
+        "duplicate_indexes": sorted(duplicate_indexes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report near-duplicate tools in a scraped batch.")
+    parser.add_argument("json_filepath", help="Scraped tools JSON (same format bulk_imports.py reads)")
+    parser.add_argument("--against-db", action="store_true", help="Also compare with tools already in the database")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Minimum estimated Jaccard similarity")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    with open(args.json_filepath) as f:
+        batch = json.load(f)
+    existing = existing_tools() if args.against_db else None
+    report = dedup_report(batch, existing, args.threshold)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ {len(report['clusters'])} clusters, {len(report['duplicate_indexes'])} duplicates → {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""
+Precomputed "similar tools" index.
+
+An offline build turns every approved tool into a TF-IDF vector over its
+name + description, plus one column per category so shared categories count
+towards similarity. Rows are L2-normalized, so a sparse dot product is a
+cosine similarity. The CSR arrays are saved as .npy files and memory-mapped
+by every worker, so N workers share one copy through the page cache.
+
+Tools approved or edited after the build are appended to delta.jsonl using
+the stored vocabulary and IDF weights. Workers pick the new lines up on their next query
+without a rebuild.
+
+Usage (from the repo root):
+    python -m backend.services.similar_index
+"""
+import json
+import math
+import os
+import re
+import shutil
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+# --- Configuration ---
+
+INDEX_DIR = os.getenv("SIMILAR_INDEX_DIR", "data/similar_index")
+# Weight of the category block relative to the text block
+CATEGORY_WEIGHT = float(os.getenv("SIMILAR_CATEGORY_WEIGHT", "0.5"))
+MIN_DOCUMENT_FREQUENCY = 2
+# Older builds kept around so workers still mapping them aren't pulled out from under
+KEEP_VERSIONS = 2
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it",
+    "its", "of", "on", "or", "that", "the", "this", "to", "with", "your", "you", "ai",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+# --- Building ---
+
+def _vectorize(tokens: Sequence[str], category_ids: Iterable[int], vocab: Dict[str, Tuple[int, float]],
+               category_columns: Dict[int, int]) -> Tuple[List[int], List[float]]:
+    """Sparse (columns, values) for one tool, L2-normalized."""
+    weights: Dict[int, float] = {}
+    for term, tf in Counter(tokens).items():
+        if term in vocab:
+            column, idf = vocab[term]
+            weights[column] = (1 + math.log(tf)) * idf
+
+    text_norm = math.sqrt(sum(v * v for v in weights.values())) or 1.0
+    weights = {c: v / text_norm for c, v in weights.items()}
+    for category_id in category_ids:
+        if category_id in category_columns:
+            weights[category_columns[category_id]] = CATEGORY_WEIGHT
+
+    norm = math.sqrt(sum(v * v for v in weights.values())) or 1.0
+    columns = sorted(weights)
+    return columns, [weights[c] / norm for c in columns]
+
+
+def _load_tools(db, tool_ids: Optional[Sequence[int]] = None) -> List[Tuple[int, str, List[int]]]:
+    """(id, text, category ids) for approved tools, with categories in one extra query."""
+    from backend.models import Tool, tool_category_association
+
+    query = db.query(Tool.id, Tool.name, Tool.description).filter(Tool.is_approved == True)
+    if tool_ids is not None:
+        query = query.filter(Tool.id.in_(tool_ids))
+    rows = query.order_by(Tool.id).all()
+
+    categories: Dict[int, List[int]] = {}
+    assoc = db.query(tool_category_association.c.tool_id, tool_category_association.c.category_id)
+    if tool_ids is not None:
+        assoc = assoc.filter(tool_category_association.c.tool_id.in_(tool_ids))
+    for tool_id, category_id in assoc.all():
+        categories.setdefault(tool_id, []).append(category_id)
+
+    return [(row.id, f"{row.name} {row.description}", categories.get(row.id, [])) for row in rows]
+
+
+def _version_number(version: str) -> int:
+    """Build counter of a version name ("000000000042-<pid>"); 0 for names in another format."""
+    counter = version.split("-", 1)[0]
+    return int(counter) if counter.isdigit() and len(counter) == 12 else 0
+
+
+def _versions(index_dir: str) -> List[str]:
+    """Version directories, oldest build first."""
+    names = [d for d in os.listdir(index_dir) if os.path.isdir(os.path.join(index_dir, d))]
+    return sorted(names, key=lambda name: (_version_number(name), name))
+
+
+def _current_version(index_dir: str) -> Optional[str]:
+    try:
+        with open(os.path.join(index_dir, "CURRENT")) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _prune(index_dir: str, just_built: str):
+    """Remove all but the KEEP_VERSIONS newest versions, never the one CURRENT names."""
+    keep = {just_built, _current_version(index_dir)}
+    for old in _versions(index_dir)[:-KEEP_VERSIONS]:
+        if old not in keep:
+            shutil.rmtree(os.path.join(index_dir, old), ignore_errors=True)
+
+
+def build_index(db, index_dir: str = INDEX_DIR) -> str:
+    """Build a fresh index version and atomically point CURRENT at it."""
+    tools = _load_tools(db)
+    documents = [tokenize(text) for _, text, _ in tools]
+
+    document_frequency = Counter(term for tokens in documents for term in set(tokens))
+    n_docs = len(documents)
+    terms = sorted(t for t, df in document_frequency.items() if df >= MIN_DOCUMENT_FREQUENCY)
+    vocab = {
+        term: (column, math.log((1 + n_docs) / (1 + document_frequency[term])) + 1)
+        for column, term in enumerate(terms)
+    }
+    all_categories = sorted({c for _, _, cats in tools for c in cats})
+    category_columns = {c: len(terms) + i for i, c in enumerate(all_categories)}
+
+    indptr, indices, data = [0], [], []
+    for (tool_id, _, cats), tokens in zip(tools, documents):
+        columns, values = _vectorize(tokens, cats, vocab, category_columns)
+        indices.extend(columns)
+        data.extend(values)
+        indptr.append(len(indices))
+
+    # A build counter rather than a timestamp: two builds in the same second
+    # must not share a directory, and names must sort in build order
+    os.makedirs(index_dir, exist_ok=True)
+    counter = max((_version_number(v) for v in _versions(index_dir)), default=0) + 1
+    version = f"{counter:012d}-{os.getpid()}"
+    version_dir = os.path.join(index_dir, version)
+    os.makedirs(version_dir, exist_ok=True)
+    # int32 for both so scipy can wrap the memory maps without upcasting (copying)
+    np.save(os.path.join(version_dir, "indptr.npy"), np.asarray(indptr, dtype=np.int32))
+    np.save(os.path.join(version_dir, "indices.npy"), np.asarray(indices, dtype=np.int32))
+    np.save(os.path.join(version_dir, "data.npy"), np.asarray(data, dtype=np.float32))
+    np.save(os.path.join(version_dir, "tool_ids.npy"), np.asarray([t[0] for t in tools], dtype=np.int64))
+    with open(os.path.join(version_dir, "meta.json"), "w") as f:
+        json.dump({
+            "vocab": {term: list(entry) for term, entry in vocab.items()},
+            "category_columns": {str(c): col for c, col in category_columns.items()},
+            "n_columns": len(terms) + len(all_categories),
+        }, f)
+    open(os.path.join(version_dir, "delta.jsonl"), "w").close()
+
+    pointer = os.path.join(index_dir, "CURRENT")
+    with open(pointer + ".tmp", "w") as f:
+        f.write(version)
+    os.replace(pointer + ".tmp", pointer)
+
+    _prune(index_dir, version)
+    return version_dir
+
+
+# --- Serving ---
+
+class SimilarIndex:
+    """One loaded index version: memory-mapped base matrix plus in-memory delta rows."""
+
+    def __init__(self, version_dir: str):
+        self.version_dir = version_dir
+        load = lambda name: np.load(os.path.join(version_dir, name), mmap_mode="r")
+        with open(os.path.join(version_dir, "meta.json")) as f:
+            meta = json.load(f)
+        self.vocab = {term: tuple(entry) for term, entry in meta["vocab"].items()}
+        self.category_columns = {int(c): col for c, col in meta["category_columns"].items()}
+        self.n_columns = meta["n_columns"]
+
+        self.tool_ids = load("tool_ids.npy")
+        self.matrix = sparse.csr_matrix(
+            (load("data.npy"), load("indices.npy"), load("indptr.npy")),
+            shape=(len(self.tool_ids), self.n_columns),
+            copy=False,
+        )
+        self.row_of = {int(tool_id): row for row, tool_id in enumerate(self.tool_ids)}
+
+        self.delta_path = os.path.join(version_dir, "delta.jsonl")
+        self.delta_offset = 0
+        self.delta_rows: Dict[int, Tuple[List[int], List[float]]] = {}
+        self.delta_matrix = None
+        self.delta_ids: List[int] = []
+        # Base rows of tools that have a delta row
+        self.superseded_rows = np.empty(0, dtype=np.int64)
+        self._lock = threading.Lock()
+
+    def vectorize(self, text: str, category_ids: Iterable[int]):
+        return _vectorize(tokenize(text), category_ids, self.vocab, self.category_columns)
+
+    def append(self, rows: Iterable[Tuple[int, List[int], List[float]]]):
+        """Persist freshly approved tools so every worker sees them."""
+        lines = "".join(
+            json.dumps({"id": tool_id, "c": columns, "v": values}) + "\n"
+            for tool_id, columns, values in rows
+        )
+        if lines:
+            with open(self.delta_path, "a") as f:
+                f.write(lines)
+
+    def _refresh_delta(self):
+        """Read any delta lines other workers appended since the last query."""
+        try:
+            size = os.path.getsize(self.delta_path)
+        except OSError:
+            return
+        if size == self.delta_offset:
+            return
+        with self._lock:
+            with open(self.delta_path) as f:
+                f.seek(self.delta_offset)
+                chunk = f.read()
+            # Only consume complete lines; a concurrent append may be half-written
+            complete = chunk[: chunk.rfind("\n") + 1]
+            self.delta_offset += len(complete.encode("utf-8"))
+            for line in complete.splitlines():
+                row = json.loads(line)
+                self.delta_rows[row["id"]] = (row["c"], row["v"])
+
+            self.delta_ids = list(self.delta_rows)
+            self.superseded_rows = np.asarray(
+                [self.row_of[i] for i in self.delta_ids if i in self.row_of], dtype=np.int64
+            )
+            indptr, indices, data = [0], [], []
+            for tool_id in self.delta_ids:
+                columns, values = self.delta_rows[tool_id]
+                indices.extend(columns)
+                data.extend(values)
+                indptr.append(len(indices))
+            self.delta_matrix = sparse.csr_matrix(
+                (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int32)),
+                shape=(len(self.delta_ids), self.n_columns),
+            )
+
+    def query_vector(self, tool_id: int):
+        self._refresh_delta()
+        if tool_id in self.delta_rows:
+            columns, values = self.delta_rows[tool_id]
+            return sparse.csr_matrix((values, ([0] * len(columns), columns)), shape=(1, self.n_columns))
+        row = self.row_of.get(tool_id)
+        return self.matrix[row] if row is not None else None
+
+    def similar(self, vector, exclude_id: int, limit: int) -> List[int]:
+        self._refresh_delta()
+        scores = np.asarray((self.matrix @ vector.T).todense()).ravel()
+        # A delta row supersedes the base row for the same tool, so the old vector must not score
+        scores[self.superseded_rows] = 0
+        ids = np.asarray(self.tool_ids)
+        if self.delta_matrix is not None and self.delta_matrix.shape[0]:
+            scores = np.concatenate([scores, np.asarray((self.delta_matrix @ vector.T).todense()).ravel()])
+            ids = np.concatenate([ids, np.asarray(self.delta_ids, dtype=np.int64)])
+
+        candidates = min(len(scores), limit * 2 + 1)
+        if candidates == 0:
+            return []
+        top = np.argpartition(-scores, candidates - 1)[:candidates]
+        result, seen = [], {exclude_id}
+        for i in top[np.argsort(-scores[top])]:
+            tool_id = int(ids[i])
+            if scores[i] <= 0 or tool_id in seen:
+                continue
+            seen.add(tool_id)
+            result.append(tool_id)
+            if len(result) == limit:
+                break
+        return result
+
+
+_index: Optional[SimilarIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index(index_dir: str = INDEX_DIR) -> Optional[SimilarIndex]:
+    """Current index version, reloaded when a new build swaps CURRENT."""
+    global _index
+    version = _current_version(index_dir)
+    if version is None:
+        return None
+    version_dir = os.path.join(index_dir, version)
+    if _index is None or _index.version_dir != version_dir:
+        with _index_lock:
+            if _index is None or _index.version_dir != version_dir:
+                _index = SimilarIndex(version_dir)
+    return _index
+
+
+def similar_tool_ids(db, tool_id: int, limit: int = 5) -> List[int]:
+    index = get_index()
+    if index is None:
+        return []
+    vector = index.query_vector(tool_id)
+    if vector is None:
+        # Not indexed yet (e.g. approved before the hook existed): vectorize on the fly
+        tools = _load_tools(db, [tool_id])
+        if not tools:
+            return []
+        _, text, cats = tools[0]
+        columns, values = index.vectorize(text, cats)
+        vector = sparse.csr_matrix((values, ([0] * len(columns), columns)), shape=(1, index.n_columns))
+    return index.similar(vector, tool_id, limit)
+
+
+def add_tools(db, tool_ids: Sequence[int]):
+    """
+    Incrementally index approved tools that are new or were edited; a later
+    delta row replaces the tool's earlier vector. No-op until the first build.
+    """
+    index = get_index()
+    if index is None or not tool_ids:
+        return
+    rows = []
+    for tool_id, text, cats in _load_tools(db, tool_ids):
+        columns, values = index.vectorize(text, cats)
+        rows.append((tool_id, columns, values))
+    index.append(rows)
+
+
+if __name__ == "__main__":
+    from backend.database.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        path = build_index(db)
+        print(f"✅ Built similar-tools index at {path} in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
@@ -0,0 +1,172 @@
+"""
+Typeahead index over approved tool names and category names.
+
+Entries are kept in a sorted list of lower-cased keys, with one key per word
+start so "gmail" finds "GPT for Gmail". A prefix lookup bisects both ends of
+the prefix's key range and ranks the entries in it. One- and two-character
+prefixes match too much to rank per request, so their top-k lists are
+precomputed at build time. A longer prefix whose range is still large (a
+common word) walks the entries in popularity order instead and stops at the
+first `limit` that match.
+
+The index is rebuilt in a background thread when the catalog changes or every
+SUGGEST_REFRESH_SECONDS (popularity drifts with likes). Requests keep being
+served from the previous index meanwhile, so they never hit the database.
+"""
+import bisect
+import os
+import re
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import func
+
+from backend.database.database import SessionLocal
+from backend.models import Bookmark, Category, Like, Tool, tool_category_association
+from backend.services import catalog_events
+from backend.startup import register_warmup
+
+SUGGEST_REFRESH_SECONDS = float(os.getenv("SUGGEST_REFRESH_SECONDS", "300"))
+MAX_SUGGESTIONS = 20
+SHORT_PREFIX_LENGTH = 2
+# Key ranges up to this size are ranked directly; larger ones use the popularity order
+MAX_SCAN = 2000
+
+_WORD_START_RE = re.compile(r"(?:^|[\s\-_/:.(])(\w)")
+
+
+class Entry(NamedTuple):
+    type: str
+    id: int
+    name: str
+    score: int
+
+
+class SuggestIndex:
+    def __init__(self, entries: List[Entry]):
+        keyed = []
+        self.entry_keys: List[List[str]] = []
+        for entry_id, entry in enumerate(entries):
+            lowered = entry.name.lower()
+            starts = {m.start(1) for m in _WORD_START_RE.finditer(lowered)}
+            self.entry_keys.append([lowered[start:] for start in starts])
+            for key in self.entry_keys[-1]:
+                keyed.append((key, entry_id))
+        keyed.sort()
+        self.entries = entries
+        self.keys = [k for k, _ in keyed]
+        self.entry_ids = [e for _, e in keyed]
+        self.by_popularity = self._top(range(len(entries)), len(entries))
+        self.built_at = time.monotonic()
+
+        # Precomputed answers for very short prefixes
+        self.short: Dict[str, List[int]] = {}
+        buckets: Dict[str, set] = {}
+        for key, entry_id in keyed:
+            for length in range(1, SHORT_PREFIX_LENGTH + 1):
+                if len(key) >= length:
+                    buckets.setdefault(key[:length], set()).add(entry_id)
+        for prefix, ids in buckets.items():
+            self.short[prefix] = self._top(ids, MAX_SUGGESTIONS)
+
+    def _top(self, entry_ids, limit: int) -> List[int]:
+        return sorted(entry_ids, key=lambda i: (-self.entries[i].score, self.entries[i].name))[:limit]
+
+    def suggest(self, prefix: str, limit: int) -> List[Entry]:
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        if len(prefix) <= SHORT_PREFIX_LENGTH:
+            return [self.entries[i] for i in self.short.get(prefix, [])[:limit]]
+
+        start = bisect.bisect_left(self.keys, prefix)
+        end = bisect.bisect_left(self.keys, prefix + "\U0010ffff", start)
+        if end - start <= MAX_SCAN:
+            return [self.entries[i] for i in self._top(set(self.entry_ids[start:end]), limit)]
+
+        # Many matches, so the most popular entries hit them early
+        found = []
+        for entry_id in self.by_popularity:
+            if any(key.startswith(prefix) for key in self.entry_keys[entry_id]):
+                found.append(self.entries[entry_id])
+                if len(found) == limit:
+                    break
+        return found
+
+
+def build_index(db) -> SuggestIndex:
+    """Three grouped queries: tools with like+bookmark counts, categories with tool counts."""
+    likes = (
+        db.query(Like.tool_id, func.count(Like.id).label("n")).group_by(Like.tool_id).subquery()
+    )
+    bookmarks = (
+        db.query(Bookmark.tool_id, func.count(Bookmark.id).label("n")).group_by(Bookmark.tool_id).subquery()
+    )
+    tools = (
+        db.query(Tool.id, Tool.name, func.coalesce(likes.c.n, 0) + func.coalesce(bookmarks.c.n, 0))
+        .outerjoin(likes, likes.c.tool_id == Tool.id)
+        .outerjoin(bookmarks, bookmarks.c.tool_id == Tool.id)
+        .filter(Tool.is_approved == True)
+        .all()
+    )
+    categories = (
+        db.query(Category.id, Category.name, func.count(tool_category_association.c.tool_id))
+        .outerjoin(tool_category_association, tool_category_association.c.category_id == Category.id)
+        .group_by(Category.id, Category.name)
+        .all()
+    )
+    entries = [Entry("tool", tool_id, name, int(score)) for tool_id, name, score in tools]
+    entries += [Entry("category", cat_id, name, int(count)) for cat_id, name, count in categories]
+    return SuggestIndex(entries)
+
+
+_index: Optional[SuggestIndex] = None
+_dirty = False
+_rebuilding = threading.Lock()
+
+
+def rebuild():
+    global _index, _dirty
+    if not _rebuilding.acquire(blocking=False):
+        return  # another rebuild is already running
+    try:
+        _dirty = False
+        db = SessionLocal()
+        try:
+            _index = build_index(db)
+        finally:
+            db.close()
+    finally:
+        _rebuilding.release()
+
+
+@catalog_events.subscribe
+def invalidate(tool_ids=(), category_ids=()):
+    global _dirty
+    _dirty = True
+
+
+register_warmup(rebuild)
+
+
+def get_suggest_index() -> Optional[SuggestIndex]:
+    """
+    Current index; stale ones trigger a background rebuild and are still served.
+    None while no build has succeeded yet.
+    """
+    if _index is None:
+        try:
+            rebuild()
+        except Exception as e:
+            print(f"Suggest index build failed: {e}")
+        if _index is not None:
+            return _index
+        # A concurrent first build is in flight; wait for it
+        with _rebuilding:
+            pass
+        return _index
+    stale = _dirty or time.monotonic() - _index.built_at > SUGGEST_REFRESH_SECONDS
+    if stale and not _rebuilding.locked():
+        threading.Thread(target=rebuild, daemon=True).start()
+    return _index
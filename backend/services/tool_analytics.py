@@ -0,0 +1,163 @@
+"""
+Write-behind view and outbound-click counters.
+
+`record_view` / `record_click` run on the request path and only append to an
+in-memory ring buffer (a bounded deque: no lock, no I/O). `run_flusher`,
+started from the lifespan hook, drains the buffer every
+ANALYTICS_FLUSH_SECONDS (sooner once ANALYTICS_FLUSH_BATCH events are
+waiting), folds the events into per-tool, per-hour counts and upserts them
+into tool_activity with multi-row statements. Each worker flushes its own
+buffer; the upserts add up.
+
+A client's clicks on one tool count once per hour (per worker), so replaying
+the click endpoint can't push a tool up the trending list; the route is also
+rate limited by IP. Up to CLICK_DEDUP_SIZE (client, tool) pairs are
+remembered per hour, and clicks past that are dropped.
+
+A burst larger than ANALYTICS_BUFFER_SIZE between flushes overwrites the
+oldest events: counts are allowed to be slightly low, requests are never
+slowed down. Counts that fail to flush (database down) are kept and retried
+with the next batch.
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Set, Tuple
+
+from sqlalchemy import select
+
+# --- Configuration ---
+
+ANALYTICS_ENABLED = os.getenv("ANALYTICS_ENABLED", "true").lower() == "true"
+ANALYTICS_BUFFER_SIZE = int(os.getenv("ANALYTICS_BUFFER_SIZE", "100000"))
+ANALYTICS_FLUSH_SECONDS = float(os.getenv("ANALYTICS_FLUSH_SECONDS", "10"))
+ANALYTICS_FLUSH_BATCH = int(os.getenv("ANALYTICS_FLUSH_BATCH", "5000"))
+CLICK_DEDUP_SIZE = int(os.getenv("CLICK_DEDUP_SIZE", "200000"))
+
+# Rows per INSERT statement (keeps SQLite under its bound-parameter limit)
+UPSERT_CHUNK = 1000
+
+VIEW, CLICK = 0, 1
+
+# (tool_id, hour number since the epoch, VIEW/CLICK)
+_buffer: deque = deque(maxlen=ANALYTICS_BUFFER_SIZE)
+_dropped = 0
+# Aggregated counts that haven't reached the database yet: (tool_id, hour) -> [views, clicks]
+_unflushed: Dict[Tuple[int, int], List[int]] = {}
+_flush_lock = threading.Lock()
+# (client, tool_id) pairs that already clicked during _clicked_hour
+_clicked: Set[Tuple[str, int]] = set()
+_clicked_hour = 0
+_clicked_lock = threading.Lock()
+
+
+def _record(tool_id: int, kind: int):
+    global _dropped
+    if not ANALYTICS_ENABLED:
+        return
+    if len(_buffer) == ANALYTICS_BUFFER_SIZE:
+        _dropped += 1  # The append below evicts the oldest event
+    _buffer.append((tool_id, int(time.time()) // 3600, kind))
+
+
+def record_view(tool_id: int):
+    _record(tool_id, VIEW)
+
+
+def record_click(tool_id: int, client: str):
+    """Count a click unless this client already clicked the tool this hour."""
+    global _clicked_hour
+    if not ANALYTICS_ENABLED:
+        return
+    hour = int(time.time()) // 3600
+    with _clicked_lock:
+        if hour != _clicked_hour:
+            _clicked.clear()
+            _clicked_hour = hour
+        key = (client, tool_id)
+        if key in _clicked or len(_clicked) >= CLICK_DEDUP_SIZE:
+            return
+        _clicked.add(key)
+    _record(tool_id, CLICK)
+
+
+def _drain():
+    """Fold the buffered events into _unflushed. popleft is atomic, so writers never wait."""
+    for _ in range(len(_buffer)):
+        try:
+            tool_id, hour, kind = _buffer.popleft()
+        except IndexError:
+            break
+        counts = _unflushed.get((tool_id, hour))
+        if counts is None:
+            counts = _unflushed[(tool_id, hour)] = [0, 0]
+        counts[kind] += 1
+
+
+def flush() -> int:
+    """Upsert everything buffered so far. Returns the number of (tool, hour) rows written."""
+    global _dropped
+    from backend.database.database import SessionLocal, dialect_insert
+    from backend.models import Tool, ToolActivity
+
+    with _flush_lock:
+        _drain()
+        if not _unflushed:
+            return 0
+        if _dropped:
+            print(f"Analytics buffer overflowed; dropped {_dropped} events")
+            _dropped = 0
+
+        db = SessionLocal()
+        try:
+            # Events for deleted (or made-up) ids are discarded here rather than checked per request
+            tool_ids = {tool_id for tool_id, _ in _unflushed}
+            existing = set(db.execute(select(Tool.id).where(Tool.id.in_(tool_ids))).scalars())
+            rows = [
+                {
+                    "tool_id": tool_id,
+                    "hour": datetime.utcfromtimestamp(hour * 3600),
+                    "views": views,
+                    "clicks": clicks,
+                }
+                for (tool_id, hour), (views, clicks) in _unflushed.items()
+                if tool_id in existing
+            ]
+            insert = dialect_insert(db, ToolActivity.__table__)
+            for start in range(0, len(rows), UPSERT_CHUNK):
+                db.execute(
+                    insert.values(rows[start:start + UPSERT_CHUNK]).on_conflict_do_update(
+                        index_elements=["tool_id", "hour"],
+                        set_={
+                            "views": ToolActivity.views + insert.excluded.views,
+                            "clicks": ToolActivity.clicks + insert.excluded.clicks,
+                        },
+                    )
+                )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Analytics flush failed, will retry: {e}")
+            return 0
+        finally:
+            db.close()
+        _unflushed.clear()
+        return len(rows)
+
+
+async def run_flusher():
+    """Background task started from the lifespan hook; flushes once more on shutdown."""
+    if not ANALYTICS_ENABLED:
+        return
+    last_flush = time.monotonic()
+    try:
+        while True:
+            await asyncio.sleep(1)
+            if len(_buffer) >= ANALYTICS_FLUSH_BATCH or time.monotonic() - last_flush >= ANALYTICS_FLUSH_SECONDS:
+                last_flush = time.monotonic()
+                await asyncio.to_thread(flush)
+    finally:
+        await asyncio.to_thread(flush)
@@ -0,0 +1,136 @@
+"""
+Everything the tool detail page shows, assembled in a fixed number of queries.
+
+The anonymous part (tool, categories, like/bookmark counts, related tools) is
+the same for every visitor. It is cached per tool for DETAIL_CACHE_SECONDS and
+dropped when the tool changes. For a signed-in viewer the liked/bookmarked
+flags and fresh like/bookmark counts come from one statement per request, so
+right after a like the counts agree with `viewer.liked`.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import exists, func, select
+from sqlalchemy.orm import Session, selectinload
+
+from backend.database.database import SessionLocal
+from backend.models import Bookmark, Like, Tool as ToolModel, tool_category_association
+from backend.schemas import Tool, ToolDetail, ViewerState
+from backend.services import catalog_events, similar_index
+
+# Anonymous counts only drift by a few likes within this window; catalog edits evict immediately
+DETAIL_CACHE_SECONDS = float(os.getenv("DETAIL_CACHE_SECONDS", "30"))
+DETAIL_CACHE_SIZE = int(os.getenv("DETAIL_CACHE_SIZE", "1000"))
+RELATED_LIMIT = 5
+
+_cache: "OrderedDict[int, tuple]" = OrderedDict()
+_lock = threading.Lock()
+
+
+@catalog_events.subscribe
+def invalidate(tool_ids=(), category_ids=()):
+    with _lock:
+        if category_ids or not tool_ids:
+            # Category renames show up in every cached tool; no ids means "anything changed"
+            _cache.clear()
+        for tool_id in tool_ids:
+            _cache.pop(tool_id, None)
+
+
+def _related(db: Session, tool: ToolModel) -> list:
+    """Tools from the similarity index, falling back to the newest tools sharing a category."""
+    related_ids = similar_index.similar_tool_ids(db, tool.id, RELATED_LIMIT)
+    query = db.query(ToolModel).options(selectinload(ToolModel.categories)).filter(ToolModel.is_approved == True)
+    if related_ids:
+        by_id = {t.id: t for t in query.filter(ToolModel.id.in_(related_ids))}
+        return [by_id[i] for i in related_ids if i in by_id]
+
+    category_ids = [c.id for c in tool.categories]
+    if not category_ids:
+        return []
+    shares_category = (
+        select(tool_category_association.c.tool_id)
+        .where(tool_category_association.c.category_id.in_(category_ids))
+    )
+    return (
+        query.filter(ToolModel.id.in_(shares_category), ToolModel.id != tool.id)
+        .order_by(ToolModel.date_added.desc())
+        .limit(RELATED_LIMIT)
+        .all()
+    )
+
+
+def _build(db: Session, tool_id: int) -> Optional[ToolDetail]:
+    tool = (
+        db.query(ToolModel)
+        .options(selectinload(ToolModel.categories))
+        .filter(ToolModel.id == tool_id, ToolModel.is_approved == True)
+        .first()
+    )
+    if tool is None:
+        return None
+
+    like_count, bookmark_count = db.execute(
+        select(
+            select(func.count(Like.id)).where(Like.tool_id == tool_id).scalar_subquery(),
+            select(func.count(Bookmark.id)).where(Bookmark.tool_id == tool_id).scalar_subquery(),
+        )
+    ).one()
+
+    return ToolDetail(
+        **Tool.model_validate(tool).model_dump(),
+        like_count=like_count,
+        bookmark_count=bookmark_count,
+        related=[Tool.model_validate(t) for t in _related(db, tool)],
+    )
+
+
+def get_anonymous_detail(tool_id: int) -> Optional[ToolDetail]:
+    now = time.monotonic()
+    with _lock:
+        cached = _cache.get(tool_id)
+        if cached and cached[0] > now:
+            _cache.move_to_end(tool_id)
+            return cached[1]
+
+    # Shared cache: built from the primary so a lagging replica isn't cached
+    db = SessionLocal()
+    try:
+        detail = _build(db, tool_id)
+    finally:
+        db.close()
+    if detail is not None:
+        with _lock:
+            _cache[tool_id] = (now + DETAIL_CACHE_SECONDS, detail)
+            _cache.move_to_end(tool_id)
+            while len(_cache) > DETAIL_CACHE_SIZE:
+                _cache.popitem(last=False)
+    return detail
+
+
+def _viewer_update(db: Session, tool_id: int, user_id: str) -> dict:
+    """The viewer's flags plus current counts, which the viewer's own toggles may have just changed."""
+    liked, bookmarked, like_count, bookmark_count = db.execute(
+        select(
+            exists().where(Like.tool_id == tool_id, Like.user_id == user_id),
+            exists().where(Bookmark.tool_id == tool_id, Bookmark.user_id == user_id),
+            select(func.count(Like.id)).where(Like.tool_id == tool_id).scalar_subquery(),
+            select(func.count(Bookmark.id)).where(Bookmark.tool_id == tool_id).scalar_subquery(),
+        )
+    ).one()
+    return {
+        "viewer": ViewerState(liked=liked, bookmarked=bookmarked),
+        "like_count": like_count,
+        "bookmark_count": bookmark_count,
+    }
+
+
+def get_detail(db: Session, tool_id: int, user_id: Optional[str]) -> Optional[ToolDetail]:
+    detail = get_anonymous_detail(tool_id)
+    if detail is None or user_id is None:
+        return detail
+    # Copy so the cached, shared instance never carries a viewer
+    return detail.model_copy(update=_viewer_update(db, tool_id, user_id))
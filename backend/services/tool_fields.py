@@ -0,0 +1,87 @@
+"""
+Sparse fieldsets for tool listings.
+
+`?fields=name,logo_url` (or the `card` preset) selects only those columns in
+SQL. Categories are loaded with one extra query, and only when asked for.
+Projected rows are plain dicts, not Tool models, so routes return them
+through `response()` instead of their response_model.
+"""
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Query as SAQuery, Session
+
+from backend.models import Category, Tool as ToolModel, tool_category_association
+
+FIELDS = (
+    "id", "name", "description", "link", "logo_url", "pricing_type",
+    "is_approved", "user_id", "date_added", "categories", "link_status", "logo_status",
+)
+PRESETS = {
+    # What card grids and the compare picker render
+    "card": ("id", "name", "logo_url", "pricing_type"),
+}
+
+
+def parse_fields(
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated tool fields to return, or 'card' for id, name, logo_url and pricing_type",
+    )
+) -> Optional[List[str]]:
+    """Dependency: None means the full Tool schema."""
+    if not fields:
+        return None
+    selected = ["id"]  # always returned; clients key on it
+    for name in (part.strip() for part in fields.split(",")):
+        if name in PRESETS:
+            selected.extend(PRESETS[name])
+        elif name in FIELDS:
+            selected.append(name)
+        elif name:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown field '{name}'. Allowed: {', '.join(FIELDS)} or {', '.join(PRESETS)}"
+            )
+    return list(dict.fromkeys(selected))
+
+
+def _category_lists(db: Session, tool_ids: List[int]) -> Dict[int, List[dict]]:
+    if not tool_ids:
+        return {}
+    rows = (
+        db.query(tool_category_association.c.tool_id, Category.id, Category.name)
+        .join(Category, Category.id == tool_category_association.c.category_id)
+        .filter(tool_category_association.c.tool_id.in_(tool_ids))
+        .all()
+    )
+    categories: Dict[int, List[dict]] = {}
+    for tool_id, category_id, name in rows:
+        categories.setdefault(tool_id, []).append({"id": category_id, "name": name})
+    return categories
+
+
+def fetch(db: Session, query: SAQuery, fields: List[str]) -> List[dict]:
+    """Run a ToolModel query selecting only the requested columns."""
+    columns = [getattr(ToolModel, name) for name in fields if name != "categories"]
+    records = [dict(row._mapping) for row in query.with_entities(*columns)]
+    if "categories" in fields:
+        categories = _category_lists(db, [r["id"] for r in records])
+        for record in records:
+            record["categories"] = categories.get(record["id"], [])
+    return records
+
+
+def fetch_ordered(db: Session, tool_ids: List[int], fields: List[str]) -> List[dict]:
+    """Projected tools for the given ids, in the order given."""
+    if not tool_ids:
+        return []
+    records = fetch(db, db.query(ToolModel).filter(ToolModel.id.in_(tool_ids)), fields)
+    by_id = {r["id"]: r for r in records}
+    return [by_id[i] for i in tool_ids if i in by_id]
+
+
+def response(records: List[dict]) -> JSONResponse:
+    return JSONResponse(jsonable_encoder(records))
@@ -0,0 +1,324 @@
+"""
+Trending ranking: exponentially decayed likes, bookmarks, views and clicks.
+
+A tool's score is the sum of weight * 2^(-age / TRENDING_HALF_LIFE_HOURS)
+over its events. Every score decays by the same factor as time passes, so
+the stored value is taken relative to a fixed anchor time instead:
+weight * 2^((event time - anchor) / half-life). Ranking by the stored value
+is then the same as ranking by the decayed score. When the anchor gets old,
+all scores are rescaled to a new one (one UPDATE) to keep the numbers in
+float range.
+
+The score has two parts, both applied incrementally:
+
+- activity (views and clicks): `update` reads the tool_activity hours after
+  the cursor in trending_state, once they are closed, i.e. an hour plus
+  ACTIVITY_GRACE after they started, because the analytics flusher keeps
+  adding to the current hour.
+- engagement (likes and bookmarks): `update` reads the engagement_events
+  after its cursor. Every like or bookmark added or removed through the ORM
+  logs one, with the row's created_at, so a removal subtracts exactly what
+  the addition added and cycling like/unlike never counts a (user, tool)
+  pair more than once. Events are read once ENGAGEMENT_GRACE old, so a
+  slow transaction's lower id isn't skipped. The first run scores the
+  likes and bookmarks of the last TRENDING_WINDOW_HALF_LIVES half-lives
+  from the tables instead.
+
+Each run is claimed with a conditional UPDATE of trending_state.run_at, so
+only one worker runs per interval and the cursors are never applied twice.
+
+Every worker runs `run_job` from the lifespan hook. It can also run from
+cron:
+
+    python -m backend.services.trending
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import delete, func, or_, select, update as sql_update
+
+from backend.database.database import SessionLocal, dialect_insert
+from backend.models import Bookmark, EngagementEvent, Like, ToolActivity, ToolTrending, TrendingState
+
+# --- Configuration ---
+
+TRENDING_JOB_ENABLED = os.getenv("TRENDING_JOB_ENABLED", "true").lower() == "true"
+TRENDING_INTERVAL_SECONDS = float(os.getenv("TRENDING_INTERVAL_SECONDS", "300"))
+TRENDING_HALF_LIFE_HOURS = float(os.getenv("TRENDING_HALF_LIFE_HOURS", "48"))
+# How often a worker reloads the scores it ranks by
+TRENDING_REFRESH_SECONDS = float(os.getenv("TRENDING_REFRESH_SECONDS", "60"))
+# Only the top N scores are kept in memory; the rest rank as zero (by id)
+TRENDING_TOP_N = int(os.getenv("TRENDING_TOP_N", "10000"))
+
+WEIGHTS = {"like": 3.0, "bookmark": 2.0, "click": 1.0, "view": 0.2}
+# Older likes and bookmarks add less than 2^-10 of a fresh one; the first run leaves them out
+TRENDING_WINDOW_HALF_LIVES = 10
+# Read per run; a backlog is worked off over several runs
+ACTIVITY_HOURS_PER_RUN = 24
+ENGAGEMENT_EVENTS_PER_RUN = 50000
+UPSERT_CHUNK = 1000
+# Analytics flushes land well within this after the hour ends
+ACTIVITY_GRACE = timedelta(minutes=5)
+# Like/bookmark transactions commit well within this
+ENGAGEMENT_GRACE = timedelta(seconds=30)
+# A worker skips its run if another one started within this share of the interval
+RUN_SPACING = 0.9
+# Rescale once the anchor is this many half-lives old (2^20 ~ 1e6)
+REBASE_HALF_LIVES = 20
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _utc_naive(value: Optional[datetime], default: datetime) -> datetime:
+    if value is None:
+        return default
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _growth(when: datetime, anchor: datetime) -> float:
+    return 2.0 ** ((when - anchor).total_seconds() / 3600 / TRENDING_HALF_LIFE_HOURS)
+
+
+def _load_state(db) -> TrendingState:
+    state = db.get(TrendingState, 1)
+    if state is None:
+        db.execute(
+            dialect_insert(db, TrendingState.__table__)
+            .values(id=1, anchor=datetime.utcnow(), activity_cursor=_EPOCH)
+            .on_conflict_do_nothing()
+        )
+        db.commit()
+        state = db.get(TrendingState, 1)
+    return state
+
+
+def _engagement(db, now: datetime, anchor: datetime) -> Dict[int, float]:
+    """Anchored likes + bookmarks score per tool, from the (user, tool) pairs that exist now (first run)."""
+    since = now - timedelta(hours=TRENDING_WINDOW_HALF_LIVES * TRENDING_HALF_LIFE_HOURS)
+    engagement: Dict[int, float] = defaultdict(float)
+    for kind, model in (("like", Like), ("bookmark", Bookmark)):
+        for tool_id, created_at in db.execute(select(model.tool_id, model.created_at).where(model.created_at >= since)):
+            engagement[tool_id] += WEIGHTS[kind] * _growth(_utc_naive(created_at, now), anchor)
+    return engagement
+
+
+def _upsert(db, rows: List[dict], set_):
+    insert = dialect_insert(db, ToolTrending.__table__)
+    for start in range(0, len(rows), UPSERT_CHUNK):
+        db.execute(insert.values(rows[start:start + UPSERT_CHUNK]).on_conflict_do_update(
+            index_elements=["tool_id"], set_=set_(insert.excluded),
+        ))
+
+
+def _activity(db, cursor: datetime, now: datetime, anchor: datetime):
+    """(new cursor, anchored increments) for the closed tool_activity hours after the cursor."""
+    # Hours starting before this are closed: no more flushes will add to them
+    open_from = (now - ACTIVITY_GRACE).replace(minute=0, second=0, microsecond=0)
+    first_hour = db.execute(
+        select(func.min(ToolActivity.hour))
+        .where(ToolActivity.hour > cursor, ToolActivity.hour < open_from)
+    ).scalar()
+    until = open_from
+    activity = []
+    if first_hour is not None:
+        until = min(open_from, first_hour + timedelta(hours=ACTIVITY_HOURS_PER_RUN))
+        activity = db.execute(
+            select(ToolActivity.tool_id, ToolActivity.hour, ToolActivity.views, ToolActivity.clicks)
+            .where(ToolActivity.hour >= first_hour, ToolActivity.hour < until)
+        ).all()
+    increments: Dict[int, float] = defaultdict(float)
+    for tool_id, hour, views, clicks in activity:
+        weight = WEIGHTS["view"] * views + WEIGHTS["click"] * clicks
+        increments[tool_id] += weight * _growth(hour + timedelta(minutes=30), anchor)
+    return max(cursor, until - timedelta(hours=1)), increments
+
+
+def _engagement_events(db, cursor: int, now: datetime, anchor: datetime):
+    """(new cursor, anchored increments) for the engagement events after the cursor."""
+    settled = now - ENGAGEMENT_GRACE
+    increments: Dict[int, float] = defaultdict(float)
+    for event_id, tool_id, kind, sign, happened_at, recorded_at in db.execute(
+        select(
+            EngagementEvent.id, EngagementEvent.tool_id, EngagementEvent.kind, EngagementEvent.sign,
+            EngagementEvent.happened_at, EngagementEvent.recorded_at,
+        )
+        .where(EngagementEvent.id > cursor)
+        .order_by(EngagementEvent.id)
+        .limit(ENGAGEMENT_EVENTS_PER_RUN)
+    ):
+        if recorded_at >= settled:
+            break  # Lower ids may still be uncommitted; read from here next run
+        increments[tool_id] += sign * WEIGHTS[kind] * _growth(_utc_naive(happened_at, recorded_at), anchor)
+        cursor = event_id
+    return cursor, increments
+
+
+def _claim_run(db, now: datetime) -> bool:
+    spacing = timedelta(seconds=TRENDING_INTERVAL_SECONDS * RUN_SPACING)
+    return bool(db.execute(
+        sql_update(TrendingState)
+        .where(TrendingState.id == 1, or_(TrendingState.run_at.is_(None), TrendingState.run_at <= now - spacing))
+        .values(run_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount)
+
+
+def update() -> int:
+    """Apply new activity and engagement. Returns the number of tools whose score changed."""
+    db = SessionLocal()
+    try:
+        _load_state(db)
+        now = datetime.utcnow()
+        if not _claim_run(db, now):
+            db.rollback()
+            return 0
+        # The claim locks the state row until commit, so these cursors are this run's
+        old_anchor, activity_cursor, engagement_cursor = db.execute(
+            select(TrendingState.anchor, TrendingState.activity_cursor, TrendingState.engagement_cursor)
+            .where(TrendingState.id == 1)
+        ).one()
+        anchor = old_anchor
+        if now - anchor > timedelta(hours=REBASE_HALF_LIVES * TRENDING_HALF_LIFE_HOURS):
+            anchor = now
+            factor = _growth(old_anchor, anchor)
+            db.execute(sql_update(ToolTrending).values(
+                score=ToolTrending.score * factor,
+                activity=ToolTrending.activity * factor,
+                engagement=ToolTrending.engagement * factor,
+            ))
+
+        activity_cursor, activity = _activity(db, activity_cursor, now, anchor)
+        # score stays activity + engagement in every statement
+        _upsert(
+            db,
+            [{"tool_id": t, "activity": inc, "engagement": 0.0, "score": inc} for t, inc in activity.items()],
+            lambda excluded: {
+                "activity": ToolTrending.activity + excluded.activity,
+                "score": ToolTrending.activity + excluded.activity + ToolTrending.engagement,
+            },
+        )
+
+        if engagement_cursor is None:
+            # First run: score what exists, then follow the events from here
+            engagement_cursor = db.execute(select(func.max(EngagementEvent.id))).scalar() or 0
+            engagement = _engagement(db, now, anchor)
+            stored = dict(db.execute(
+                select(ToolTrending.tool_id, ToolTrending.engagement).where(ToolTrending.engagement != 0)
+            ).all())
+            changed = {
+                tool_id: engagement.get(tool_id, 0.0) - stored.get(tool_id, 0.0)
+                for tool_id in engagement.keys() | stored.keys()
+            }
+        else:
+            engagement_cursor, changed = _engagement_events(db, engagement_cursor, now, anchor)
+        _upsert(
+            db,
+            [{"tool_id": t, "activity": 0.0, "engagement": inc, "score": inc} for t, inc in changed.items()],
+            lambda excluded: {
+                "engagement": ToolTrending.engagement + excluded.engagement,
+                "score": ToolTrending.activity + ToolTrending.engagement + excluded.engagement,
+            },
+        )
+        # Applied events are no longer needed
+        db.execute(delete(EngagementEvent).where(EngagementEvent.id <= engagement_cursor))
+
+        db.execute(
+            sql_update(TrendingState)
+            .where(TrendingState.id == 1)
+            .values(anchor=anchor, activity_cursor=activity_cursor, engagement_cursor=engagement_cursor)
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    _invalidate_scores()
+    return len(activity.keys() | changed.keys())
+
+
+async def run_job():
+    """Background task started from the lifespan hook."""
+    if not TRENDING_JOB_ENABLED:
+        return
+    while True:
+        try:
+            await asyncio.to_thread(update)
+        except Exception as e:
+            print(f"Trending update failed, retrying next run: {e}")
+        await asyncio.sleep(TRENDING_INTERVAL_SECONDS)
+
+
+# --- Ranking ---
+
+_scores: Dict[int, float] = {}
+_loaded_at: Optional[float] = None
+_version = 0
+_rank_cache: Optional[tuple] = None  # (facet index, scores version, positions in rank order)
+_lock = threading.Lock()
+
+
+def _invalidate_scores():
+    global _loaded_at
+    _loaded_at = None
+
+
+def _refresh_scores():
+    """Reload the top scores from the primary (a lagging replica would be cached for the whole interval)."""
+    global _scores, _loaded_at, _version
+    if _loaded_at is not None and time.monotonic() - _loaded_at < TRENDING_REFRESH_SECONDS:
+        return
+    with _lock:
+        if _loaded_at is not None and time.monotonic() - _loaded_at < TRENDING_REFRESH_SECONDS:
+            return
+        db = SessionLocal()
+        try:
+            rows = db.execute(
+                select(ToolTrending.tool_id, ToolTrending.score)
+                .where(ToolTrending.score > 0)
+                .order_by(ToolTrending.score.desc())
+                .limit(TRENDING_TOP_N)
+            ).all()
+        finally:
+            db.close()
+        _scores = {tool_id: score for tool_id, score in rows}
+        _version += 1
+        _loaded_at = time.monotonic()
+
+
+def _rank_order(index) -> np.ndarray:
+    """Facet index positions sorted by score, highest first; ties (and unscored tools) by id."""
+    global _rank_cache
+    cached = _rank_cache
+    if cached is not None and cached[0] is index and cached[1] == _version:
+        return cached[2]
+    scores = _scores
+    values = np.fromiter((scores.get(t, 0.0) for t in index.tool_ids.tolist()), dtype=np.float64, count=len(index.tool_ids))
+    order = np.argsort(-values, kind="stable")
+    _rank_cache = (index, _version, order)
+    return order
+
+
+def ranked_ids(index, bits: int, skip: int = 0, limit: Optional[int] = None) -> List[int]:
+    """Tool ids for the set bits of the facet index, trending first, with offset/limit applied."""
+    _refresh_scores()
+    if not bits:
+        return []
+    order = _rank_order(index)
+    selected = order[index.mask(bits)[order]]
+    end = None if limit is None else skip + limit
+    return index.tool_ids[selected[skip:end]].tolist()
+
+
+if __name__ == "__main__":
+    count = update()
+    print(f"✅ Trending scores updated for {count} tools.")
@@ -0,0 +1,70 @@
+import asyncio
+import inspect
+import os
+import time
+from typing import Awaitable, Callable, List, Union
+
+from sqlalchemy import text
+
+from backend import auth
+from backend.database.database import get_engine
+
+# --- Configuration ---
+
+# Off by default: schema changes belong to `python -m backend.migrate`
+RUN_MIGRATIONS_ON_STARTUP = os.getenv("RUN_MIGRATIONS_ON_STARTUP", "false").lower() == "true"
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "false").lower() == "true"
+# How many pooled connections to open before accepting traffic
+WARMUP_POOL_CONNECTIONS = int(os.getenv("WARMUP_POOL_CONNECTIONS", "5"))
+
+# --- Cache Priming Hooks ---
+
+# Modules that keep in-process caches register a loader here so it can be
+# filled during warm-up instead of on the first request.
+WarmupHook = Callable[[], Union[None, Awaitable[None]]]
+_warmup_hooks: List[WarmupHook] = []
+
+
+def register_warmup(hook: WarmupHook) -> WarmupHook:
+    _warmup_hooks.append(hook)
+    return hook
+
+
+def _prefill_pool(size: int):
+    """Check out `size` connections at once so the pool holds them when released."""
+    engine = get_engine()
+    connections = []
+    try:
+        for _ in range(size):
+            conn = engine.connect()
+            conn.execute(text("SELECT 1"))
+            connections.append(conn)
+    finally:
+        for conn in connections:
+            conn.close()
+
+
+async def warm_up():
+    """Pre-fill the pool, prefetch the JWKS and prime registered caches."""
+    await asyncio.to_thread(_prefill_pool, WARMUP_POOL_CONNECTIONS)
+    try:
+        await auth.get_jwks()
+    except Exception as e:
+        print(f"JWKS prefetch failed, will retry on first request: {e}")
+
+    for hook in _warmup_hooks:
+        if inspect.iscoroutinefunction(hook):
+            await hook()
+        else:
+            await asyncio.to_thread(hook)
+
+
+async def startup():
+    """Startup sequence run from the app lifespan hook."""
+    started = time.perf_counter()
+    if RUN_MIGRATIONS_ON_STARTUP:
+        from backend.migrate import run_migrations
+        await asyncio.to_thread(run_migrations)
+    if WARMUP_ON_STARTUP:
+        await warm_up()
+    print(f"Startup completed in {(time.perf_counter() - started) * 1000:.1f} ms")
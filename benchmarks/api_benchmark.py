@@ -0,0 +1,274 @@
+"""
+Reproducible latency/throughput benchmark for the AIListing API.
+
+Seeds a throwaway SQLite database through the same code paths we use in
+production (seed_data.py for the base categories, bulk_imports.py for the
+tools), stubs Clerk with a locally generated RSA key pair so authenticated
+routes go through the real JWT verification, and then measures each endpoint
+in-process.
+
+Usage (from the repo root):
+    python -m benchmarks.api_benchmark --tools 2000 --output benchmarks/results/latest.json
+    python -m benchmarks.api_benchmark --baseline benchmarks/results/v0.1.0.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+BENCH_KID = "bench-key"
+BENCH_ADMIN_ID = "bench_admin"
+
+WORDS = [
+    "writer", "vision", "voice", "agent", "copilot", "studio", "insight", "render",
+    "sketch", "notes", "translate", "summarize", "code", "design", "music", "video",
+]
+
+
+# --- Auth stub ---
+
+def make_key_pair():
+    """Generate an RSA key pair and the matching JWKS entry."""
+    from jose import jwk
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    public_jwk = jwk.construct(public_pem, "RS256").to_dict()
+    public_jwk.update({"kid": BENCH_KID, "use": "sig"})
+    return private_pem, {"keys": [public_jwk]}
+
+
+def make_token(private_pem: bytes, user_id: str) -> str:
+    from jose import jwt
+    from backend.auth import CLERK_ISSUER_URL
+
+    claims = {
+        "sub": user_id,
+        "iss": CLERK_ISSUER_URL,
+        "exp": datetime.now(timezone.utc) + timedelta(hours=1),
+    }
+    return jwt.encode(claims, private_pem, algorithm="RS256", headers={"kid": BENCH_KID})
+
+
+# --- Dataset ---
+
+def synthetic_tools(n_tools: int, n_categories: int, rng: random.Random):
+    """Build tool records in the same JSON shape the scraper writes."""
+    from backend.schemas import PricingType
+
+    category_names = [f"Bench Category {i}" for i in range(n_categories)]
+    pricing = [p.value for p in PricingType]
+    tools = []
+    for i in range(n_tools):
+        words = rng.sample(WORDS, 3)
+        tools.append({
+            "name": f"{words[0].title()} {words[1].title()} {i}",
+            "description": f"AI {words[0]} tool for {words[1]} and {words[2]} workflows. " * 3,
+            "link": f"https://tool-{i}.example.com",
+            "logo_url": f"https://tool-{i}.example.com/logo.png",
+            "pricing_type": rng.choice(pricing),
+            "categories": rng.sample(category_names, min(3, n_categories)),
+        })
+    return tools
+
+
+def seed(n_tools: int, n_categories: int, n_likes: int, n_users: int, rng: random.Random, workdir: str):
+    from sqlalchemy import insert
+    from backend import bulk_imports, seed_data
+    from backend.database.database import SessionLocal
+    from backend.migrate import run_migrations
+    from backend.models import Bookmark, Like, Tool
+
+    run_migrations()
+    db = SessionLocal()
+    try:
+        seed_data.create_categories(db)
+    finally:
+        db.close()
+
+    import_path = os.path.join(workdir, "bench_tools.json")
+    with open(import_path, "w") as f:
+        json.dump(synthetic_tools(n_tools, n_categories, rng), f)
+    bulk_imports.import_tools(import_path)
+
+    db = SessionLocal()
+    try:
+        tool_ids = [row.id for row in db.query(Tool.id).all()]
+        users = [f"bench_user_{i}" for i in range(n_users)]
+        pairs = set()
+        while len(pairs) < min(n_likes, len(tool_ids) * n_users):
+            pairs.add((rng.choice(users), rng.choice(tool_ids)))
+        rows = [{"user_id": u, "tool_id": t} for u, t in pairs]
+        if rows:
+            db.execute(insert(Like), rows)
+            db.execute(insert(Bookmark), rows[: len(rows) // 2])
+        db.commit()
+    finally:
+        db.close()
+    return tool_ids
+
+
+# --- Measurement ---
+
+def percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile over an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def measure(call, iterations: int, warmup: int):
+    for _ in range(warmup):
+        call()
+
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        response = call()
+        latencies.append((time.perf_counter() - t0) * 1000)
+        if response.status_code >= 400 and response.status_code != 204:
+            errors += 1
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "count": iterations,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "throughput_rps": round(iterations / elapsed, 1),
+    }
+
+
+def run_benchmarks(client, tool_ids, token, iterations: int, warmup: int, rng: random.Random):
+    auth = {"Authorization": f"Bearer {token}"}
+    scenarios = {
+        "list": lambda: client.get("/tools/", params={"skip": rng.randrange(0, max(1, len(tool_ids) - 50)), "limit": 50}),
+        "search": lambda: client.get("/tools/", params={"search": rng.choice(WORDS), "limit": 50}),
+        "detail": lambda: client.get(f"/tools/{rng.choice(tool_ids)}"),
+        "compare": lambda: client.post("/tools/compare", json={"ids": rng.sample(tool_ids, min(4, len(tool_ids)))}),
+        "toggle_like": lambda: client.post(f"/tools/{rng.choice(tool_ids)}/like", headers=auth),
+        "toggle_bookmark": lambda: client.post(f"/tools/{rng.choice(tool_ids)}/bookmark", headers=auth),
+        "check_like": lambda: client.get("/likes/check", params={"tool_id": rng.choice(tool_ids)}, headers=auth),
+        "check_bookmark": lambda: client.get("/bookmarks/check", params={"tool_id": rng.choice(tool_ids)}, headers=auth),
+    }
+    results = {}
+    for name, call in scenarios.items():
+        results[name] = measure(call, iterations, warmup)
+        r = results[name]
+        print(f"  {name:<16} p50={r['p50_ms']:>8.2f}ms  p95={r['p95_ms']:>8.2f}ms  "
+              f"p99={r['p99_ms']:>8.2f}ms  {r['throughput_rps']:>8.1f} req/s  errors={r['errors']}")
+    return results
+
+
+def compare_with_baseline(results, baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)["endpoints"]
+
+    print(f"\nDelta vs {baseline_path} (p95, throughput):")
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            print(f"  {name:<16} (new)")
+            continue
+        p95_delta = (current["p95_ms"] - previous["p95_ms"]) / previous["p95_ms"] * 100 if previous["p95_ms"] else 0.0
+        rps_delta = (current["throughput_rps"] - previous["throughput_rps"]) / previous["throughput_rps"] * 100 if previous["throughput_rps"] else 0.0
+        print(f"  {name:<16} p95 {p95_delta:+6.1f}%   throughput {rps_delta:+6.1f}%")
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the AIListing API against a synthetic catalog.")
+    parser.add_argument("--tools", type=int, default=1000, help="Number of synthetic tools to import")
+    parser.add_argument("--categories", type=int, default=20, help="Number of synthetic categories")
+    parser.add_argument("--likes", type=int, default=5000, help="Number of synthetic likes")
+    parser.add_argument("--users", type=int, default=200, help="Number of synthetic users")
+    parser.add_argument("--iterations", type=int, default=300, help="Measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per endpoint")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for dataset and request mix")
+    parser.add_argument("--output", default="benchmarks/results/latest.json", help="Where to write the JSON results")
+    parser.add_argument("--baseline", help="Previous results file to print deltas against")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="ailisting-bench-")
+    # Must be set before anything under backend/ is imported
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["ADMIN_USER_ID"] = BENCH_ADMIN_ID
+    os.environ["CATALOG_SNAPSHOT_DIR"] = os.path.join(workdir, "catalog_snapshot")
+    # A single synthetic user hammers the toggles; keep the limiter out of the numbers
+    for route in ("CREATE_TOOL", "EXTRACT", "TOGGLE_LIKE", "TOGGLE_BOOKMARK"):
+        os.environ[f"RATE_LIMIT_{route}"] = "1000000/1"
+
+    from fastapi.testclient import TestClient
+    from backend import auth
+    from backend.main import app
+
+    rng = random.Random(args.seed)
+    print(f"Seeding {args.tools} tools / {args.categories} categories / {args.likes} likes in {workdir} ...")
+    tool_ids = seed(args.tools, args.categories, args.likes, args.users, rng, workdir)
+
+    private_pem, jwks = make_key_pair()
+    auth._jwks_cache = jwks
+    token = make_token(private_pem, "bench_user_0")
+
+    print(f"\nRunning {args.iterations} requests per endpoint ...")
+    with TestClient(app) as client:
+        results = run_benchmarks(client, tool_ids, token, args.iterations, args.warmup, rng)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "database": "sqlite",
+            "dataset": {
+                "tools": args.tools,
+                "categories": args.categories,
+                "likes": args.likes,
+                "users": args.users,
+            },
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "seed": args.seed,
+        },
+        "endpoints": results,
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"\n✅ Results written to {args.output}")
+
+    if args.baseline:
+        compare_with_baseline(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
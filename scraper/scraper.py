@@ -1,6 +1,8 @@
 from json import tool
 from random import seed
 
+import os
+import sys
 import requests
 from bs4 import BeautifulSoup
 import json
@@ -8,6 +10,11 @@ import time
 from urllib.parse import urlparse
 import re
 
+# Share URL canonicalization and near-duplicate detection with the backend
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.services import near_duplicates
+from backend.services.canonical_url import canonicalize_url
+
 RAW_URL  = "https://raw.githubusercontent.com/steven2358/awesome-generative-ai/main/README.md"
 
 def fetch_urls_from_link(raw_url, max_urls = 50):
@@ -36,12 +43,16 @@ def fetch_urls_from_link(raw_url, max_urls = 50):
         ]
 
         clean_urls = []
+        # Canonical forms seen so far: "www." / trailing-slash / utm_ variants count once
+        seen = set()
 
         for link in all_links:
             domain = urlparse(link).netloc.lower()
 
             if not any(ignored in domain for ignored in ignore_domains):
-                if link not in clean_urls:
+                canonical = canonicalize_url(link)
+                if canonical not in seen:
+                    seen.add(canonical)
                     clean_urls.append(link)
 
             if len(clean_urls) >= max_urls: 
@@ -119,12 +130,19 @@ def main():
         tool_data = scrape_tool_info(url)
         if tool_data:
             results.append(tool_data)
-            print(f"Success. {tool_data["name"]}")
+            print(f"Success. {tool_data['name']}")
 
         #wait 2 seconds between requests
         time.sleep(2);
 
-    # Step 3: Save to JSON
+    # Step 3: Drop mirrors / rebrands (same name and description, different URL)
+    report = near_duplicates.dedup_report(results)
+    skipped = set(report["duplicate_indexes"])
+    for index in sorted(skipped):
+        print(f"Skipping near-duplicate: {results[index]['name']} ({results[index]['link']})")
+    results = [tool for i, tool in enumerate(results) if i not in skipped]
+
+    # Step 4: Save to JSON
     output_file = "scraper/data/scraped_tools.json"
     with open(output_file, "w", encoding="utf-8") as f:
         json.dump(results, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,61 @@
+"""
+Shared fixtures. The environment is set before anything from backend is
+imported, since modules read their configuration at import time: a scratch
+SQLite database, scratch directories for the on-disk indexes, and no
+background jobs.
+"""
+import os
+import tempfile
+
+_SCRATCH = tempfile.mkdtemp(prefix="ailisting-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(_SCRATCH, 'test.db')}",
+    "CATALOG_SNAPSHOT_DIR": os.path.join(_SCRATCH, "catalog_snapshot"),
+    "SIMILAR_INDEX_DIR": os.path.join(_SCRATCH, "similar_index"),
+    "PROFILE_DIR": os.path.join(_SCRATCH, "profiles"),
+    "TRENDING_JOB_ENABLED": "false",
+    "ANALYTICS_ENABLED": "true",
+})
+
+import pytest
+
+from backend import auth
+from backend.database.database import SessionLocal, get_engine
+from backend.migrate import run_migrations
+from backend.models import Base
+from benchmarks import api_benchmark
+
+
+@pytest.fixture
+def db():
+    """A session on a freshly created schema."""
+    Base.metadata.drop_all(bind=get_engine())
+    run_migrations()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(scope="session")
+def _key_pair():
+    return api_benchmark.make_key_pair()
+
+
+@pytest.fixture
+def token_for(_key_pair, monkeypatch):
+    """Signed bearer headers for a user id, verified by the real JWT path."""
+    private_pem, jwks = _key_pair
+    monkeypatch.setattr(auth, "_jwks_cache", jwks)
+    return lambda user_id: {"Authorization": f"Bearer {api_benchmark.make_token(private_pem, user_id)}"}
+
+
+@pytest.fixture
+def client(db):
+    from fastapi.testclient import TestClient
+
+    from backend.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
@@ -0,0 +1,100 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import insert
+
+from backend.database.database import get_engine
+from backend.models import CatalogChange, Tool
+from backend.services import admin_feed, admin_stats, catalog_events
+
+
+@pytest.fixture
+def feed(db, monkeypatch):
+    """A worker whose feed listener has just started."""
+    monkeypatch.setattr(catalog_events, "CATALOG_EVENTS_SHARED", True)
+    monkeypatch.setattr(catalog_events, "_cursor", None)
+    monkeypatch.setattr(admin_feed, "_buffer", admin_feed.deque(maxlen=admin_feed.ADMIN_FEED_BUFFER))
+    monkeypatch.setattr(admin_feed, "_known_after", 0)
+    catalog_events._catch_up()
+    return admin_feed
+
+
+def _insert_change(change_id=None, origin="other-worker", message=None):
+    values = {"origin": origin, "tool_ids": "[]", "category_ids": "[]", "message": json.dumps(message) if message else None}
+    if change_id is not None:
+        values["id"] = change_id
+    with get_engine().begin() as conn:
+        return conn.execute(insert(CatalogChange).values(**values).returning(CatalogChange.id)).scalar()
+
+
+def _delivered(feed):
+    return [(event.type, event.data["tool_ids"]) for event in feed._buffer]
+
+
+def test_events_from_other_workers_are_delivered(feed):
+    _insert_change(message={"admin_event": "approved", "data": {"tool_ids": [7]}})
+    catalog_events._catch_up()
+
+    assert _delivered(feed) == [("approved", [7])]
+
+
+def test_own_events_come_back_through_the_feed_in_order(feed):
+    feed.publish("submitted", [1])
+    _insert_change(message={"admin_event": "rejected", "data": {"tool_ids": [2]}})
+    feed.publish("approved", [3])
+    assert _delivered(feed) == []  # nothing until the listener reads the feed
+
+    catalog_events._catch_up()
+
+    assert _delivered(feed) == [("submitted", [1]), ("rejected", [2]), ("approved", [3])]
+    ids = [event.id for event in feed._buffer]
+    assert ids == sorted(ids)
+
+
+def test_catalog_changes_are_not_admin_events(feed):
+    catalog_events.publish(tool_ids=[5])
+    catalog_events._catch_up()
+
+    assert _delivered(feed) == []
+
+
+def test_resume_from_another_workers_event_id(feed):
+    first = _insert_change(message={"admin_event": "approved", "data": {"tool_ids": [1]}})
+    _insert_change(message={"admin_event": "approved", "data": {"tool_ids": [2]}})
+    catalog_events._catch_up()
+
+    assert [e.data["tool_ids"] for e in feed._backlog(first)] == [[2]]
+    # Ids from before this worker started listening can't be replayed
+    assert feed._backlog(first - 10) is None
+
+
+def test_feed_gap_resets_connected_dashboards(feed):
+    async def scenario():
+        chunks = feed.stream(None, lambda: asyncio.sleep(0, False))
+        assert await chunks.__anext__() == "retry: 3000\n\n"
+        waiting = asyncio.ensure_future(chunks.__anext__())
+        await asyncio.sleep(0)
+
+        start = _insert_change()
+        # A change committed out of order leaves a gap below this one
+        _insert_change(change_id=start + 2, message={"admin_event": "approved", "data": {"tool_ids": [9]}})
+        await asyncio.to_thread(catalog_events._catch_up)
+
+        return await asyncio.wait_for(waiting, 5)
+
+    assert "event: reset" in asyncio.run(scenario())
+
+
+def test_submission_on_another_worker_updates_pending_count(feed, db, monkeypatch):
+    monkeypatch.setattr(admin_stats, "_counts", None)
+    assert admin_stats._counters(db)["pending"] == 0
+
+    # The other worker commits the tool and sends its admin feed event
+    tool = Tool(name="Elsewhere", description="d", link="https://elsewhere.example", pricing_type="free", user_id="u")
+    db.add(tool)
+    db.commit()
+    _insert_change(message={"admin_event": "submitted", "data": {"tool_ids": [tool.id]}})
+    catalog_events._catch_up()
+
+    assert admin_stats._counters(db)["pending"] == 1
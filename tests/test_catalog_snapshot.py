@@ -0,0 +1,51 @@
+import os
+
+from backend.models import Tool
+from backend.services import catalog_snapshot
+
+
+def _add_tool(db, name):
+    db.add(Tool(name=name, description="d", link=f"https://{name}.example", pricing_type="free", is_approved=True, user_id="u"))
+    db.commit()
+
+
+def test_versions_are_numbered_in_build_order(db, tmp_path):
+    built = []
+    for i in range(12):
+        _add_tool(db, f"tool{i}")
+        built.append(os.path.basename(catalog_snapshot.build_snapshot(db, str(tmp_path))))
+
+    assert built == sorted(built, key=catalog_snapshot._version_number)
+    assert [catalog_snapshot._version_number(v) for v in built] == list(range(1, 13))
+    # Cleanup keeps the newest builds, including the one CURRENT names
+    assert catalog_snapshot._versions(str(tmp_path)) == built[-catalog_snapshot.KEEP_VERSIONS:]
+    assert catalog_snapshot._current_version_dir(str(tmp_path)).endswith(built[-1])
+
+
+def test_cleanup_never_removes_current(db, tmp_path):
+    current = os.path.basename(catalog_snapshot.build_snapshot(db, str(tmp_path)))
+    # Newer versions whose builds never got to swap CURRENT
+    newer = [f"{counter:012d}-1" for counter in (50, 51, 52)]
+    for version in newer:
+        os.makedirs(tmp_path / version)
+
+    catalog_snapshot._prune(str(tmp_path), newer[-1])
+
+    assert os.path.isdir(tmp_path / current)
+    assert not os.path.isdir(tmp_path / newer[0])
+    assert os.path.isdir(tmp_path / newer[-1])
+
+
+def test_load_keeps_previous_snapshot_when_version_disappears(db, monkeypatch):
+    monkeypatch.setattr(catalog_snapshot, "_snapshot", None)
+    _add_tool(db, "first")
+    catalog_snapshot.build_snapshot(db)
+    assert catalog_snapshot._load_current()
+    previous = catalog_snapshot._snapshot
+
+    # CURRENT names a version whose files are gone (removed by another worker)
+    version_dir = catalog_snapshot.build_snapshot(db)
+    os.remove(os.path.join(version_dir, "tool_ids.npy"))
+
+    assert not catalog_snapshot._load_current()
+    assert catalog_snapshot._snapshot is previous
@@ -0,0 +1,36 @@
+import pytest
+
+from backend import rate_limit
+from backend.services import tool_analytics
+
+
+@pytest.fixture
+def clicks(monkeypatch):
+    monkeypatch.setattr(rate_limit, "_store", rate_limit.InMemoryStore())
+    monkeypatch.setattr(tool_analytics, "_buffer", tool_analytics.deque(maxlen=tool_analytics.ANALYTICS_BUFFER_SIZE))
+    monkeypatch.setattr(tool_analytics, "_clicked", set())
+    return lambda: [tool_id for tool_id, _, kind in tool_analytics._buffer if kind == tool_analytics.CLICK]
+
+
+def test_repeated_clicks_count_once_per_client(client, clicks):
+    for _ in range(5):
+        assert client.post("/tools/1/click").status_code == 204
+    client.post("/tools/2/click")
+
+    assert clicks() == [1, 2]
+
+
+def test_clicks_from_other_clients_count(clicks):
+    for client_ip in ("10.0.0.1", "10.0.0.2", "10.0.0.1"):
+        tool_analytics.record_click(1, client_ip)
+
+    assert clicks() == [1, 1]
+
+
+def test_click_endpoint_is_rate_limited_by_ip(client, clicks, monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_RECORD_CLICK", "3/3600")
+
+    codes = [client.post(f"/tools/{tool_id}/click").status_code for tool_id in range(5)]
+
+    assert codes == [204, 204, 204, 429, 429]
+    assert clicks() == [0, 1, 2]
@@ -0,0 +1,80 @@
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from backend import rate_limit
+from backend.database.database import SessionLocal
+from backend.models import Category, Tool
+from backend.routes import tools
+from backend.schemas import ToolCreate
+from backend.services import catalog_events
+
+
+@pytest.fixture(autouse=True)
+def _fresh_buckets(monkeypatch):
+    monkeypatch.setattr(rate_limit, "_store", rate_limit.InMemoryStore())
+
+
+def _payload(name, link):
+    return {"name": name, "description": "d", "link": link, "pricing_type": "free", "category_ids": []}
+
+
+def test_same_canonical_link_is_rejected(client, token_for):
+    headers = token_for("submitter")
+    assert client.post("/tools/", json=_payload("Notion AI", "https://www.notion.so/product/ai/?utm_source=x"), headers=headers).status_code == 201
+
+    response = client.post("/tools/", json=_payload("Notion again", "http://notion.so/product/ai"), headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "A tool with this link already exists: 'Notion AI'"
+
+    response = client.post("/tools/", json=_payload("Notion AI", "https://other.example"), headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Tool 'Notion AI' already exists"
+
+
+def test_concurrent_duplicates_create_one_tool(db):
+    outcomes = []
+
+    def submit(i):
+        session = SessionLocal()
+        try:
+            tool = ToolCreate(**_payload(f"Jasper {i}", f"https://{'www.' if i % 2 else ''}jasper.ai/?ref={i}"))
+            tools.create_tool(tool, db=session, current_user=f"user{i}")
+            outcomes.append("created")
+        except HTTPException as e:
+            outcomes.append(e.status_code)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(outcomes, key=str) == [400] * 7 + ["created"]
+    assert db.query(Tool).count() == 1
+
+
+@pytest.mark.parametrize("link", ["https://jasper.ai:abc/", "https://jasper.ai:99999", "https://[::1/app"])
+def test_malformed_link_is_a_validation_error(client, db, token_for, link):
+    created = client.post("/tools/", json=_payload("Jasper", "https://jasper.ai"), headers=token_for("submitter")).json()
+
+    assert client.put(f"/tools/{created['id']}", json={"link": link}).status_code == 422
+    assert client.post("/tools/", json=_payload("Other", link), headers=token_for("submitter")).status_code == 422
+    db.expire_all()
+    assert db.get(Tool, created["id"]).link == created["link"]
+
+
+def test_submission_publishes_its_categories(client, db, token_for, monkeypatch):
+    published = []
+    monkeypatch.setattr(catalog_events, "_listeners", [(lambda t, c: published.append((t, c)), False, False)])
+    category = Category(name="Writing")
+    db.add(category)
+    db.commit()
+
+    payload = {**_payload("Jasper", "https://jasper.ai"), "category_ids": [category.id]}
+    created = client.post("/tools/", json=payload, headers=token_for("submitter")).json()
+
+    assert published == [([created["id"]], [category.id])]
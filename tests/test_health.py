@@ -0,0 +1,34 @@
+import asyncio
+
+import httpx
+
+from backend import auth, health
+
+
+def _check(handler):
+    return asyncio.run(health._check_jwks(transport=httpx.MockTransport(handler)))
+
+
+def test_jwks_is_probed_on_every_check(monkeypatch):
+    monkeypatch.setattr(auth, "_jwks_cache", {"keys": [{"kid": "cached"}]})
+    requests = []
+
+    def handler(request):
+        requests.append(str(request.url))
+        return httpx.Response(200, json={"keys": [{"kid": "k1"}]})
+
+    assert _check(handler)["status"] == "ok"
+    assert _check(handler)["status"] == "ok"
+    assert requests == [auth.JWKS_URL, auth.JWKS_URL]
+
+
+def test_jwks_outage_is_reported_even_with_cached_keys(monkeypatch):
+    monkeypatch.setattr(auth, "_jwks_cache", {"keys": [{"kid": "cached"}]})
+
+    assert _check(lambda request: httpx.Response(503))["status"].startswith("error")
+    assert _check(lambda request: httpx.Response(200, json={"keys": []}))["status"] == "error: JWKS has no keys"
+
+    def timeout(request):
+        raise httpx.ConnectTimeout("timed out", request=request)
+
+    assert _check(timeout)["status"] == "error: timed out"
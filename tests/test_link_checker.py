@@ -0,0 +1,139 @@
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from backend.models import LinkCheck, Tool
+from backend.services import link_checker
+
+
+def _rows(*urls):
+    return [SimpleNamespace(id=i, tool_id=i, field="link", url=url, failures=0) for i, url in enumerate(urls)]
+
+
+def _check(handler, *urls):
+    results = asyncio.run(link_checker.check_all(_rows(*urls), transport=httpx.MockTransport(handler)))
+    return {row.url: outcome for row, outcome in results}
+
+
+def test_head_falls_back_to_get():
+    seen = []
+
+    def handler(request):
+        seen.append((request.method, request.url.host))
+        if request.url.host == "no-head.example":
+            return httpx.Response(405 if request.method == "HEAD" else 200)
+        if request.url.host == "flaky.example":
+            return httpx.Response(503 if request.method == "HEAD" else 200)
+        return httpx.Response(200)
+
+    outcomes = _check(handler, "https://no-head.example/", "https://flaky.example/", "https://fine.example/")
+
+    assert {url: o["status_code"] for url, o in outcomes.items()} == {
+        "https://no-head.example/": 200, "https://flaky.example/": 200, "https://fine.example/": 200,
+    }
+    assert sorted(seen) == sorted([
+        ("HEAD", "no-head.example"), ("GET", "no-head.example"),
+        ("HEAD", "flaky.example"), ("GET", "flaky.example"),
+        ("HEAD", "fine.example"),
+    ])
+
+
+def test_redirects_are_followed_and_errors_reported():
+    def handler(request):
+        if request.url.host == "moved.example":
+            return httpx.Response(301, headers={"Location": "https://new.example/home"})
+        if request.url.host == "gone.example":
+            return httpx.Response(404)
+        if request.url.host == "down.example":
+            return httpx.Response(500)
+        if request.url.host == "dns.example":
+            raise httpx.ConnectError("name resolution failed", request=request)
+        return httpx.Response(200)
+
+    outcomes = _check(handler, "https://moved.example/", "https://gone.example/", "https://down.example/", "https://dns.example/")
+
+    assert outcomes["https://moved.example/"]["status_code"] == 200
+    assert outcomes["https://moved.example/"]["final_url"] == "https://new.example/home"
+    assert outcomes["https://gone.example/"]["status_code"] == 404
+    assert outcomes["https://down.example/"]["status_code"] == 500
+    assert outcomes["https://dns.example/"]["status_code"] is None
+    assert outcomes["https://dns.example/"]["error"].startswith("ConnectError")
+
+
+def test_requests_per_host_are_capped(monkeypatch):
+    monkeypatch.setattr(link_checker, "LINK_CHECK_PER_HOST", 2)
+    in_flight = Counter()
+    peak = Counter()
+
+    async def handler(request):
+        host = request.url.host
+        in_flight[host] += 1
+        peak[host] = max(peak[host], in_flight[host])
+        await asyncio.sleep(0.01)
+        in_flight[host] -= 1
+        return httpx.Response(200)
+
+    urls = [f"https://busy.example/{i}" for i in range(10)] + [f"https://quiet{i}.example/" for i in range(3)]
+    outcomes = _check(handler, *urls)
+
+    assert len(outcomes) == 13
+    assert peak["busy.example"] == 2
+
+
+@pytest.fixture
+def checks(db):
+    """One tool per outcome, with its link_checks row claimed."""
+    db.add_all([
+        Tool(name=name, description="d", link=f"https://{name}.example", pricing_type="free", is_approved=True, user_id="u")
+        for name in ("ok", "forbidden", "limited", "dead")
+    ])
+    db.commit()
+    link_checker.sync_targets(db)
+    return {httpx.URL(row.url).host.split(".")[0]: row for row in link_checker.claim_due(db)}
+
+
+def _outcome(code):
+    return {"status_code": code, "error": None, "latency_ms": 1.0, "final_url": None}
+
+
+def test_results_are_classified(db, checks):
+    changed = link_checker.record_results(db, [
+        (checks["ok"], _outcome(200)),
+        (checks["forbidden"], _outcome(403)),
+        (checks["limited"], _outcome(429)),
+        (checks["dead"], _outcome(404)),
+    ])
+
+    statuses = {tool.name: tool.link_status for tool in db.query(Tool)}
+    # One failure isn't enough to call a link broken, and a 429 isn't a failure at all
+    assert statuses == {"ok": "ok", "forbidden": "ok", "limited": None, "dead": None}
+    assert len(changed) == 2
+    failures = {check.url: check.failures for check in db.query(LinkCheck)}
+    assert failures["https://limited.example"] == 0
+    assert failures["https://dead.example"] == 1
+
+
+def test_failing_links_back_off_then_break(db, checks):
+    dead = checks["dead"]
+    delays = []
+    for _ in range(4):
+        started = datetime.utcnow()
+        link_checker.record_results(db, [(dead, _outcome(500))])
+        check = db.get(LinkCheck, dead.id)
+        db.refresh(check)
+        delays.append(check.next_check_at - started)
+        dead = SimpleNamespace(id=check.id, tool_id=check.tool_id, field=check.field, url=check.url, failures=check.failures)
+
+    base = link_checker.RETRY_BASE
+    for delay, expected in zip(delays, [base, base * 2, base * 4, base * 8]):
+        assert expected <= delay < expected + timedelta(seconds=5)
+    assert db.query(Tool).filter_by(name="dead").one().link_status == "broken"
+
+    link_checker.record_results(db, [(dead, _outcome(200))])
+    db.expire_all()
+    assert db.query(Tool).filter_by(name="dead").one().link_status == "ok"
+    assert db.get(LinkCheck, dead.id).failures == 0
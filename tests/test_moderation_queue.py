@@ -0,0 +1,94 @@
+"""
+Claims and bulk moderation. SQLite ignores FOR UPDATE SKIP LOCKED, so
+concurrent calls are serialized here; what's checked is that no tool is
+handed to two moderators or approved twice.
+"""
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.database.database import SessionLocal
+from backend.models import Tool
+from backend.routes import admin
+from backend.schemas import BulkModerationRequest
+
+
+@pytest.fixture
+def pending(db):
+    start = datetime.utcnow() - timedelta(days=1)
+    rows = [
+        Tool(name=f"p{i}", description="d", link=f"https://p{i}.example", pricing_type="free",
+             is_approved=False, user_id="submitter", date_added=start + timedelta(minutes=i))
+        for i in range(10)
+    ]
+    db.add_all(rows)
+    db.commit()
+    return [row.id for row in rows]
+
+
+@pytest.fixture
+def moderator(token_for):
+    headers = token_for(admin.ADMIN_USER_ID)
+    return lambda reviewer: {**headers, "X-Reviewer": reviewer}
+
+
+def test_claims_do_not_overlap(client, pending, moderator):
+    first = [t["id"] for t in client.post("/admin/pending-tools/claim?limit=4", headers=moderator("a")).json()]
+    second = [t["id"] for t in client.post("/admin/pending-tools/claim?limit=4", headers=moderator("b")).json()]
+
+    assert first == pending[:4]
+    assert second == pending[4:8]
+
+
+def test_bulk_approve_skips_other_moderators_claims(client, db, pending, moderator):
+    client.post("/admin/pending-tools/claim?limit=3", headers=moderator("a"))
+
+    result = client.post("/admin/tools/bulk-approve", json={"ids": pending[:5]}, headers=moderator("b")).json()
+
+    assert result["ids"] == pending[3:5]
+    assert {t.id for t in db.query(Tool).filter_by(is_approved=True)} == set(pending[3:5])
+
+
+def test_expired_claims_can_be_taken(client, db, pending, moderator):
+    client.post("/admin/pending-tools/claim?limit=10", headers=moderator("a"))
+    db.query(Tool).filter(Tool.id.in_(pending[:2])).update(
+        {Tool.claimed_at: datetime.utcnow() - timedelta(seconds=admin.CLAIM_LEASE_SECONDS + 1)}, synchronize_session=False
+    )
+    db.commit()
+
+    taken = [t["id"] for t in client.post("/admin/pending-tools/claim", headers=moderator("b")).json()]
+    assert taken == pending[:2]
+
+
+def test_release_by_filter_only_returns_own_claims(client, db, pending, moderator):
+    client.post("/admin/pending-tools/claim?limit=3", headers=moderator("a"))
+    client.post("/admin/pending-tools/claim?limit=3", headers=moderator("b"))
+
+    released = client.post(
+        "/admin/pending-tools/release", json={"filter": {"user_id": "submitter"}, "limit": 2}, headers=moderator("a")
+    ).json()
+
+    assert released["ids"] == pending[:2]
+    db.expire_all()
+    assert [t.id for t in db.query(Tool).filter(Tool.claimed_by.isnot(None)).order_by(Tool.id)] == pending[2:6]
+
+
+def test_concurrent_bulk_approvals_approve_each_tool_once(db, pending):
+    def approve(reviewer, results):
+        session = SessionLocal()
+        try:
+            request = BulkModerationRequest(ids=pending)
+            results[reviewer] = admin.bulk_approve_tools(request, db=session, reviewer=reviewer).ids
+        finally:
+            session.close()
+
+    results = {}
+    threads = [threading.Thread(target=approve, args=(f"r{i}", results)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    approved = [tool_id for ids in results.values() for tool_id in ids]
+    assert sorted(approved) == pending
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.models import Tool
+
+
+@pytest.fixture
+def submitted(db):
+    """25 tools for one user, pending and approved mixed, with some identical timestamps."""
+    start = datetime(2026, 1, 1)
+    rows = [
+        Tool(name=f"t{i}", description="d", link=f"https://t{i}.example", pricing_type="free",
+             is_approved=i % 3 == 0, user_id="me", date_added=start + timedelta(minutes=i // 2))
+        for i in range(25)
+    ]
+    rows.append(Tool(name="theirs", description="d", link="https://theirs.example", pricing_type="free", user_id="someone-else"))
+    db.add_all(rows)
+    db.commit()
+    return rows[:25]
+
+
+def _walk(client, headers, query=""):
+    ids, cursor = [], None
+    while True:
+        page = client.get(f"/me/tools?limit=4{query}" + (f"&cursor={cursor}" if cursor else ""), headers=headers).json()
+        ids.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            return ids
+
+
+def _newest_first(rows):
+    return [t.id for t in sorted(rows, key=lambda t: (t.date_added, t.id), reverse=True)]
+
+
+def test_pages_cover_every_tool_once(client, token_for, submitted):
+    assert _walk(client, token_for("me")) == _newest_first(submitted)
+
+
+def test_status_filter(client, token_for, submitted):
+    headers = token_for("me")
+    assert _walk(client, headers, "&status=approved") == _newest_first([t for t in submitted if t.is_approved])
+    assert _walk(client, headers, "&status=pending") == _newest_first([t for t in submitted if not t.is_approved])
+
+
+def test_new_submissions_do_not_shift_later_pages(client, db, token_for, submitted):
+    headers = token_for("me")
+    first = client.get("/me/tools?limit=4", headers=headers).json()
+
+    db.add(Tool(name="newer", description="d", link="https://newer.example", pricing_type="free", user_id="me", date_added=datetime(2027, 1, 1)))
+    db.commit()
+
+    second = client.get(f"/me/tools?limit=4&cursor={first['next_cursor']}", headers=headers).json()
+    assert [item["id"] for item in first["items"] + second["items"]] == _newest_first(submitted)[:8]
+
+
+def test_invalid_cursor(client, token_for, submitted):
+    assert client.get("/me/tools?cursor=not-a-cursor", headers=token_for("me")).status_code == 400
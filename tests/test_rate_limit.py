@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+
+from backend import rate_limit
+
+
+def _hammer(store, threads=50, capacity=10):
+    """Consume one key from many threads at once; returns how many were allowed."""
+    start = threading.Barrier(threads)
+    allowed = []
+
+    def worker():
+        start.wait()
+        allowed.append(store.consume("k", capacity, 1e-6)[0])
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return sum(allowed)
+
+
+def test_in_memory_bucket_is_atomic():
+    assert _hammer(rate_limit.InMemoryStore()) == 10
+
+
+def test_shared_bucket_never_overspends():
+    assert _hammer(rate_limit.SharedStore(rate_limit.LocalFakeSharedClient(), max_retries=1000)) == 10
+    # Under contention with few retries it fails closed, never open
+    assert _hammer(rate_limit.SharedStore(rate_limit.LocalFakeSharedClient(), max_retries=1)) <= 10
+
+
+@pytest.fixture
+def limited(monkeypatch):
+    monkeypatch.setattr(rate_limit, "_store", rate_limit.InMemoryStore())
+    monkeypatch.setenv("RATE_LIMIT_TOGGLE_LIKE", "2/3600")
+
+
+def test_route_returns_429_per_user(client, token_for, limited):
+    alice, bob = token_for("alice"), token_for("bob")
+
+    assert [client.post("/tools/999/like", headers=alice).status_code for _ in range(2)] == [404, 404]
+    response = client.post("/tools/999/like", headers=alice)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    # Another user has their own bucket
+    assert client.post("/tools/999/like", headers=bob).status_code == 404
+
+
+@pytest.mark.parametrize("override", ["10", "a/b", "0/60", "5/0", "5/inf"])
+def test_malformed_override_falls_back_to_default(client, token_for, monkeypatch, capsys, override):
+    monkeypatch.setattr(rate_limit, "_store", rate_limit.InMemoryStore())
+    monkeypatch.setenv("RATE_LIMIT_TOGGLE_LIKE", override)
+
+    assert rate_limit.get_limit("toggle_like") == rate_limit.DEFAULT_LIMITS["toggle_like"]
+    assert client.post("/tools/999/like", headers=token_for("alice")).status_code == 404
+    assert capsys.readouterr().out.count("Ignoring invalid RATE_LIMIT_TOGGLE_LIKE") == 1
+
+
+def test_store_must_implement_consume():
+    class Incomplete(rate_limit.RateLimitStore):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,20 @@
+from backend.database import replicas
+from backend.models import Base, Tool
+from backend.services import facet_index
+
+
+def test_shared_index_is_built_from_the_primary(db, client, tmp_path, monkeypatch):
+    # A replica that hasn't caught up: same schema, none of the primary's rows
+    lagging = replicas.Replica(f"sqlite:///{tmp_path / 'replica.db'}")
+    Base.metadata.create_all(bind=lagging.engine)
+    monkeypatch.setattr(replicas, "get_replicas", lambda: [lagging])
+    monkeypatch.setattr(replicas, "pick_replica", lambda: lagging)
+
+    db.add(Tool(name="fresh", description="d", link="https://fresh.example", pricing_type="free", is_approved=True, user_id="u"))
+    db.commit()
+    facet_index.invalidate()
+
+    response = client.get("/tools/faceted")
+    assert response.status_code == 200
+    assert response.json()["total"] == 1
+    assert response.json()["facets"]["pricing_types"] == {"free": 1}
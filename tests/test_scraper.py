@@ -0,0 +1,50 @@
+import pytest
+
+pytest.importorskip("bs4")
+
+from scraper import scraper
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+    def raise_for_status(self):
+        pass
+
+
+def test_seed_urls_are_deduplicated_by_canonical_form(monkeypatch):
+    markdown = "\n".join([
+        "## Text",
+        "- [Notion AI](https://www.notion.so/product/ai/?utm_source=list)",
+        "- [Notion AI again](https://notion.so/product/ai)",
+        "- [Jasper](https://jasper.ai)",
+        "- [Jasper, tracked](http://www.jasper.ai/?ref=awesome)",
+        "- [Repo](https://github.com/some/repo)",
+    ])
+    monkeypatch.setattr(scraper.requests, "get", lambda url: _Response(markdown))
+
+    assert scraper.fetch_urls_from_link("ignored") == [
+        "https://www.notion.so/product/ai/?utm_source=list",
+        "https://jasper.ai",
+    ]
+
+
+def test_near_duplicate_pages_are_dropped_before_saving(monkeypatch, tmp_path):
+    description = "Write blog posts, emails and ads ten times faster with an AI writing assistant for teams"
+    pages = {
+        "https://writer.example": {"name": "Writer AI", "description": description},
+        "https://writer-mirror.example": {"name": "Writer AI", "description": description},
+        "https://other.example": {"name": "Pixel Forge", "description": "Generate game sprites and textures from text prompts"},
+    }
+    monkeypatch.setattr(scraper, "fetch_urls_from_link", lambda raw_url: list(pages))
+    monkeypatch.setattr(scraper, "scrape_tool_info", lambda url: {**pages[url], "link": url, "logo_url": "", "pricing_type": "freemium", "categories": []})
+    monkeypatch.setattr(scraper.time, "sleep", lambda seconds: None)
+    saved = {}
+    monkeypatch.setattr(scraper.json, "dump", lambda results, f, **kwargs: saved.setdefault("results", results))
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "scraper" / "data").mkdir(parents=True)
+
+    scraper.main()
+
+    assert [tool["link"] for tool in saved["results"]] == ["https://writer.example", "https://other.example"]
@@ -0,0 +1,74 @@
+import json
+import os
+
+import pytest
+
+from backend import bulk_imports
+from backend.models import Tool
+from backend.services import similar_index
+
+
+@pytest.fixture
+def index(db):
+    db.add_all([
+        Tool(name="Retoucher", description="photo editor to retouch images", link="https://a.example", pricing_type="free", is_approved=True, user_id="u"),
+        Tool(name="Filterly", description="photo editor with filters for images", link="https://b.example", pricing_type="free", is_approved=True, user_id="u"),
+        Tool(name="Completer", description="code assistant to autocomplete python", link="https://c.example", pricing_type="free", is_approved=True, user_id="u"),
+        Tool(name="Refactorer", description="code assistant to refactor python", link="https://d.example", pricing_type="free", is_approved=True, user_id="u"),
+    ])
+    db.commit()
+    similar_index.build_index(db)
+    return {tool.name: tool.id for tool in db.query(Tool)}
+
+
+def test_bulk_imported_tools_are_indexed(db, index, tmp_path, monkeypatch):
+    monkeypatch.setattr(bulk_imports, "ADMIN_USER_ID", "importer")
+    path = tmp_path / "tools.json"
+    path.write_text(json.dumps([
+        {"name": "Backdrop", "description": "photo editor that swaps images backgrounds", "link": "https://e.example", "categories": []},
+    ]))
+
+    bulk_imports.import_tools(str(path))
+
+    backdrop = db.query(Tool).filter_by(name="Backdrop").one().id
+    assert backdrop in similar_index.similar_tool_ids(db, index["Retoucher"], 5)
+
+
+def test_edited_tools_are_reindexed(db, client, index):
+    assert index["Completer"] not in similar_index.similar_tool_ids(db, index["Retoucher"], 5)
+
+    response = client.put(f"/tools/{index['Completer']}", json={"description": "photo editor to retouch images"})
+    assert response.status_code == 200
+
+    assert index["Completer"] in similar_index.similar_tool_ids(db, index["Retoucher"], 5)
+
+
+def test_edited_tools_stop_matching_their_old_text(db, client, index):
+    assert index["Filterly"] in similar_index.similar_tool_ids(db, index["Retoucher"], 5)
+
+    client.put(f"/tools/{index['Filterly']}", json={"description": "code assistant to autocomplete python"})
+
+    assert index["Filterly"] not in similar_index.similar_tool_ids(db, index["Retoucher"], 5)
+    assert index["Filterly"] in similar_index.similar_tool_ids(db, index["Completer"], 5)
+
+
+def test_builds_in_the_same_second_get_their_own_version(db, tmp_path):
+    built = [os.path.basename(similar_index.build_index(db, str(tmp_path))) for _ in range(4)]
+
+    assert [similar_index._version_number(v) for v in built] == [1, 2, 3, 4]
+    assert similar_index._versions(str(tmp_path)) == built[-similar_index.KEEP_VERSIONS:]
+    assert similar_index._current_version(str(tmp_path)) == built[-1]
+
+
+def test_cleanup_never_removes_current(db, tmp_path):
+    current = os.path.basename(similar_index.build_index(db, str(tmp_path)))
+    # Newer versions whose builds never got to swap CURRENT
+    newer = [f"{counter:012d}-1" for counter in (50, 51, 52)]
+    for version in newer:
+        os.makedirs(tmp_path / version)
+
+    similar_index._prune(str(tmp_path), newer[-1])
+
+    assert os.path.isdir(tmp_path / current)
+    assert not os.path.isdir(tmp_path / newer[0])
+    assert os.path.isdir(tmp_path / newer[-1])
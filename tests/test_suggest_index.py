@@ -0,0 +1,49 @@
+import random
+
+from backend.services import suggest_index
+from backend.services.suggest_index import Entry, SuggestIndex
+
+
+def _brute_force(entries, prefix, limit):
+    matching = [
+        e for e in entries
+        if any(key.startswith(prefix) for key in SuggestIndex([e]).entry_keys[0])
+    ]
+    return sorted(matching, key=lambda e: (-e.score, e.name))[:limit]
+
+
+def test_popular_match_past_the_scan_cap_is_found(monkeypatch):
+    monkeypatch.setattr(suggest_index, "MAX_SCAN", 100)
+    entries = [Entry("tool", i, f"GPT assistant {i:05d}", 0) for i in range(500)]
+    # Sorts after every other "gpt..." key but is the most popular
+    entries.append(Entry("tool", 999, "GPT zeta", 50))
+    index = SuggestIndex(entries)
+
+    assert index.suggest("gpt", 3)[0].name == "GPT zeta"
+    assert index.suggest("gpt", 3) == _brute_force(entries, "gpt", 3)
+
+
+def test_matches_brute_force(monkeypatch):
+    monkeypatch.setattr(suggest_index, "MAX_SCAN", 20)
+    rng = random.Random(7)
+    words = ["gpt", "gmail", "writer", "write", "image", "imagen", "chat", "code"]
+    entries = [
+        Entry("tool", i, " ".join(rng.sample(words, 2)) + f" {i}", rng.randint(0, 30))
+        for i in range(300)
+    ]
+    index = SuggestIndex(entries)
+
+    for prefix in ["gp", "gpt", "gma", "writ", "write", "ima", "imagen", "cod", "zzz"]:
+        assert index.suggest(prefix, 8) == _brute_force(entries, prefix, 8), prefix
+
+
+def test_suggest_is_unavailable_until_built(client, monkeypatch):
+    monkeypatch.setattr(suggest_index, "_index", None)
+
+    def broken(db):
+        raise RuntimeError("database is down")
+
+    monkeypatch.setattr(suggest_index, "build_index", broken)
+    response = client.get("/search/suggest?q=gpt")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
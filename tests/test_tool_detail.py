@@ -0,0 +1,16 @@
+from backend.models import Tool
+
+
+def test_counts_agree_with_the_viewer_right_after_a_like(client, db, token_for):
+    tool = Tool(name="Jasper", description="d", link="https://jasper.ai", pricing_type="free", is_approved=True, user_id="u")
+    db.add(tool)
+    db.commit()
+    headers = token_for("fan")
+    assert client.get(f"/tools/{tool.id}/detail").json()["like_count"] == 0  # cached now
+
+    client.post(f"/tools/{tool.id}/like", headers=headers)
+    client.post(f"/tools/{tool.id}/bookmark", headers=headers)
+    detail = client.get(f"/tools/{tool.id}/detail", headers=headers).json()
+
+    assert detail["viewer"] == {"liked": True, "bookmarked": True}
+    assert (detail["like_count"], detail["bookmark_count"]) == (1, 1)
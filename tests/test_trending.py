@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.models import EngagementEvent, Like, Tool, ToolActivity, ToolTrending
+from backend.services import trending
+
+
+@pytest.fixture(autouse=True)
+def _every_call_runs(monkeypatch):
+    """Let back-to-back update() calls each claim a run and read events right away."""
+    monkeypatch.setattr(trending, "TRENDING_INTERVAL_SECONDS", 0)
+    monkeypatch.setattr(trending, "ENGAGEMENT_GRACE", timedelta(0))
+
+
+@pytest.fixture
+def tools(db):
+    rows = [Tool(name=f"t{i}", description="d", link=f"https://t{i}.example", pricing_type="free", is_approved=True, user_id="u") for i in range(2)]
+    db.add_all(rows)
+    db.commit()
+    return [row.id for row in rows]
+
+
+def _scores(db):
+    db.expire_all()
+    return {row.tool_id: row.score for row in db.query(ToolTrending)}
+
+
+def test_like_unlike_cycling_does_not_pump_the_score(db, tools):
+    db.add(Like(user_id="fan", tool_id=tools[0]))
+    db.commit()
+    trending.update()
+    once = _scores(db)[tools[0]]
+    assert once > 0
+
+    for _ in range(20):
+        db.delete(db.query(Like).filter_by(user_id="fan").one())
+        db.commit()
+        trending.update()
+        db.add(Like(user_id="fan", tool_id=tools[0]))
+        db.commit()
+        trending.update()
+
+    assert _scores(db)[tools[0]] == pytest.approx(once, rel=1e-3)
+
+
+def test_unlike_takes_the_like_back(db, tools):
+    db.add_all([Like(user_id="a", tool_id=tools[0]), Like(user_id="b", tool_id=tools[0])])
+    db.commit()
+    trending.update()
+    both = _scores(db)[tools[0]]
+
+    db.delete(db.query(Like).filter_by(user_id="a").one())
+    db.commit()
+    trending.update()
+    assert _scores(db)[tools[0]] == pytest.approx(both / 2, rel=1e-3)
+
+    for like in db.query(Like):
+        db.delete(like)
+    db.commit()
+    trending.update()
+    assert _scores(db)[tools[0]] == pytest.approx(0, abs=1e-9)
+
+
+def test_activity_hours_are_applied_once(db, tools):
+    hour = (datetime.utcnow() - timedelta(hours=3)).replace(minute=0, second=0, microsecond=0)
+    db.add(ToolActivity(tool_id=tools[1], hour=hour, views=0, clicks=10))
+    db.commit()
+
+    trending.update()
+    first = _scores(db)[tools[1]]
+    trending.update()
+    trending.update()
+
+    assert first > 0
+    assert _scores(db)[tools[1]] == first
+
+
+def test_activity_and_engagement_add_up(db, tools):
+    hour = (datetime.utcnow() - timedelta(hours=3)).replace(minute=0, second=0, microsecond=0)
+    db.add(ToolActivity(tool_id=tools[0], hour=hour, views=5, clicks=0))
+    db.add(Like(user_id="a", tool_id=tools[0]))
+    db.commit()
+    trending.update()
+
+    row = db.get(ToolTrending, tools[0])
+    assert row.activity > 0 and row.engagement > 0
+    assert row.score == pytest.approx(row.activity + row.engagement)
+
+
+def test_events_are_applied_once_and_then_dropped(db, tools):
+    db.add(Like(user_id="a", tool_id=tools[0]))
+    db.commit()
+    trending.update()
+    first = _scores(db)[tools[0]]
+
+    assert db.query(EngagementEvent).count() == 0
+    trending.update()
+    assert _scores(db)[tools[0]] == first
+
+
+def test_recent_events_wait_for_the_grace_period(db, tools, monkeypatch):
+    monkeypatch.setattr(trending, "ENGAGEMENT_GRACE", timedelta(minutes=1))
+    trending.update()
+    db.add(Like(user_id="a", tool_id=tools[0]))
+    db.commit()
+
+    trending.update()
+    assert _scores(db).get(tools[0], 0) == 0
+    assert db.query(EngagementEvent).count() == 1
+
+
+def test_first_run_scores_existing_likes(db, tools):
+    db.add(Like(user_id="a", tool_id=tools[0]))
+    db.commit()
+    db.query(EngagementEvent).delete()  # Likes from before the event log existed
+    db.commit()
+
+    trending.update()
+    assert _scores(db)[tools[0]] > 0
+
+
+def test_one_run_per_interval(db, tools, monkeypatch):
+    monkeypatch.setattr(trending, "TRENDING_INTERVAL_SECONDS", 300)
+    trending.update()
+    db.add(Like(user_id="a", tool_id=tools[0]))
+    db.commit()
+
+    # Another worker a moment later: the interval's run is taken
+    assert trending.update() == 0
+    assert _scores(db).get(tools[0], 0) == 0